@@ -1,11 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
-from .database import SessionLocal
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import get_db, AsyncSessionLocal
 from .models import User
+from .cache import TTLCache
+from .metrics import PASSWORD_HASHING
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import time
 import os
 
 # Security configuration
@@ -13,17 +19,37 @@ SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-here")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+# Password hashing configuration
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+
+# Authenticated-user cache (entries never outlive the token's exp)
+AUTH_CACHE_SIZE = int(os.getenv("AUTH_CACHE_SIZE", "4096"))
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL", "300"))
+
 router = APIRouter(prefix="/auth", tags=["authentication"])
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Hashes with fewer rounds than BCRYPT_ROUNDS are flagged for rehash on login
+pwd_context = CryptContext(
+    schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS, bcrypt__min_rounds=BCRYPT_ROUNDS
+)
+# bcrypt releases the GIL, so a small dedicated thread pool keeps password work
+# off the event loop and caps it separately from every other blocking task
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/token", auto_error=False)
 
-# Dependency to get database session
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# token -> User row, plus email -> tokens so a user's entries can be dropped.
+# The index only holds tokens still in the cache, so it shares its bound.
+_tokens_by_email = {}
+
+def _forget_token(token: str, user: User):
+    tokens = _tokens_by_email.get(user.email)
+    if tokens is not None:
+        tokens.discard(token)
+        if not tokens:
+            del _tokens_by_email[user.email]
+
+_user_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL, on_evict=_forget_token)
 
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
@@ -31,12 +57,38 @@ def verify_password(plain_password, hashed_password):
 def get_password_hash(password):
     return pwd_context.hash(password)
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = db.query(User).filter(User.email == email).first()
+async def verify_and_update_password(plain_password, hashed_password):
+    """Verify in the password pool; returns (valid, new_hash or None)"""
+    loop = asyncio.get_running_loop()
+    with PASSWORD_HASHING.time("verify"):
+        return await loop.run_in_executor(
+            password_executor, pwd_context.verify_and_update, plain_password, hashed_password
+        )
+
+async def hash_password(password):
+    """Hash in the password pool"""
+    loop = asyncio.get_running_loop()
+    with PASSWORD_HASHING.time("hash"):
+        return await loop.run_in_executor(password_executor, pwd_context.hash, password)
+
+def shutdown_password_executor():
+    password_executor.shutdown(wait=True)
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
+
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = await get_user_by_email(db, email)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not valid:
         return False
+    if new_hash:
+        # Transparently upgrade hashes that pwd_context marks as deprecated
+        user.hashed_password = new_hash
+        await db.commit()
     return user
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
@@ -49,12 +101,72 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def invalidate_user(email: str):
+    """Drop every cached token entry for this user (registration, password change)"""
+    for token in _tokens_by_email.pop(email, ()):
+        _user_cache.delete(token)
+
+def _cache_user(token: str, user: User, expires_at: float):
+    ttl = min(AUTH_CACHE_TTL, expires_at - time.time())
+    if ttl <= 0:
+        return
+    # Index first: if set() evicts this very entry, on_evict removes it again
+    _tokens_by_email.setdefault(user.email, set()).add(token)
+    _user_cache.set(token, user, ttl)
+
+async def get_current_user(
+    token: str = Depends(oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+):
+    """Resolve the bearer token to a User, skipping JWT decode and DB lookup on cache hits"""
+    user = _user_cache.get(token)
+    if user is not None:
+        return user
+
+    credentials_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise credentials_exception
+    email = payload.get("sub")
+    if email is None:
+        raise credentials_exception
+
+    user = await get_user_by_email(db, email)
+    if user is None:
+        raise credentials_exception
+    _cache_user(token, user, payload.get("exp", 0))
+    return user
+
+async def get_optional_user(
+    token: str = Depends(optional_oauth2_scheme),
+    db: AsyncSession = Depends(get_db)
+):
+    """Like get_current_user, but anonymous callers get None instead of a 401"""
+    if not token:
+        return None
+    try:
+        return await get_current_user(token, db)
+    except HTTPException:
+        return None
+
+async def user_for_token(token: str):
+    """get_optional_user for in-process callers such as the ReactPy pages"""
+    if not token:
+        return None
+    async with AsyncSessionLocal() as db:
+        return await get_optional_user(token, db)
+
 @router.post("/token")
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -79,10 +191,10 @@ async def register_user(
     email: str,
     password: str,
     name: str = None,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     # Check if user already exists
-    existing_user = db.query(User).filter(User.email == email).first()
+    existing_user = await get_user_by_email(db, email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -90,10 +202,37 @@ async def register_user(
         )
     
     # Create new user
-    hashed_password = get_password_hash(password)
+    hashed_password = await hash_password(password)
     user = User(email=email, hashed_password=hashed_password, name=name)
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
+    invalidate_user(user.email)
+    
+    return {"message": "User created successfully", "email": user.email}
+
+@router.get("/me")
+async def read_current_user(current_user: User = Depends(get_current_user)):
+    return {"email": current_user.email, "name": current_user.name}
+
+@router.post("/change-password")
+async def change_password(
+    current_password: str,
+    new_password: str,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    # Re-load the row in this session; the cached instance is detached
+    user = await db.get(User, current_user.id)
+    valid, _ = await verify_and_update_password(current_password, user.hashed_password)
+    if not valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Incorrect password"
+        )
+    
+    user.hashed_password = await hash_password(new_password)
+    await db.commit()
+    invalidate_user(user.email)
     
-    return {"message": "User created successfully", "email": user.email}
\ No newline at end of file
+    return {"message": "Password updated successfully"}
\ No newline at end of file
@@ -0,0 +1,192 @@
+# backend/cache.py
+import os
+import re
+import json
+import time
+import hashlib
+from collections import OrderedDict
+from functools import lru_cache
+from .metrics import registry, Gauge
+
+# Response cache configuration
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+RESPONSE_CACHE_BACKEND = os.getenv("RESPONSE_CACHE_BACKEND", "memory")  # memory | redis
+RESPONSE_CACHE_URL = os.getenv("RESPONSE_CACHE_URL", "redis://localhost:6379/0")
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+
+
+class TTLCache:
+    """
+    Bounded in-process mapping with per-entry expiry and LRU eviction.
+
+    `on_evict(key, value)`, when given, is called whenever an entry leaves the
+    cache: expiry, LRU eviction, delete or clear.
+    """
+
+    def __init__(self, maxsize=1024, ttl=300, on_evict=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.on_evict = on_evict
+        self._data = OrderedDict()
+
+    def _evicted(self, key, item):
+        if self.on_evict is not None:
+            self.on_evict(key, item[1])
+
+    def get(self, key, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self._evicted(key, item)
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._evicted(*self._data.popitem(last=False))
+
+    def delete(self, key):
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._evicted(key, item)
+
+    def clear(self):
+        items, self._data = self._data, OrderedDict()
+        for key, item in items.items():
+            self._evicted(key, item)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class MemoryBackend:
+    """Default backend: a TTLCache local to this worker process"""
+
+    def __init__(self, maxsize, ttl):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key):
+        return self._cache.get(key)
+
+    async def set(self, key, value, ttl):
+        self._cache.set(key, value, ttl)
+
+    async def clear(self):
+        self._cache.clear()
+
+    def size(self):
+        return len(self._cache)
+
+
+class RedisBackend:
+    """Shared backend so every worker sees the same cached answers"""
+
+    def __init__(self, url, prefix="health_ai:response:"):
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the 'redis' package")
+        self._redis = redis.from_url(url)
+        self._prefix = prefix
+
+    async def get(self, key):
+        raw = await self._redis.get(self._prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key, value, ttl):
+        await self._redis.set(self._prefix + key, json.dumps(value), ex=max(1, int(ttl)))
+
+    async def clear(self):
+        async for key in self._redis.scan_iter(match=self._prefix + "*"):
+            await self._redis.delete(key)
+
+    def size(self):
+        return None
+
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.,;:]+$")
+
+
+def normalize_message(message: str):
+    """Case-fold and collapse whitespace so trivially different phrasings share a key"""
+    message = _WHITESPACE.sub(" ", message.strip().lower())
+    return _TRAILING_PUNCTUATION.sub("", message)
+
+
+@lru_cache(maxsize=8)
+def prompt_hash(system_prompt: str):
+    return hashlib.sha256(system_prompt.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """TTL/LRU cache of model answers keyed by the normalized request"""
+
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    def make_key(self, message, conversation_history, system_prompt, params):
+        key_material = json.dumps(
+            {
+                "message": normalize_message(message),
+                "history": [
+                    [msg.get("role"), msg.get("content")] for msg in conversation_history or []
+                ],
+                "system_prompt": prompt_hash(system_prompt),
+                "params": params,
+            },
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+
+    async def get(self, key):
+        value = await self.backend.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key, value):
+        await self.backend.set(key, value, self.ttl)
+
+    async def clear(self):
+        await self.backend.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "enabled": RESPONSE_CACHE_ENABLED,
+            "backend": RESPONSE_CACHE_BACKEND,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": self.backend.size(),
+        }
+
+
+def _create_backend():
+    if RESPONSE_CACHE_BACKEND == "redis":
+        return RedisBackend(RESPONSE_CACHE_URL)
+    return MemoryBackend(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+
+
+response_cache = ResponseCache(_create_backend(), RESPONSE_CACHE_TTL)
+
+# Scraped from /api/metrics
+registry.register(Gauge("response_cache_hits", "Response cache hits since start", callback=lambda: response_cache.hits))
+registry.register(Gauge("response_cache_misses", "Response cache misses since start", callback=lambda: response_cache.misses))
+registry.register(Gauge("response_cache_hit_ratio", "Response cache hit ratio since start",
+                        callback=lambda: response_cache.stats()["hit_rate"]))
@@ -0,0 +1,500 @@
+# backend/chat_service.py
+# Chat service layer: the HTTP routes in ai_model.py wrap these functions, and the
+# ReactPy pages (served by the same process) call them directly
+from fastapi import HTTPException
+from .models import User
+from .persistence import chat_writer
+from .model_client import post_model, stream_deltas
+from .cache import response_cache, RESPONSE_CACHE_ENABLED
+from .singleflight import model_requests, payload_key
+from .resilience import upstream_guard
+from .history import history_packer
+from .intents import mock_intents
+from .metrics import MODEL_TOKENS, FAQ_LOOKUPS
+from .faq import faq_index, format_passages, is_urgent, FAQ_ENABLED, FAQ_ANSWER_THRESHOLD, FAQ_CONTEXT_THRESHOLD
+from .summaries import conversation_summaries, SUMMARY_ENABLED
+import httpx
+import os
+from typing import Dict, List
+from datetime import datetime, timezone
+
+# Configuration for your custom model
+PLACEHOLDER_MODEL_URL = "https://your-model-endpoint.com/api/predict"
+CUSTOM_MODEL_URL = os.getenv("CUSTOM_MODEL_URL", PLACEHOLDER_MODEL_URL)
+CUSTOM_MODEL_API_KEY = os.getenv("CUSTOM_MODEL_API_KEY", "your-api-key-here")
+
+# Health context for your model
+HEALTH_CONTEXT = """
+You are a helpful AI health assistant. You provide general health information, 
+wellness tips, and answer health-related questions. However, you always include 
+important disclaimers:
+
+IMPORTANT: I am an AI assistant and cannot provide medical diagnosis, 
+treatment recommendations, or emergency advice. Please consult with qualified 
+healthcare professionals for medical concerns. In case of emergency, 
+contact your local emergency services immediately.
+
+When responding:
+1. Be empathetic and supportive
+2. Provide general wellness information
+3. Suggest consulting healthcare professionals for specific medical concerns
+4. Never diagnose conditions or recommend specific treatments
+5. Encourage healthy lifestyle choices
+6. Be clear about your limitations as an AI
+"""
+
+def get_model_headers():
+    return {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {CUSTOM_MODEL_API_KEY}"
+    }
+
+def build_system_prompt(reference: str = None):
+    """HEALTH_CONTEXT, plus retrieved FAQ passages when there are any"""
+    if not reference:
+        return HEALTH_CONTEXT
+    return f"{HEALTH_CONTEXT}\nReference answers from our health FAQ (use them if they are relevant):\n{reference}\n"
+
+def pack_history(conversation_history: List[Dict] = None, summary: str = None):
+    """Recent turns within the token budget, behind the stored summary if there is one"""
+    return history_packer.pack(conversation_history, summary=summary)
+
+def build_chat_payload(message: str, conversation_history: List[Dict] = None, summary: str = None,
+                       reference: str = None):
+    """Payload for models that take a message plus separate history"""
+    # Adjust this structure based on your model's expected input format
+    return {
+        "message": message,
+        "conversation_history": pack_history(conversation_history, summary),
+        "system_prompt": build_system_prompt(reference),
+        "max_tokens": 500,
+        "temperature": 0.7
+    }
+
+def build_custom_payload(message: str, conversation_history: List[Dict] = None, summary: str = None,
+                         reference: str = None):
+    """Payload for chat-completion style models (OpenAI `messages` format)"""
+    # Build conversation context
+    messages = []
+    
+    # Add system message
+    messages.append({"role": "system", "content": build_system_prompt(reference)})
+    
+    # Add as much recent history as fits the token budget
+    messages.extend(pack_history(conversation_history, summary))
+    
+    # Add current message
+    messages.append({"role": "user", "content": message})
+    
+    # Custom payload - adjust based on your model's requirements
+    return {
+        "messages": messages,
+        "max_tokens": 500,
+        "temperature": 0.7
+    }
+
+def record_token_usage(payload, completion, usage=None):
+    """Count prompt/completion tokens, preferring the model's own `usage` report"""
+    usage = usage or {}
+    prompt_tokens = usage.get("prompt_tokens")
+    if prompt_tokens is None:
+        if "messages" in payload:
+            prompt_tokens = sum(history_packer.count_message(msg) for msg in payload["messages"])
+        else:
+            prompt_tokens = (
+                history_packer.count_text(payload["message"])
+                + history_packer.count_text(payload["system_prompt"])
+                + sum(history_packer.count_message(msg) for msg in payload["conversation_history"])
+            )
+    completion_tokens = usage.get("completion_tokens")
+    if completion_tokens is None:
+        completion_tokens = history_packer.count_text(completion)
+    MODEL_TOKENS.inc(prompt_tokens, "prompt")
+    MODEL_TOKENS.inc(completion_tokens, "completion")
+
+def chat_answer(data):
+    """Answer text of a `message` format reply"""
+    # Adjust these field names based on your model's response structure
+    return data.get("response") or data.get("answer") or data.get("output")
+
+def custom_answer(data):
+    """Answer text of an OpenAI `messages` format reply"""
+    # Common patterns:
+    choices = data.get("choices", [{}])
+    if choices:
+        return choices[0].get("message", {}).get("content")
+    return data.get("text") or data.get("generated_text")
+
+async def complete(payload, answer):
+    """
+    One upstream completion through the circuit breaker and concurrency
+    limiter. Token usage is recorded here rather than by each caller, so a
+    call shared by several waiters is counted once.
+    """
+    response = await upstream_guard.call(lambda: post_model(
+        CUSTOM_MODEL_URL,
+        get_model_headers(),
+        payload,
+        timeout=30  # 30 second timeout
+    ))
+    if response.status_code == 200:
+        data = response.json()
+        text = answer(data)
+        if text:
+            record_token_usage(payload, text, data.get("usage"))
+    return response
+
+async def stream_completion(payload):
+    """Upstream stream of text deltas; like complete(), it records token usage once when it ends"""
+    parts = []
+    async for delta in upstream_guard.stream(
+        lambda: stream_deltas(CUSTOM_MODEL_URL, get_model_headers(), payload)
+    ):
+        parts.append(delta)
+        yield delta
+    record_token_usage(payload, "".join(parts))
+
+def get_cache_key(payload_format, message, history, payload, use_cache, cache_with_history):
+    """Response cache key for a request, or None when it must go upstream"""
+    if not (RESPONSE_CACHE_ENABLED and use_cache):
+        return None
+    if history and not cache_with_history:
+        return None
+    params = {
+        "format": payload_format,
+        "max_tokens": payload.get("max_tokens"),
+        "temperature": payload.get("temperature")
+    }
+    # The system prompt varies with the FAQ passages retrieved for the message
+    system_prompt = payload["system_prompt"] if "system_prompt" in payload else payload["messages"][0]["content"]
+    return response_cache.make_key(message, history, system_prompt, params)
+
+async def get_conversation_context(conversation_id, conversation_history: List[Dict] = None):
+    """
+    (summary, history) for the prompt. With a stored summary, the history is
+    every stored message after it, so no turn falls between the summary and
+    the recent messages; pack_history trims it to the token budget.
+    """
+    if not SUMMARY_ENABLED:
+        return None, conversation_history
+    summary, through_id = await conversation_summaries.get_summary(conversation_id)
+    if not summary:
+        return None, conversation_history
+    if not await chat_writer.flush_conversation(conversation_id, timeout=0):
+        # Recent turns are still queued: send the client's whole history instead,
+        # which also covers them, rather than wait on the request path
+        return summary, conversation_history
+    return summary, await conversation_summaries.turns_after(conversation_id, through_id)
+
+async def summarize_with_model(text: str, max_tokens: int):
+    """Ask the configured model for a summary (used when SUMMARY_MODE=model)"""
+    payload = {
+        "message": text,
+        "conversation_history": [],
+        "system_prompt": "Summarize this health conversation in a few short factual lines. Keep symptoms, goals and advice given.",
+        "max_tokens": max_tokens,
+        "temperature": 0.2
+    }
+    response = await upstream_guard.call(lambda: post_model(
+        CUSTOM_MODEL_URL, get_model_headers(), payload, timeout=30
+    ))
+    response.raise_for_status()
+    data = response.json()
+    choices = data.get("choices")
+    if choices:
+        summary = choices[0].get("message", {}).get("content")
+    else:
+        summary = data.get("response") or data.get("answer") or data.get("output")
+    if not summary:
+        raise ValueError("No summary found in model output")
+    return summary.strip()
+
+# Keep stored conversation summaries rolling as turns are persisted
+conversation_summaries.model_summarizer = summarize_with_model
+if SUMMARY_ENABLED:
+    chat_writer.flush_listeners.append(conversation_summaries.on_messages_written)
+
+def retrieve_faq(message: str):
+    """(direct answer or None, reference passages or None) from the local FAQ index"""
+    if not FAQ_ENABLED:
+        return None, None
+    hits = faq_index.search(message)
+    if hits and hits[0][1] >= FAQ_ANSWER_THRESHOLD and not is_urgent(message):
+        FAQ_LOOKUPS.inc(1.0, "answered")
+        return hits[0][0]["answer"], None
+    hits = [hit for hit in hits if hit[1] >= FAQ_CONTEXT_THRESHOLD]
+    FAQ_LOOKUPS.inc(1.0, "context" if hits else "miss")
+    return None, format_passages(hits) if hits else None
+
+async def resolve_conversation(conversation_id, user, message, conversation_key=None):
+    """
+    (conversation id, conversation key) this turn is stored in. When none is
+    given a new id is reserved; the conversation is only written together
+    with its first recorded turn. Anonymous callers must send the key they
+    got with the conversation to continue it.
+    """
+    user_id = user.id if user else None
+    if conversation_id is None:
+        return await chat_writer.open_conversation(user_id, title=message[:80])
+    if not await chat_writer.conversation_exists_for(conversation_id, user_id, conversation_key):
+        raise HTTPException(status_code=404, detail="Conversation not found")
+    return conversation_id, conversation_key
+
+def mock_response(message: str):
+    """Canned answer for the mock endpoint, picked by the compiled intent rules"""
+    return mock_intents.respond(message)
+
+# The background HealthProber; ai_model sets it when it creates the prober
+model_health = None
+
+def model_available():
+    """
+    False when CUSTOM_MODEL_URL is still the placeholder, the circuit is
+    open, or the last health probe could not reach the model
+    """
+    if CUSTOM_MODEL_URL == PLACEHOLDER_MODEL_URL:
+        return False
+    if upstream_guard.breaker.state == upstream_guard.breaker.OPEN:
+        return False
+    return model_health is None or model_health.snapshot()["status"] != "unavailable"
+
+async def offline_reply(message: str, user: User = None, conversation_id: int = None, conversation_key: str = None):
+    """
+    Answer without the model (FAQ, then the offline intent rules) and store
+    the turn like any other. Returns the same shape as chat().
+    """
+    asked_at = datetime.now(timezone.utc)
+    conversation_id, conversation_key = await resolve_conversation(conversation_id, user, message, conversation_key)
+    faq_answer, _ = retrieve_faq(message)
+    response = faq_answer or mock_response(message)
+    chat_writer.record_turn(conversation_id, message, response, asked_at)
+    return {
+        "response": response,
+        "conversation_id": conversation_id,
+        "conversation_key": conversation_key,
+        "timestamp": asked_at.isoformat(),
+        "source": "faq" if faq_answer else "offline"
+    }
+
+
+async def chat(
+    message: str,
+    conversation_history: List[Dict] = None,
+    use_cache: bool = True,
+    cache_with_history: bool = True,
+    conversation_id: int = None,
+    user: User = None,
+    conversation_key: str = None
+):
+    """Answer in the `message` payload format (FAQ, cache, then the model)"""
+    asked_at = datetime.now(timezone.utc)
+    conversation_id, conversation_key = await resolve_conversation(conversation_id, user, message, conversation_key)
+
+    # Common questions are answered from the local FAQ without calling the model
+    faq_answer, reference = retrieve_faq(message)
+    if faq_answer:
+        chat_writer.record_turn(conversation_id, message, faq_answer, asked_at)
+        return {
+            "response": faq_answer,
+            "conversation_id": conversation_id,
+            "conversation_key": conversation_key,
+            "timestamp": asked_at.isoformat(),
+            "source": "faq"
+        }
+
+    summary, history = await get_conversation_context(conversation_id, conversation_history)
+    try:
+        payload = build_chat_payload(message, history, summary, reference)
+        
+        # Serve repeated questions from the response cache
+        cache_key = get_cache_key(
+            "message", message, payload["conversation_history"], payload,
+            use_cache, cache_with_history
+        )
+        if cache_key:
+            cached = await response_cache.get(cache_key)
+            if cached is not None:
+                chat_writer.record_turn(conversation_id, message, cached["response"], asked_at)
+                return {**cached, "conversation_id": conversation_id, "conversation_key": conversation_key}
+        
+        # Identical requests already in flight share one upstream call
+        response = await model_requests.do(
+            payload_key(CUSTOM_MODEL_URL, payload), lambda: complete(payload, chat_answer)
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            
+            # Extract the response based on your model's output format
+            ai_response = chat_answer(data)
+            
+            if not ai_response:
+                raise ValueError("No response found in model output")
+                
+            result = {
+                "response": ai_response,
+                "conversation_id": data.get("conversation_id"),
+                "timestamp": data.get("timestamp")
+            }
+            if cache_key:
+                await response_cache.set(cache_key, result)
+            # Persisted by the write-behind queue, off the request path
+            chat_writer.record_turn(conversation_id, message, ai_response, asked_at)
+            return {**result, "conversation_id": conversation_id, "conversation_key": conversation_key}
+        else:
+            # Handle API errors
+            error_detail = f"Model API returned status {response.status_code}"
+            try:
+                error_data = response.json()
+                error_detail = error_data.get('error', error_detail)
+            except:
+                pass
+                
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=error_detail
+            )
+            
+    except httpx.TimeoutException:
+        raise HTTPException(
+            status_code=408,
+            detail="Model request timeout - please try again"
+        )
+    except httpx.ConnectError:
+        raise HTTPException(
+            status_code=503,
+            detail="Cannot connect to AI model service"
+        )
+    except Exception as e:
+        # Fallback response if AI service is unavailable
+        print(f"AI Service Error: {e}")
+        return {
+            "response": f"I understand you're asking about health-related matters. Currently, I'm experiencing technical difficulties. For immediate health concerns, please consult with a healthcare professional. You can try again shortly. (Error: {str(e)})",
+            "error": "AI service temporarily unavailable",
+            "timestamp": "2024-01-01T00:00:00Z"
+        }
+
+async def chat_custom(
+    message: str,
+    conversation_history: List[Dict] = None,
+    use_cache: bool = True,
+    cache_with_history: bool = True,
+    conversation_id: int = None,
+    user: User = None,
+    conversation_key: str = None
+):
+    """Answer in the OpenAI `messages` payload format"""
+    asked_at = datetime.now(timezone.utc)
+    conversation_id, conversation_key = await resolve_conversation(conversation_id, user, message, conversation_key)
+    summary, history = await get_conversation_context(conversation_id, conversation_history)
+    try:
+        payload = build_custom_payload(message, history, summary)
+        
+        cache_key = get_cache_key(
+            "messages", message, payload["messages"][1:-1],
+            payload, use_cache, cache_with_history
+        )
+        if cache_key:
+            cached = await response_cache.get(cache_key)
+            if cached is not None:
+                chat_writer.record_turn(conversation_id, message, cached["response"], asked_at)
+                return {**cached, "conversation_id": conversation_id, "conversation_key": conversation_key}
+        
+        response = await model_requests.do(
+            payload_key(CUSTOM_MODEL_URL, payload), lambda: complete(payload, custom_answer)
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            
+            # Extract response - adjust based on your model's output format
+            ai_response = custom_answer(data)
+            
+            if not ai_response:
+                ai_response = "I received your message but couldn't generate a proper response."
+                cache_key = None  # don't cache the placeholder
+                
+            result = {
+                "response": ai_response,
+                "conversation_id": data.get("id"),
+                "timestamp": data.get("created")
+            }
+            if cache_key:
+                await response_cache.set(cache_key, result)
+            chat_writer.record_turn(conversation_id, message, ai_response, asked_at)
+            return {**result, "conversation_id": conversation_id, "conversation_key": conversation_key}
+        else:
+            raise HTTPException(
+                status_code=response.status_code,
+                detail=f"Model API error: {response.text}"
+            )
+            
+    except Exception as e:
+        print(f"Custom model error: {e}")
+        return {
+            "response": "I'm having trouble connecting to my AI capabilities right now. Please try again in a moment.",
+            "error": str(e),
+            "timestamp": "2024-01-01T00:00:00Z"
+        }
+
+async def open_stream(
+    message: str,
+    conversation_history: List[Dict] = None,
+    payload_format: str = "message",
+    conversation_id: int = None,
+    user: User = None,
+    use_faq: bool = False,
+    conversation_key: str = None
+):
+    """
+    Start a streamed answer; returns (conversation_id, conversation_key, deltas).
+
+    `deltas` is an async iterator of text fragments. The turn is persisted
+    once it has been read to the end; closing it early cancels the upstream
+    stream. With `use_faq`, FAQ hits answer directly or add context as in chat().
+    """
+    asked_at = datetime.now(timezone.utc)
+    conversation_id, conversation_key = await resolve_conversation(conversation_id, user, message, conversation_key)
+    faq_answer, reference = retrieve_faq(message) if use_faq else (None, None)
+
+    if faq_answer:
+        async def faq_deltas():
+            yield faq_answer
+            chat_writer.record_turn(conversation_id, message, faq_answer, asked_at)
+        return conversation_id, conversation_key, faq_deltas()
+
+    summary, history = await get_conversation_context(conversation_id, conversation_history)
+    if payload_format == "messages":
+        payload = build_custom_payload(message, history, summary, reference)
+    else:
+        payload = build_chat_payload(message, history, summary, reference)
+
+    async def deltas():
+        parts = []
+        # Identical streams in flight share one upstream; each waiter gets its own copy
+        async for delta in model_requests.stream(
+            payload_key(CUSTOM_MODEL_URL, payload), lambda: stream_completion(payload)
+        ):
+            parts.append(delta)
+            yield delta
+        chat_writer.record_turn(conversation_id, message, "".join(parts), asked_at)
+
+    return conversation_id, conversation_key, deltas()
+
+async def stream_reply(message: str, conversation_history: List[Dict] = None, on_token=None, **options):
+    """
+    Stream an answer in-process, calling `on_token(delta)` with each fragment
+    as it arrives. Returns the same shape as chat(). Options are those of open_stream.
+    """
+    conversation_id, conversation_key, deltas = await open_stream(message, conversation_history, **options)
+    parts = []
+    async for delta in deltas:
+        parts.append(delta)
+        if on_token is not None:
+            on_token(delta)
+    return {
+        "response": "".join(parts),
+        "conversation_id": conversation_id,
+        "conversation_key": conversation_key,
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    }
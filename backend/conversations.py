@@ -0,0 +1,136 @@
+# backend/conversations.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import get_db, AsyncSessionLocal
+from .models import User, Conversation, Message
+from .auth import get_current_user
+from .search import search_messages
+from datetime import datetime
+import base64
+import json
+
+router = APIRouter(prefix="/conversations", tags=["conversations"])
+
+
+def encode_cursor(timestamp: datetime, row_id: int):
+    """Opaque keyset cursor: the (timestamp, id) of the last row on a page"""
+    raw = json.dumps([timestamp.isoformat() if timestamp else None, row_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str):
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(timestamp), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def serialize_message(message: Message):
+    return {
+        "id": message.id,
+        "role": "user" if message.is_user else "assistant",
+        "content": message.content,
+        "created_at": message.created_at.isoformat() if message.created_at else None,
+    }
+
+
+async def list_conversations(db: AsyncSession, user_id: int, limit: int = 20, cursor: str = None):
+    """One page of a user's conversations, most recently updated first"""
+    query = select(Conversation).where(Conversation.user_id == user_id)
+    if cursor:
+        updated_at, conversation_id = decode_cursor(cursor)
+        query = query.where(
+            tuple_(Conversation.updated_at, Conversation.id) < tuple_(updated_at, conversation_id)
+        )
+    query = query.order_by(Conversation.updated_at.desc(), Conversation.id.desc()).limit(limit + 1)
+    rows = (await db.execute(query)).scalars().all()
+
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(page[-1].updated_at, page[-1].id)
+    return {
+        "conversations": [
+            {
+                "id": conversation.id,
+                "title": conversation.title,
+                "created_at": conversation.created_at.isoformat() if conversation.created_at else None,
+                "updated_at": conversation.updated_at.isoformat() if conversation.updated_at else None,
+            }
+            for conversation in page
+        ],
+        "next_cursor": next_cursor,
+    }
+
+
+async def list_messages(db: AsyncSession, conversation_id: int, limit: int = 50, before: str = None):
+    """
+    One page of a thread, returned oldest to newest.
+
+    Without `before` this is the newest page; pass the returned `next_cursor`
+    as `before` to walk back through older messages.
+    """
+    query = select(Message).where(Message.conversation_id == conversation_id)
+    if before:
+        created_at, message_id = decode_cursor(before)
+        query = query.where(tuple_(Message.created_at, Message.id) < tuple_(created_at, message_id))
+    query = query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit + 1)
+    rows = (await db.execute(query)).scalars().all()
+
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor(page[-1].created_at, page[-1].id)
+    return {
+        "messages": [serialize_message(message) for message in reversed(page)],
+        "next_cursor": next_cursor,
+    }
+
+
+async def load_message_page(conversation_id: int, limit: int = 50, before: str = None):
+    """list_messages in its own session, for in-process callers such as the ReactPy pages"""
+    async with AsyncSessionLocal() as db:
+        return await list_messages(db, conversation_id, limit, before)
+
+
+async def get_owned_conversation(db: AsyncSession, conversation_id: int, user: User):
+    conversation = await db.get(Conversation, conversation_id)
+    if conversation is None or conversation.user_id != user.id:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+    return conversation
+
+
+@router.get("")
+async def get_conversations(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    return await list_conversations(db, current_user.id, limit, cursor)
+
+
+@router.get("/search")
+async def search_conversations(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Full-text search over the caller's own messages, best match first"""
+    return await search_messages(db, current_user.id, q, limit, cursor)
+
+
+@router.get("/{conversation_id}/messages")
+async def get_conversation_messages(
+    conversation_id: int,
+    limit: int = Query(50, ge=1, le=200),
+    before: str = None,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    await get_owned_conversation(db, conversation_id, current_user)
+    return await list_messages(db, conversation_id, limit, before)
@@ -1,14 +1,128 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from .metrics import instrument_pool
+import os
 
-DATABASE_URL = "sqlite:///./health_ai.db"
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./health_ai.db")
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+def _async_url(url):
+    """Map a sync database URL onto its asyncio driver (aiosqlite / asyncpg)"""
+    scheme, sep, rest = url.partition("://")
+    backend = scheme.split("+", 1)[0]
+    if backend == "sqlite":
+        return f"sqlite+aiosqlite{sep}{rest}"
+    if backend in ("postgresql", "postgres"):
+        return f"postgresql+asyncpg{sep}{rest}"
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", _async_url(DATABASE_URL))
+
+# Connection budget across all uvicorn workers; each process gets its share
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "20"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", str(max(1, DB_MAX_CONNECTIONS // WEB_CONCURRENCY))))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+
+# SQLite tuning, applied to every new connection
+SQLITE_TUNED = os.getenv("SQLITE_TUNED", "1") == "1"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+
+
+def _engine_options(url):
+    options = {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW, "pool_timeout": DB_POOL_TIMEOUT}
+    if url.startswith("sqlite"):
+        if ":memory:" in url or url.rstrip("/").endswith("sqlite:"):
+            # In-memory databases live in a single connection
+            return {"connect_args": {"check_same_thread": False}}
+        options["connect_args"] = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+        if "+aiosqlite" in url:
+            # aiosqlite defaults to NullPool; keep connections (and their pragmas) around
+            options["poolclass"] = AsyncAdaptedQueuePool
+    else:
+        options["pool_pre_ping"] = True
+    return options
+
+
+def apply_sqlite_pragmas(dbapi_connection, connection_record=None):
+    # WAL lets readers run alongside the single writer; NORMAL sync is safe with WAL
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+if IS_SQLITE and SQLITE_TUNED:
+    event.listen(engine, "connect", apply_sqlite_pragmas)
+instrument_pool(engine.pool, "sync")
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+# Async engine used by the API routers
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL))
+if IS_SQLITE and SQLITE_TUNED:
+    event.listen(async_engine.sync_engine, "connect", apply_sqlite_pragmas)
+instrument_pool(async_engine.sync_engine.pool, "async")
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
+async def get_db():
+    """
+    Shared async session dependency for all routers.
+
+    An AsyncSession only checks a connection out of the pool on its first
+    query, so endpoints that declare `db` without using it cost nothing.
+    """
+    async with AsyncSessionLocal() as session:
+        yield session
+
+def _add_missing_columns(conn):
+    # create_all does not alter existing tables; add nullable columns introduced later
+    existing_tables = set(inspect(conn).get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {column["name"] for column in inspect(conn).get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in present and column.nullable:
+                column_type = column.type.compile(dialect=conn.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
 def init_db():
     # create tables
     from . import models
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        _add_missing_columns(conn)
+        # create_all skips existing tables, so add indexes introduced later
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+        # Rows written before updated_at had a default sort by creation time
+        conn.execute(text("UPDATE conversations SET updated_at = created_at WHERE updated_at IS NULL"))
+        # Conversation ids are allocated in blocks; start past every existing row
+        conn.execute(text(
+            "INSERT INTO id_blocks (name, next_id) SELECT 'conversations', COALESCE(MAX(id), 0) + 1 "
+            "FROM conversations WHERE NOT EXISTS (SELECT 1 FROM id_blocks WHERE name = 'conversations')"
+        ))
+        conn.execute(text(
+            "UPDATE id_blocks SET next_id = (SELECT MAX(id) + 1 FROM conversations) "
+            "WHERE name = 'conversations' AND next_id <= (SELECT MAX(id) FROM conversations)"
+        ))
+        # Full-text index over message content
+        from .search import install_fts
+        install_fts(conn)
+
@@ -0,0 +1,190 @@
+# backend/faq.py
+import os
+import re
+import json
+import math
+import hashlib
+import numpy as np
+
+# Local FAQ retrieval in front of the model
+_DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+FAQ_ENABLED = os.getenv("FAQ_ENABLED", "1") == "1"
+FAQ_FILE = os.getenv("FAQ_FILE", os.path.join(_DATA_DIR, "faq.json"))
+FAQ_INDEX_DIR = os.getenv("FAQ_INDEX_DIR", os.path.join(_DATA_DIR, "faq_index"))
+FAQ_ANSWER_THRESHOLD = float(os.getenv("FAQ_ANSWER_THRESHOLD", "0.75"))
+FAQ_CONTEXT_THRESHOLD = float(os.getenv("FAQ_CONTEXT_THRESHOLD", "0.3"))
+FAQ_TOP_K = int(os.getenv("FAQ_TOP_K", "3"))
+
+_WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be can do does for from how i if in is it me my of on or should "
+    "the to what when which who why will with you your".split()
+)
+
+
+def tokenize(text):
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        if word in STOPWORDS:
+            continue
+        # Cheap plural folding so "headaches" finds "headache"
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+# Canned FAQ answers are written for routine adult questions. Anything that
+# mentions an emergency sign, pregnancy or a child goes to the model instead.
+URGENT_TERMS = frozenset(tokenize(
+    "bleed bleeding unconscious unresponsive faint fainted fainting seizure seizures "
+    "overdose overdosed poison poisoned poisoning suicide suicidal choking breathe breathing "
+    "emergency severe pregnant pregnancy unborn baby babies newborn newborns infant infants "
+    "toddler toddlers child children kid kids"
+))
+
+
+def is_urgent(text):
+    return not URGENT_TERMS.isdisjoint(tokenize(text))
+
+
+class FaqIndex:
+    """
+    TF-IDF index over the FAQ questions.
+
+    Every question phrasing is one row of an L2-normalized float32 matrix,
+    stored as .npy next to its vocabulary and memory-mapped on load. The
+    index is rebuilt when the FAQ file changes. Queries are scored in a
+    batch with one matrix product, then reduced to the best row per entry.
+    """
+
+    def __init__(self, faq_file, index_dir):
+        self.faq_file = faq_file
+        self.index_dir = index_dir
+        self.entries = None
+        self._matrix = None
+        self._vocabulary = None
+        self._idf = None
+        self._row_entries = None
+        self._unknown_idf = None
+
+    def _load(self):
+        with open(self.faq_file, "rb") as f:
+            raw = f.read()
+        source_hash = hashlib.sha256(raw).hexdigest()
+        self.entries = json.loads(raw)
+
+        meta_path = os.path.join(self.index_dir, "meta.json")
+        matrix_path = os.path.join(self.index_dir, "matrix.npy")
+        meta = None
+        if os.path.exists(meta_path) and os.path.exists(matrix_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if meta.get("source_hash") != source_hash:
+                meta = None
+        if meta is None:
+            meta = self._build(source_hash, meta_path, matrix_path)
+
+        self._vocabulary = meta["vocabulary"]
+        self._idf = np.asarray(meta["idf"], dtype=np.float32)
+        self._row_entries = np.asarray(meta["row_entries"], dtype=np.int64)
+        # idf of a term seen in no row
+        self._unknown_idf = math.log(1 + len(self._row_entries)) + 1
+        self._matrix = np.load(matrix_path, mmap_mode="r")
+
+    def _build(self, source_hash, meta_path, matrix_path):
+        rows, row_entries = [], []
+        for entry_index, entry in enumerate(self.entries):
+            for question in entry["questions"]:
+                rows.append(tokenize(question))
+                row_entries.append(entry_index)
+
+        vocabulary = {}
+        document_frequency = []
+        for tokens in rows:
+            for token in set(tokens):
+                if token not in vocabulary:
+                    vocabulary[token] = len(vocabulary)
+                    document_frequency.append(0)
+                document_frequency[vocabulary[token]] += 1
+        idf = [math.log((1 + len(rows)) / (1 + df)) + 1 for df in document_frequency]
+
+        matrix = np.zeros((len(rows), len(vocabulary)), dtype=np.float32)
+        for row, tokens in enumerate(rows):
+            self._fill(matrix[row], tokens, vocabulary, idf)
+
+        # Matrix first, then meta: a meta file with the right hash marks a complete index.
+        # Temp files plus os.replace keep concurrent workers from reading half-written files.
+        os.makedirs(self.index_dir, exist_ok=True)
+        suffix = f".{os.getpid()}.tmp"
+        with open(matrix_path + suffix, "wb") as f:
+            np.save(f, matrix)
+        os.replace(matrix_path + suffix, matrix_path)
+        meta = {"source_hash": source_hash, "vocabulary": vocabulary, "idf": idf, "row_entries": row_entries}
+        with open(meta_path + suffix, "w") as f:
+            json.dump(meta, f)
+        os.replace(meta_path + suffix, meta_path)
+        return meta
+
+    @staticmethod
+    def _fill(vector, tokens, vocabulary, idf, unknown_idf=None):
+        """
+        Write the normalized sublinear TF-IDF weights of `tokens` into `vector`.
+
+        With `unknown_idf`, words outside the vocabulary still count toward
+        the norm (as if they were the rarest term), so a query is not scored
+        as a perfect match just because its unknown words were dropped.
+        """
+        counts = {}
+        unknown = {}
+        for token in tokens:
+            column = vocabulary.get(token)
+            if column is not None:
+                counts[column] = counts.get(column, 0) + 1
+            elif unknown_idf is not None:
+                unknown[token] = unknown.get(token, 0) + 1
+        for column, count in counts.items():
+            vector[column] = (1 + math.log(count)) * idf[column]
+        norm_squared = float(np.dot(vector, vector))
+        for count in unknown.values():
+            norm_squared += ((1 + math.log(count)) * unknown_idf) ** 2
+        if norm_squared:
+            vector /= math.sqrt(norm_squared)
+
+    def search_batch(self, queries, k=FAQ_TOP_K):
+        """For each query, up to k (entry, cosine score) pairs, best first"""
+        if self._matrix is None:
+            self._load()
+        if not queries or not len(self._matrix):
+            return [[] for _ in queries]
+
+        vectors = np.zeros((len(queries), self._matrix.shape[1]), dtype=np.float32)
+        for row, query in enumerate(queries):
+            self._fill(vectors[row], tokenize(query), self._vocabulary, self._idf, self._unknown_idf)
+        row_scores = vectors @ self._matrix.T  # (queries, rows)
+
+        # Best phrasing per entry
+        entry_scores = np.zeros((len(self.entries), len(queries)), dtype=np.float32)
+        np.maximum.at(entry_scores, self._row_entries, row_scores.T)
+        entry_scores = entry_scores.T
+
+        k = min(k, len(self.entries))
+        top = np.argpartition(-entry_scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in enumerate(top):
+            ranked = sorted(candidates, key=lambda entry_index: -entry_scores[row, entry_index])
+            results.append([
+                (self.entries[entry_index], float(entry_scores[row, entry_index]))
+                for entry_index in ranked if entry_scores[row, entry_index] > 0
+            ])
+        return results
+
+    def search(self, query, k=FAQ_TOP_K):
+        return self.search_batch([query], k)[0]
+
+
+def format_passages(hits):
+    return "\n".join(f"- Q: {entry['questions'][0]}\n  A: {entry['answer']}" for entry, _ in hits)
+
+
+faq_index = FaqIndex(FAQ_FILE, FAQ_INDEX_DIR)
@@ -0,0 +1,88 @@
+# backend/health_probe.py
+import os
+import time
+import asyncio
+from collections import deque
+
+# Background health probing of the model upstream
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "30"))
+HEALTH_PROBE_WINDOW = int(os.getenv("HEALTH_PROBE_WINDOW", "50"))
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class HealthProber:
+    """
+    Probes the model on a schedule and keeps the results in memory.
+
+    `probe` is a coroutine function returning the upstream HTTP status code.
+    The health endpoint reads `snapshot()`, so load-balancer polls never
+    reach the model themselves.
+    """
+
+    def __init__(self, probe, interval=30.0, window=50):
+        self.probe = probe
+        self.interval = interval
+        self._samples = deque(maxlen=window)  # (latency_seconds, ok)
+        self._last = None  # (finished_at, status_code or None, error or None)
+        self._task = None
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.probe_once()
+            await asyncio.sleep(self.interval)
+
+    async def probe_once(self):
+        start = time.perf_counter()
+        status_code, error = None, None
+        try:
+            status_code = await self.probe()
+        except Exception as e:
+            error = str(e) or e.__class__.__name__
+        latency = time.perf_counter() - start
+        self._samples.append((latency, status_code == 200))
+        self._last = (time.time(), status_code, error)
+
+    def snapshot(self):
+        if self._last is None:
+            return {"status": "unknown", "ai_service": "not_probed_yet", "age_seconds": None}
+
+        finished_at, status_code, error = self._last
+        if status_code == 200:
+            result = {"status": "healthy", "ai_service": "responsive"}
+        elif status_code is not None:
+            result = {"status": "degraded", "ai_service": "responding_with_errors"}
+        else:
+            result = {"status": "unavailable", "ai_service": "offline", "error": error}
+
+        latencies = sorted(latency for latency, _ in self._samples)
+        failures = sum(1 for _, ok in self._samples if not ok)
+        result.update({
+            "age_seconds": round(time.time() - finished_at, 3),
+            "probe_interval_seconds": self.interval,
+            "samples": len(self._samples),
+            "error_rate": failures / len(self._samples),
+            "latency_ms": {
+                name: round(percentile(latencies, fraction) * 1000, 1)
+                for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))
+            },
+        })
+        return result
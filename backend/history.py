@@ -0,0 +1,148 @@
+# backend/history.py
+import os
+import re
+from functools import lru_cache
+
+# Conversation history packing configuration
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "1500"))
+HISTORY_TOKENIZER = os.getenv("HISTORY_TOKENIZER", "simple")  # simple | tiktoken
+HISTORY_TIKTOKEN_ENCODING = os.getenv("HISTORY_TIKTOKEN_ENCODING", "cl100k_base")
+HISTORY_SUMMARIZE = os.getenv("HISTORY_SUMMARIZE", "1") == "1"
+HISTORY_SUMMARY_TOKENS = int(os.getenv("HISTORY_SUMMARY_TOKENS", "200"))
+HISTORY_COUNT_CACHE_SIZE = int(os.getenv("HISTORY_COUNT_CACHE_SIZE", "16384"))
+
+# Per-message framing cost (role, separators) in chat-style prompts
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+class SimpleTokenizer:
+    """Dependency-free approximation: words and punctuation marks count as tokens"""
+
+    name = "simple"
+
+    def count(self, text: str):
+        return len(_TOKEN_PATTERN.findall(text))
+
+
+class TiktokenTokenizer:
+    """Exact BPE counts for OpenAI-style models (needs the optional tiktoken package)"""
+
+    name = "tiktoken"
+
+    def __init__(self, encoding=HISTORY_TIKTOKEN_ENCODING):
+        try:
+            import tiktoken
+        except ImportError:
+            raise RuntimeError("HISTORY_TOKENIZER=tiktoken requires the 'tiktoken' package")
+        self._encoding = tiktoken.get_encoding(encoding)
+
+    def count(self, text: str):
+        return len(self._encoding.encode(text))
+
+
+TOKENIZERS = {
+    "simple": SimpleTokenizer,
+    "tiktoken": TiktokenTokenizer,
+}
+
+
+def get_tokenizer(name: str):
+    if name not in TOKENIZERS:
+        raise ValueError(f"Unknown tokenizer '{name}', expected one of {sorted(TOKENIZERS)}")
+    return TOKENIZERS[name]()
+
+
+def extractive_summary(messages, max_tokens, count):
+    """Keep the first sentence of each turn, newest lines first, within max_tokens"""
+    lines = []
+    used = 0
+    for msg in reversed(messages):
+        content = (msg.get("content") or "").strip()
+        if not content:
+            continue
+        first_sentence = _SENTENCE_END.split(content, 1)[0]
+        line = f"{'User' if msg.get('role') == 'user' else 'Assistant'}: {first_sentence}"
+        cost = count(line)
+        if used + cost > max_tokens:
+            break
+        lines.append(line)
+        used += cost
+    return "\n".join(reversed(lines))
+
+
+class HistoryPacker:
+    """
+    Fill a token budget with the newest turns of a conversation.
+
+    Turns are taken newest to oldest until the next one would not fit. Turns
+    that fall outside the budget can be folded into a short summary message.
+    Token counts are memoized per message text, so re-packing a growing
+    history only counts the new messages.
+    """
+
+    def __init__(self, tokenizer, budget=1500, summarize=True, summary_tokens=200,
+                 summarizer=extractive_summary, cache_size=16384):
+        self.tokenizer = tokenizer
+        self.budget = budget
+        self.summarize = summarize
+        self.summary_tokens = summary_tokens
+        self.summarizer = summarizer
+        self.count_text = lru_cache(maxsize=cache_size)(tokenizer.count)
+
+    def count_message(self, msg):
+        return MESSAGE_OVERHEAD_TOKENS + self.count_text(msg.get("content") or "")
+
+    def pack(self, history, budget=None, summary=None):
+        """
+        Return the history to send upstream.
+
+        `summary` is an already known summary of earlier turns (e.g. one stored
+        on the conversation); it is sent instead of summarizing on the fly.
+        """
+        if not history and not summary:
+            return []
+        budget = self.budget if budget is None else budget
+        history = history or []
+
+        summary_message = None
+        if summary:
+            summary_message = self._summary_message(summary)
+            budget -= self.count_message(summary_message)
+
+        used = 0
+        start = len(history)
+        while start > 0:
+            cost = self.count_message(history[start - 1])
+            if used + cost > budget:
+                break
+            used += cost
+            start -= 1
+
+        packed = list(history[start:])
+        if summary_message is None and start > 0 and self.summarize:
+            text = self.summarizer(history[:start], self.summary_tokens, self.count_text)
+            if text:
+                summary_message = self._summary_message(text)
+                # Make room for the summary by dropping the oldest kept turns
+                used += self.count_message(summary_message)
+                while packed and used > budget:
+                    used -= self.count_message(packed.pop(0))
+        if summary_message is not None:
+            packed.insert(0, summary_message)
+        return packed
+
+    @staticmethod
+    def _summary_message(text):
+        return {"role": "system", "content": f"Summary of the earlier conversation:\n{text}"}
+
+
+history_packer = HistoryPacker(
+    get_tokenizer(HISTORY_TOKENIZER),
+    budget=HISTORY_TOKEN_BUDGET,
+    summarize=HISTORY_SUMMARIZE,
+    summary_tokens=HISTORY_SUMMARY_TOKENS,
+    cache_size=HISTORY_COUNT_CACHE_SIZE,
+)
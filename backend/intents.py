@@ -0,0 +1,93 @@
+# backend/intents.py
+import os
+import re
+import json
+
+# Rules for the mock / offline responder
+INTENTS_FILE = os.getenv(
+    "INTENTS_FILE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "intents.json")
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_keyword(keyword):
+    return _WHITESPACE.sub(" ", keyword.strip().lower())
+
+
+def trie_pattern(keywords):
+    """
+    Regex alternation for `keywords` with shared prefixes factored out,
+    e.g. ["he", "hello", "hey"] -> "he(?:llo|y)?". Spaces match any run
+    of whitespace.
+    """
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        node[""] = {}
+    return _node_pattern(trie) or ""
+
+
+def _node_pattern(node):
+    optional = "" in node
+    branches = []
+    for char in sorted(key for key in node if key):
+        atom = r"\s+" if char == " " else re.escape(char)
+        branches.append(atom + (_node_pattern(node[char]) or ""))
+    if not branches:
+        return None
+    pattern = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if optional:
+        pattern = pattern + "?" if len(branches) > 1 else "(?:" + pattern + ")?"
+    return pattern
+
+
+class IntentMatcher:
+    """
+    Keyword intents compiled into a single word-bounded regex.
+
+    A message is scanned once; every keyword hit maps back to its intent and
+    the hit with the highest priority wins (earlier rules win ties). Adding
+    intents grows the regex, not the number of passes over the message.
+    """
+
+    def __init__(self, intents, fallback):
+        self.intents = intents
+        self.fallback = fallback
+        # keyword -> (priority, -rule order, intent); the max over hits wins
+        self._by_keyword = {}
+        for order, intent in enumerate(intents):
+            rank = (intent.get("priority", 0), -order)
+            for keyword in intent["keywords"]:
+                keyword = normalize_keyword(keyword)
+                current = self._by_keyword.get(keyword)
+                if current is None or rank > current[:2]:
+                    self._by_keyword[keyword] = (*rank, intent)
+        self._pattern = re.compile(r"\b(?:" + trie_pattern(self._by_keyword) + r")\b", re.IGNORECASE)
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["intents"], data["fallback"])
+
+    def match(self, message):
+        """Best matching intent for `message`, or None"""
+        if not self._by_keyword:
+            return None
+        best = None
+        for hit in self._pattern.finditer(message):
+            candidate = self._by_keyword[normalize_keyword(hit.group(0))]
+            if best is None or candidate[:2] > best[:2]:
+                best = candidate
+        return best[2] if best else None
+
+    def respond(self, message):
+        intent = self.match(message)
+        template = intent["response"] if intent else self.fallback
+        return template.replace("{message}", message)
+
+
+mock_intents = IntentMatcher.from_file(INTENTS_FILE)
@@ -1,8 +1,9 @@
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
 from reactpy.backend.fastapi import configure
 from dotenv import load_dotenv
+from contextlib import asynccontextmanager
 import os
 
 """# directory of the current file (e.g., backend/)
@@ -13,20 +14,41 @@ PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 sys.path.append(PROJECT_ROOT)"""
 
 
+# Load environment variables (before internal modules read their settings)
+load_dotenv()
+
 # Import internal modules
-from backend.database import init_db
-from . import auth, ai_model
+from backend.database import init_db, async_engine
+from . import auth, ai_model, conversations
+from .model_client import close_client
+from .persistence import chat_writer
+from .metrics import MetricsMiddleware, registry
 
 # Import the ReactPy frontend component
 from frontend.app import frontend_app
+from frontend.styles.registry import styles
 
-# Load environment variables
-load_dotenv()
+# ==========================================
+# Application lifespan (startup / shutdown)
+# ==========================================
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    chat_writer.start()
+    ai_model.health_prober.start()
+    yield
+    await ai_model.health_prober.stop()
+    # Drain queued chat messages before the process exits
+    await chat_writer.stop()
+    # Close pooled keep-alive connections to the model gateway
+    await close_client()
+    auth.shutdown_password_executor()
+    await async_engine.dispose()
 
 # ==========================================
 # Create main FastAPI application
 # ==========================================
 app = FastAPI(
+    lifespan=lifespan,
     title="Health AI Assistant",
     description="AI-powered healthcare companion with secure authentication",
     version="1.0.0",
@@ -38,7 +60,7 @@ app = FastAPI(
 init_db()
 
 # ==========================================
-# Middleware (CORS)
+# Middleware (CORS, request metrics)
 # ==========================================
 app.add_middleware(
     CORSMiddleware,
@@ -47,12 +69,14 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
 
 # ==========================================
 # Include Routers (APIs)
 # ==========================================
 app.include_router(auth.router)
 app.include_router(ai_model.router)
+app.include_router(conversations.router)
 
 # ==========================================
 # Backend API Routes
@@ -66,9 +90,24 @@ async def health_check():
     return {
         "status": "healthy", 
         "service": "Health AI Backend",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "chat_write_queue_depth": chat_writer.depth
     }
 
+@app.get("/api/metrics")
+async def metrics():
+    """Prometheus text exposition of request, upstream, DB and auth timings"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/styles.css")
+async def stylesheet():
+    """Frontend CSS generated from the style registry; the URL carries its version"""
+    return Response(
+        styles.stylesheet(),
+        media_type="text/css",
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
 @app.get("/api/home")
 async def home():
     return {
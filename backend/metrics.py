@@ -0,0 +1,207 @@
+# backend/metrics.py
+import time
+from bisect import bisect_left
+
+# Latency buckets in seconds, shared by every histogram unless overridden
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _format_labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class Counter:
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def inc(self, amount=1.0, *labelvalues):
+        self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for labelvalues, value in self._values.items():
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}")
+        return lines
+
+
+class Gauge:
+    """Set directly, or computed at scrape time when `callback` is given"""
+
+    def __init__(self, name, documentation, callback=None):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.value = 0.0
+
+    def inc(self, amount=1.0):
+        self.value += amount
+
+    def dec(self, amount=1.0):
+        self.value -= amount
+
+    def set(self, value):
+        self.value = value
+
+    def render(self):
+        value = self.callback() if self.callback is not None else self.value
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge", f"{self.name} {value}"]
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Each label set owns one preallocated list of
+    bucket counts, so observing a value is a bisect and two additions.
+    """
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}  # labelvalues -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, value, *labelvalues):
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def time(self, *labelvalues):
+        return _Timer(self, labelvalues)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        labelnames = self.labelnames + ("le",)
+        for labelvalues, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(labelnames, labelvalues + (bound,))} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {series[-1]}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("histogram", "labelvalues", "start")
+
+    def __init__(self, histogram, labelvalues):
+        self.histogram = histogram
+        self.labelvalues = labelvalues
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.start, *self.labelvalues)
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# HTTP layer
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status", ("method", "route", "status")))
+HTTP_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")))
+
+# Upstream model
+MODEL_CONNECT = registry.register(Histogram(
+    "model_upstream_connect_seconds", "Time to open a new connection to the model (TCP + TLS)"))
+MODEL_TTFB = registry.register(Histogram(
+    "model_upstream_ttfb_seconds", "Time from sending the model request to its first response byte", ("mode",)))
+MODEL_TOTAL = registry.register(Histogram(
+    "model_upstream_total_seconds", "Total model request time including the body", ("mode",)))
+MODEL_TOKENS = registry.register(Counter(
+    "model_tokens_total", "Prompt and completion tokens sent to / received from the model", ("kind",)))
+FAQ_LOOKUPS = registry.register(Counter(
+    "faq_lookups_total", "Local FAQ retrieval outcomes (answered, context, miss)", ("outcome",)))
+
+# Database and password hashing
+DB_CHECKOUT = registry.register(Histogram(
+    "db_connection_checkout_seconds", "Time to check a connection out of the pool", ("engine",),
+    buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)))
+PASSWORD_HASHING = registry.register(Histogram(
+    "password_hash_seconds", "bcrypt hash/verify time including pool queueing", ("operation",)))
+
+# Frontend
+REACTPY_SESSIONS = registry.register(Gauge(
+    "reactpy_active_sessions", "Mounted ReactPy frontend sessions"))
+
+
+def instrument_pool(pool, engine_name):
+    """Time every checkout from a SQLAlchemy pool"""
+    connect = pool.connect
+
+    def timed_connect():
+        start = time.perf_counter()
+        try:
+            return connect()
+        finally:
+            DB_CHECKOUT.observe(time.perf_counter() - start, engine_name)
+
+    pool.connect = timed_connect
+
+
+def route_label(scope):
+    # FastAPI stores the matched APIRoute in the scope; other routes expose their endpoint
+    route = scope.get("route")
+    if route is not None:
+        return getattr(route, "path", "unknown")
+    endpoint = scope.get("endpoint")
+    if endpoint is not None:
+        return getattr(endpoint, "__name__", "unknown")
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request count and latency per route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status_holder = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status_holder[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = route_label(scope)
+            HTTP_REQUESTS.inc(1.0, scope["method"], route, status_holder[0])
+            HTTP_LATENCY.observe(time.perf_counter() - start, scope["method"], route)
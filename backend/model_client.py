@@ -0,0 +1,143 @@
+# backend/model_client.py
+import os
+import json
+import time
+import httpx
+from .metrics import MODEL_CONNECT, MODEL_TTFB, MODEL_TOTAL
+
+# Connection pool settings for the model gateway
+MODEL_MAX_CONNECTIONS = int(os.getenv("MODEL_MAX_CONNECTIONS", "100"))
+MODEL_MAX_KEEPALIVE = int(os.getenv("MODEL_MAX_KEEPALIVE", "20"))
+MODEL_KEEPALIVE_EXPIRY = float(os.getenv("MODEL_KEEPALIVE_EXPIRY", "30"))
+MODEL_CONNECT_TIMEOUT = float(os.getenv("MODEL_CONNECT_TIMEOUT", "5"))
+MODEL_HTTP2 = os.getenv("MODEL_HTTP2", "1") == "1"
+
+_client = None
+
+
+def _http2_available():
+    # httpx only speaks HTTP/2 when the optional h2 package is installed
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_client():
+    """Return the process-wide async client, creating it on first use"""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=MODEL_HTTP2 and _http2_available(),
+            limits=httpx.Limits(
+                max_connections=MODEL_MAX_CONNECTIONS,
+                max_keepalive_connections=MODEL_MAX_KEEPALIVE,
+                keepalive_expiry=MODEL_KEEPALIVE_EXPIRY,
+            ),
+            timeout=request_timeout(30),
+        )
+    return _client
+
+
+def request_timeout(seconds):
+    """
+    Timeout for one model request. A per-request timeout replaces the client
+    default entirely, so every call site must carry the short connect timeout
+    along or an unreachable model blocks for the full `seconds`.
+    """
+    return httpx.Timeout(seconds, connect=MODEL_CONNECT_TIMEOUT)
+
+
+async def close_client():
+    """Close the shared client and its pooled connections"""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _connect_tracer():
+    """httpx trace hook recording the time spent opening new connections"""
+    started = {}
+
+    async def trace(event_name, info):
+        if event_name in ("connection.connect_tcp.started", "connection.start_tls.started"):
+            started[event_name.rsplit(".", 1)[0]] = time.perf_counter()
+        elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            start = started.pop(event_name.rsplit(".", 1)[0], None)
+            if start is not None:
+                started["total"] = started.get("total", 0.0) + time.perf_counter() - start
+        elif event_name.endswith("send_request_headers.started") and "total" in started:
+            MODEL_CONNECT.observe(started.pop("total"))
+
+    return trace
+
+
+async def post_model(url, headers, payload, timeout=30):
+    """POST a completion request, recording connect / first byte / total time"""
+    trace = _connect_tracer()
+    start = time.perf_counter()
+    async with get_client().stream(
+        "POST", url, headers=headers, json=payload, timeout=request_timeout(timeout), extensions={"trace": trace}
+    ) as response:
+        MODEL_TTFB.observe(time.perf_counter() - start, "unary")
+        await response.aread()
+    MODEL_TOTAL.observe(time.perf_counter() - start, "unary")
+    return response
+
+
+def extract_delta(data):
+    """Pull the text fragment out of one streamed chunk in either payload shape"""
+    choices = data.get("choices")
+    if choices:
+        choice = choices[0]
+        delta = choice.get("delta") or choice.get("message") or {}
+        return delta.get("content") or choice.get("text") or ""
+    return (
+        data.get("response") or data.get("answer") or data.get("output")
+        or data.get("token") or data.get("text") or ""
+    )
+
+
+async def stream_deltas(url, headers, payload, timeout=30):
+    """
+    Stream a completion from the model and yield text deltas as they arrive.
+
+    Understands Server-Sent Events (`data: {...}` lines, `[DONE]` terminator)
+    and newline-delimited JSON; any other line is passed through as raw text.
+    Leaving the generator early closes the upstream response.
+    """
+    start = time.perf_counter()
+    first_byte = True
+    async with get_client().stream(
+        "POST", url, headers=headers, json={**payload, "stream": True}, timeout=request_timeout(timeout),
+        extensions={"trace": _connect_tracer()}
+    ) as response:
+        if response.status_code != 200:
+            await response.aread()
+            raise httpx.HTTPStatusError(
+                f"Model API returned status {response.status_code}",
+                request=response.request,
+                response=response,
+            )
+        async for line in response.aiter_lines():
+            if first_byte:
+                MODEL_TTFB.observe(time.perf_counter() - start, "stream")
+                first_byte = False
+            line = line.strip()
+            if not line or line.startswith(":") or line.startswith("event:"):
+                continue
+            if line.startswith("data:"):
+                line = line[5:].strip()
+            if line == "[DONE]":
+                break
+            try:
+                data = json.loads(line)
+            except ValueError:
+                yield line
+                continue
+            delta = extract_delta(data) if isinstance(data, dict) else ""
+            if delta:
+                yield delta
+    MODEL_TOTAL.observe(time.perf_counter() - start, "stream")
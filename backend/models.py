@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from .database import Base
@@ -21,13 +21,21 @@ class Conversation(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     title = Column(String, nullable=True)  # First message or generated title
+    summary = Column(Text, nullable=True)  # Rolling summary of older turns
+    summarized_through_id = Column(Integer, nullable=True)  # Last message folded into summary
+    access_key_hash = Column(String, nullable=True)  # sha256 of the key anonymous callers continue it with
     created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # Relationships
     user = relationship("User", back_populates="conversations")
     messages = relationship("Message", back_populates="conversation")
 
+    # A user's conversations, most recently active first
+    __table_args__ = (
+        Index("ix_conversations_user_id_updated_at", "user_id", "updated_at"),
+    )
+
 class Message(Base):
     __tablename__ = "messages"
 
@@ -38,4 +46,16 @@ class Message(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     
     # Relationships
-    conversation = relationship("Conversation", back_populates="messages")
\ No newline at end of file
+    conversation = relationship("Conversation", back_populates="messages")
+
+    # Messages of one thread in order, with id as the keyset tie-breaker
+    __table_args__ = (
+        Index("ix_messages_conversation_id_created_at_id", "conversation_id", "created_at", "id"),
+    )
+
+class IdBlock(Base):
+    """Next free id of a table whose ids the app hands out in blocks (see ChatWriter)"""
+    __tablename__ = "id_blocks"
+
+    name = Column(String, primary_key=True)
+    next_id = Column(Integer, nullable=False)
@@ -0,0 +1,332 @@
+# backend/persistence.py
+import os
+import hmac
+import asyncio
+import hashlib
+import secrets
+from datetime import datetime, timezone
+from sqlalchemy import insert, select, update, bindparam
+from .database import async_engine
+from .models import Conversation, Message, IdBlock
+from .cache import TTLCache
+
+# Write-behind configuration for chat history
+CHAT_WRITE_BATCH_SIZE = int(os.getenv("CHAT_WRITE_BATCH_SIZE", "200"))
+CHAT_WRITE_FLUSH_INTERVAL = float(os.getenv("CHAT_WRITE_FLUSH_INTERVAL", "0.5"))
+CHAT_WRITE_QUEUE_MAX = int(os.getenv("CHAT_WRITE_QUEUE_MAX", "10000"))
+CHAT_WRITE_RETRIES = 3
+# How long a reader waits for one conversation's queued rows to be written
+CHAT_WRITE_WAIT_TIMEOUT = float(os.getenv("CHAT_WRITE_WAIT_TIMEOUT", "2"))
+# Conversation ids reserved per database round-trip
+CONVERSATION_ID_BLOCK = int(os.getenv("CONVERSATION_ID_BLOCK", "100"))
+
+_messages = Message.__table__
+_conversations = Conversation.__table__
+_id_blocks = IdBlock.__table__
+_MISSING = object()
+
+
+def _conversation_of(table, row):
+    return row["id"] if table is _conversations else row["conversation_id"]
+
+
+def hash_conversation_key(key):
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class ChatWriter:
+    """
+    Write-behind queue for chat messages.
+
+    The request path only enqueues rows. A background task collects them
+    into batches of up to `batch_size` (or whatever arrived within
+    `flush_interval`) and writes each batch with one executemany INSERT in a
+    single transaction on the async engine.
+
+    New conversations are queued the same way, together with their first
+    turn, so a request that fails before answering leaves no empty
+    conversation behind. Their ids come from blocks of `id_block` ids
+    reserved in the id_blocks table, so the caller gets an id without
+    waiting for the row to be written. Ids that are never used, or left over
+    when a process exits, are skipped.
+    """
+
+    def __init__(self, engine, batch_size=200, flush_interval=0.5, max_queue=10000, id_block=100):
+        self.engine = engine
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.id_block = id_block
+        self.flushed = 0
+        self.batches = 0
+        self.dropped = 0
+        self.dropped_conversations = 0
+        self._queue = None
+        self._task = None
+        self._owners = TTLCache(maxsize=10000, ttl=3600)
+        # Conversation rows reserved by open_conversation, queued by their first record_turn
+        self._reserved = TTLCache(maxsize=10000, ttl=3600)
+        self._free_ids = iter(())
+        self._id_lock = asyncio.Lock()
+        # conversation_id -> rows still queued, and events for readers waiting on them
+        self._pending = {}
+        self._drained = {}
+        # Called with {conversation_id: messages_written} after each flush
+        self.flush_listeners = []
+
+    @property
+    def depth(self):
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.max_queue)
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush everything still queued, then stop the background task"""
+        if self._task is None:
+            return
+        await self.flush()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def flush(self):
+        """Wait until every message queued so far has been written"""
+        if self._queue is not None:
+            await self._queue.join()
+
+    async def flush_conversation(self, conversation_id, timeout=CHAT_WRITE_WAIT_TIMEOUT):
+        """
+        Wait until the rows queued for one conversation have been written.
+        Returns False if that took longer than `timeout` seconds.
+        """
+        if not self._pending.get(conversation_id):
+            return True
+        drained = self._drained.setdefault(conversation_id, asyncio.Event())
+        try:
+            await asyncio.wait_for(drained.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def _put(self, table, row):
+        if self._task is None:
+            self.start()
+        try:
+            self._queue.put_nowait((table, row))
+        except asyncio.QueueFull:
+            return False
+        conversation_id = _conversation_of(table, row)
+        self._pending[conversation_id] = self._pending.get(conversation_id, 0) + 1
+        return True
+
+    def _done(self, batch):
+        for table, row in batch:
+            conversation_id = _conversation_of(table, row)
+            remaining = self._pending.get(conversation_id, 1) - 1
+            if remaining > 0:
+                self._pending[conversation_id] = remaining
+                continue
+            self._pending.pop(conversation_id, None)
+            drained = self._drained.pop(conversation_id, None)
+            if drained is not None:
+                drained.set()
+
+    def enqueue(self, conversation_id, content, is_user, created_at=None):
+        row = {
+            "conversation_id": conversation_id,
+            "content": content,
+            "is_user": 1 if is_user else 0,
+            "created_at": created_at or datetime.now(timezone.utc),
+        }
+        if not self._put(_messages, row):
+            self.dropped += 1
+            print(f"Chat persistence queue full, dropping message for conversation {conversation_id}")
+
+    def record_turn(self, conversation_id, user_message, ai_response, asked_at=None):
+        """Queue one user/assistant exchange, behind its conversation's row on the first one"""
+        row = self._reserved.get(conversation_id)
+        if row is not None:
+            self._reserved.delete(conversation_id)
+            if not self._put(_conversations, row):
+                self.dropped_conversations += 1
+                self.dropped += 2
+                print(f"Chat persistence queue full, dropping new conversation {conversation_id}")
+                return
+            self._owners.set(conversation_id, (row["user_id"], row["access_key_hash"]))
+        self.enqueue(conversation_id, user_message, True, asked_at)
+        self.enqueue(conversation_id, ai_response, False)
+
+    async def open_conversation(self, user_id=None, title=None):
+        """
+        Reserve a new conversation; returns (id, key). Its row is queued with
+        its first record_turn.
+
+        Anonymous conversations get a random key, and only callers that
+        present it can continue them. Users' conversations have no key.
+        """
+        key = secrets.token_urlsafe(24) if user_id is None else None
+        conversation_id = await self._next_conversation_id()
+        now = datetime.now(timezone.utc)
+        self._reserved.set(conversation_id, {
+            "id": conversation_id,
+            "user_id": user_id,
+            "title": title,
+            "access_key_hash": hash_conversation_key(key) if key else None,
+            "created_at": now,
+            "updated_at": now,
+        })
+        return conversation_id, key
+
+    async def conversation_exists_for(self, conversation_id, user_id=None, key=None):
+        """
+        True if the conversation exists and the caller may write to it: the
+        owning user, or for an anonymous conversation whoever holds its key
+        """
+        owner = self._owners.get(conversation_id, _MISSING)
+        if owner is _MISSING:
+            owner = await self._select_owner(conversation_id)
+            if owner is _MISSING:
+                return False
+            self._owners.set(conversation_id, owner)
+        owner_id, key_hash = owner
+        if user_id is not None:
+            return owner_id == user_id
+        if owner_id is not None or key_hash is None or not key:
+            return False
+        return hmac.compare_digest(key_hash, hash_conversation_key(key))
+
+    def stats(self):
+        return {
+            "queue_depth": self.depth,
+            "flushed_messages": self.flushed,
+            "batches": self.batches,
+            "dropped_messages": self.dropped,
+            "dropped_conversations": self.dropped_conversations,
+        }
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = asyncio.get_running_loop().time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                await self._flush(batch)
+            finally:
+                self._done(batch)
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _flush(self, batch):
+        for attempt in range(1, CHAT_WRITE_RETRIES + 1):
+            try:
+                written = await self._write_batch(batch)
+                break
+            except Exception as e:
+                print(f"Chat persistence error (attempt {attempt}): {e}")
+                await asyncio.sleep(0.1 * attempt)
+        else:
+            # Write each conversation's rows on their own, so a bad row only
+            # loses its own conversation instead of the whole batch
+            written = await self._write_by_conversation(batch)
+        # Outside the retry loop: a failing listener must not write the batch again
+        for listener in self.flush_listeners:
+            try:
+                listener(written)
+            except Exception as e:
+                print(f"Chat persistence flush listener error: {e}")
+
+    async def _write_by_conversation(self, batch):
+        groups = {}
+        for table, row in batch:
+            groups.setdefault(_conversation_of(table, row), []).append((table, row))
+        written = {}
+        for conversation_id, rows in groups.items():
+            try:
+                written.update(await self._write_batch(rows))
+            except Exception as e:
+                print(f"Chat persistence error, dropping conversation {conversation_id} rows: {e}")
+                self._lose(rows)
+        return written
+
+    def _lose(self, rows):
+        for table, row in rows:
+            if table is _conversations:
+                self.dropped_conversations += 1
+                # Later turns must not be accepted for a conversation that has no row
+                self._owners.delete(row["id"])
+            else:
+                self.dropped += 1
+
+    async def _write_batch(self, batch):
+        """Insert one batch in a single transaction; returns {conversation_id: messages_written}"""
+        conversations = [row for table, row in batch if table is _conversations]
+        rows = [row for table, row in batch if table is _messages]
+        touched = {}
+        written = {}
+        for row in rows:
+            touched[row["conversation_id"]] = row["created_at"]
+            written[row["conversation_id"]] = written.get(row["conversation_id"], 0) + 1
+        async with self.engine.begin() as conn:
+            # Conversations first: messages in the same batch reference them
+            if conversations:
+                await conn.execute(insert(_conversations), conversations)
+            if rows:
+                await conn.execute(insert(_messages), rows)
+                await conn.execute(
+                    _conversations.update()
+                    .where(_conversations.c.id == bindparam("b_id"))
+                    .values(updated_at=bindparam("b_updated_at")),
+                    [{"b_id": cid, "b_updated_at": ts} for cid, ts in touched.items()],
+                )
+        self.flushed += len(rows)
+        self.batches += 1
+        return written
+
+    async def _next_conversation_id(self):
+        async with self._id_lock:
+            conversation_id = next(self._free_ids, None)
+            if conversation_id is None:
+                self._free_ids = iter(await self._reserve_ids("conversations", self.id_block))
+                conversation_id = next(self._free_ids)
+            return conversation_id
+
+    async def _reserve_ids(self, name, count):
+        """Claim `count` consecutive ids; the UPDATE locks the row until commit"""
+        async with self.engine.begin() as conn:
+            await conn.execute(
+                update(_id_blocks).where(_id_blocks.c.name == name).values(next_id=_id_blocks.c.next_id + count)
+            )
+            result = await conn.execute(select(_id_blocks.c.next_id).where(_id_blocks.c.name == name))
+            end = result.scalar_one()
+        return range(end - count, end)
+
+    async def _select_owner(self, conversation_id):
+        async with self.engine.connect() as conn:
+            result = await conn.execute(
+                select(_conversations.c.user_id, _conversations.c.access_key_hash)
+                .where(_conversations.c.id == conversation_id)
+            )
+            row = result.first()
+        return tuple(row) if row is not None else _MISSING
+
+
+chat_writer = ChatWriter(
+    async_engine,
+    batch_size=CHAT_WRITE_BATCH_SIZE,
+    flush_interval=CHAT_WRITE_FLUSH_INTERVAL,
+    max_queue=CHAT_WRITE_QUEUE_MAX,
+    id_block=CONVERSATION_ID_BLOCK,
+)
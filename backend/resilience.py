@@ -0,0 +1,279 @@
+# backend/resilience.py
+import os
+import time
+import asyncio
+from contextlib import asynccontextmanager
+
+# Circuit breaker configuration. Only errors (5xx, 429, exceptions) open the
+# circuit; CIRCUIT_LATENCY_THRESHOLD > 0 also counts successes slower than
+# that many seconds, which only makes sense for a model with a known latency bound.
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+CIRCUIT_LATENCY_THRESHOLD = float(os.getenv("CIRCUIT_LATENCY_THRESHOLD", "0"))
+CIRCUIT_OPEN_SECONDS = float(os.getenv("CIRCUIT_OPEN_SECONDS", "30"))
+CIRCUIT_HALF_OPEN_PROBES = int(os.getenv("CIRCUIT_HALF_OPEN_PROBES", "1"))
+
+# Adaptive (AIMD) concurrency limit for the upstream model. It backs off when
+# recent latency rises above MODEL_LATENCY_TOLERANCE times the latency measured
+# over the last few hundred calls, so completions that are always long are not
+# read as overload. MODEL_LATENCY_TARGET > 0 replaces the measured baseline
+# with a fixed number of seconds.
+MODEL_CONCURRENCY_INITIAL = float(os.getenv("MODEL_CONCURRENCY_INITIAL", "10"))
+MODEL_CONCURRENCY_MIN = float(os.getenv("MODEL_CONCURRENCY_MIN", "1"))
+MODEL_CONCURRENCY_MAX = float(os.getenv("MODEL_CONCURRENCY_MAX", "100"))
+MODEL_CONCURRENCY_BACKOFF = float(os.getenv("MODEL_CONCURRENCY_BACKOFF", "0.5"))
+MODEL_LATENCY_TARGET = float(os.getenv("MODEL_LATENCY_TARGET", "0"))
+MODEL_LATENCY_TOLERANCE = float(os.getenv("MODEL_LATENCY_TOLERANCE", "2"))
+MODEL_LATENCY_WARMUP = int(os.getenv("MODEL_LATENCY_WARMUP", "10"))
+# Upper bound on the wait for a slot; once latency is measured a caller waits
+# at most one baseline call, since a slot only frees when a call finishes
+MODEL_QUEUE_TIMEOUT = float(os.getenv("MODEL_QUEUE_TIMEOUT", "30"))
+
+
+class CircuitOpenError(Exception):
+    """The upstream model is failing; calls are short-circuited"""
+
+
+class ConcurrencyLimitExceeded(Exception):
+    """No upstream slot became free within the queue timeout, or the queue was already full"""
+
+
+class CircuitBreaker:
+    """
+    Closed -> open after `failure_threshold` consecutive failures (calls
+    slower than `latency_threshold` count as failures when it is above 0). Open rejects calls until `open_seconds` have passed,
+    then half-open lets `half_open_probes` calls through: one success closes
+    the circuit again, one failure re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, latency_threshold=0.0, open_seconds=30.0, half_open_probes=1):
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self):
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def allow(self):
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and self._probes < self.half_open_probes:
+            self._probes += 1
+            return True
+        return False
+
+    def record_success(self, latency):
+        if self.latency_threshold > 0 and latency > self.latency_threshold:
+            self.record_failure()
+            return
+        self._failures = 0
+        self._state = self.CLOSED
+
+    def record_abandoned(self):
+        # A call was let through but never reached the model; free its probe slot
+        if self._state == self.HALF_OPEN and self._probes > 0:
+            self._probes -= 1
+
+    def record_failure(self):
+        self._failures += 1
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def stats(self):
+        return {"state": self.state, "consecutive_failures": self._failures}
+
+
+class AIMDLimiter:
+    """
+    Additive-increase / multiplicative-decrease concurrency limit.
+
+    Each success raises the limit by 1/limit (about +1 per round of
+    requests); a failure, or recent latency above the target, multiplies it
+    by `backoff`. Recent latency is a fast moving average of successful calls.
+    The target is `latency_target` when set, otherwise `tolerance` times a slow
+    moving average, once `warmup` calls have been measured. Callers over the
+    limit wait for a slot up to the slow average (`queue_timeout` seconds
+    before it is trusted, and never longer); when as many callers as the
+    limit are already waiting, new ones are refused at once.
+    """
+
+    RECENT_WEIGHT = 0.3
+    BASELINE_WEIGHT = 0.01
+
+    def __init__(self, initial=10, minimum=1, maximum=100, backoff=0.5, latency_target=0.0, tolerance=2.0,
+                 warmup=10, queue_timeout=30.0):
+        self.limit = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.latency_target = latency_target
+        self.tolerance = tolerance
+        self.warmup = warmup
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.waiting = 0
+        self._samples = 0
+        self._recent = None
+        self._baseline = None
+        self._condition = asyncio.Condition()
+
+    def target(self):
+        """Latency above which the upstream counts as overloaded, or None while still measuring"""
+        if self.latency_target > 0:
+            return self.latency_target
+        if self._samples < self.warmup:
+            return None
+        return self._baseline * self.tolerance
+
+    def wait_timeout(self):
+        """Seconds a caller over the limit waits for a slot"""
+        if self._samples < self.warmup:
+            return self.queue_timeout
+        return min(self.queue_timeout, self._baseline)
+
+    def _slow(self, latency):
+        # Compare against the baseline from before this sample, then fold it in
+        if self._recent is None:
+            self._recent = self._baseline = latency
+        else:
+            self._recent += self.RECENT_WEIGHT * (latency - self._recent)
+        self._samples += 1
+        target = self.target()
+        slow = target is not None and self._recent > target
+        self._baseline += self.BASELINE_WEIGHT * (latency - self._baseline)
+        return slow
+
+    async def acquire(self):
+        async with self._condition:
+            limit = int(self.limit)
+            if self.in_flight >= limit and self.waiting >= limit:
+                # Everyone queued ahead would be served before this caller anyway
+                raise ConcurrencyLimitExceeded(f"Upstream concurrency limit {limit} reached, {self.waiting} waiting")
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: self.in_flight < int(self.limit)),
+                    self.wait_timeout()
+                )
+            except asyncio.TimeoutError:
+                raise ConcurrencyLimitExceeded(f"Upstream concurrency limit {int(self.limit)} reached")
+            finally:
+                self.waiting -= 1
+            self.in_flight += 1
+
+    async def release(self, latency=None, failed=False, adjust=True):
+        if adjust:
+            if failed or (latency is not None and self._slow(latency)):
+                self.limit = max(self.minimum, self.limit * self.backoff)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def stats(self):
+        target = self.target()
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "latency_recent": round(self._recent, 3) if self._recent is not None else None,
+            "latency_target": round(target, 3) if target is not None else None,
+        }
+
+
+def _is_failed_response(response):
+    status_code = getattr(response, "status_code", 200)
+    return status_code >= 500 or status_code == 429
+
+
+class UpstreamGuard:
+    """Circuit breaker plus concurrency limiter around calls to the model"""
+
+    def __init__(self, breaker, limiter):
+        self.breaker = breaker
+        self.limiter = limiter
+
+    @asynccontextmanager
+    async def _slot(self):
+        if not self.breaker.allow():
+            raise CircuitOpenError("AI model circuit is open")
+        try:
+            await self.limiter.acquire()
+        except BaseException:
+            self.breaker.record_abandoned()
+            raise
+        outcome = {"latency": None, "failed": True, "cancelled": False}
+        try:
+            yield outcome
+        except (GeneratorExit, asyncio.CancelledError):
+            # The caller went away; that says nothing about upstream health
+            outcome["cancelled"] = True
+            raise
+        finally:
+            cancelled = outcome["cancelled"]
+            await self.limiter.release(outcome["latency"], outcome["failed"], adjust=not cancelled)
+            if cancelled:
+                self.breaker.record_abandoned()
+            elif outcome["failed"]:
+                self.breaker.record_failure()
+            else:
+                self.breaker.record_success(outcome["latency"])
+
+    async def call(self, fn):
+        """Await `fn()` (an upstream HTTP call) under the breaker and limiter"""
+        async with self._slot() as outcome:
+            start = time.perf_counter()
+            response = await fn()
+            outcome["latency"] = time.perf_counter() - start
+            outcome["failed"] = _is_failed_response(response)
+            return response
+
+    async def stream(self, factory):
+        """Relay an upstream stream; its time to first chunk is the latency sample"""
+        async with self._slot() as outcome:
+            start = time.perf_counter()
+            async for chunk in factory():
+                if outcome["latency"] is None:
+                    outcome["latency"] = time.perf_counter() - start
+                yield chunk
+            if outcome["latency"] is None:
+                outcome["latency"] = time.perf_counter() - start
+            outcome["failed"] = False
+
+    def stats(self):
+        return {"circuit": self.breaker.stats(), "concurrency": self.limiter.stats()}
+
+
+upstream_guard = UpstreamGuard(
+    CircuitBreaker(
+        failure_threshold=CIRCUIT_FAILURE_THRESHOLD,
+        latency_threshold=CIRCUIT_LATENCY_THRESHOLD,
+        open_seconds=CIRCUIT_OPEN_SECONDS,
+        half_open_probes=CIRCUIT_HALF_OPEN_PROBES,
+    ),
+    AIMDLimiter(
+        initial=MODEL_CONCURRENCY_INITIAL,
+        minimum=MODEL_CONCURRENCY_MIN,
+        maximum=MODEL_CONCURRENCY_MAX,
+        backoff=MODEL_CONCURRENCY_BACKOFF,
+        latency_target=MODEL_LATENCY_TARGET,
+        tolerance=MODEL_LATENCY_TOLERANCE,
+        warmup=MODEL_LATENCY_WARMUP,
+        queue_timeout=MODEL_QUEUE_TIMEOUT,
+    ),
+)
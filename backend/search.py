@@ -0,0 +1,226 @@
+# backend/search.py
+import re
+import json
+import base64
+import html
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, text
+
+# Snippet markers that cannot occur in typed text; swapped for <mark> after escaping
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+SNIPPET_TOKENS = 12
+
+# The index carries an `owner` token ("u<user_id>") next to the content, so the
+# MATCH itself is scoped to one user and only that user's hits are ranked.
+# Its external content is a view that joins each message to its conversation.
+_SQLITE_FTS_DDL = [
+    """
+    CREATE VIEW IF NOT EXISTS messages_fts_source AS
+    SELECT m.id AS id, m.content AS content, 'u' || c.user_id AS owner
+    FROM messages m LEFT JOIN conversations c ON c.id = m.conversation_id
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+        content, owner, content='messages_fts_source', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    # Keep the external-content index in sync with messages
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages BEGIN
+        INSERT INTO messages_fts(rowid, content, owner)
+        VALUES (new.id, new.content, (SELECT 'u' || user_id FROM conversations WHERE id = new.conversation_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content, owner)
+        VALUES ('delete', old.id, old.content, (SELECT 'u' || user_id FROM conversations WHERE id = old.conversation_id));
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_au AFTER UPDATE OF content ON messages BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, content, owner)
+        VALUES ('delete', old.id, old.content, (SELECT 'u' || user_id FROM conversations WHERE id = old.conversation_id));
+        INSERT INTO messages_fts(rowid, content, owner)
+        VALUES (new.id, new.content, (SELECT 'u' || user_id FROM conversations WHERE id = new.conversation_id));
+    END
+    """,
+]
+_SQLITE_FTS_OBJECTS = [
+    "DROP TRIGGER IF EXISTS messages_fts_ai",
+    "DROP TRIGGER IF EXISTS messages_fts_ad",
+    "DROP TRIGGER IF EXISTS messages_fts_au",
+    "DROP TABLE IF EXISTS messages_fts",
+]
+
+_POSTGRES_FTS_DDL = [
+    "CREATE INDEX IF NOT EXISTS ix_messages_content_fts ON messages USING gin (to_tsvector('english', content))",
+]
+
+
+def install_fts(conn):
+    """Create the full-text index for the connected database (called from init_db)"""
+    dialect = conn.dialect.name
+    if dialect == "sqlite":
+        existing = conn.execute(
+            text("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'")
+        ).scalar()
+        if existing and "owner" not in existing:
+            # Index from before the owner column: drop it and its triggers, then rebuild
+            for statement in _SQLITE_FTS_OBJECTS:
+                conn.execute(text(statement))
+            existing = None
+        for statement in _SQLITE_FTS_DDL:
+            conn.execute(text(statement))
+        if not existing:
+            # Index messages stored before the FTS table existed
+            conn.execute(text("INSERT INTO messages_fts(messages_fts) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        for statement in _POSTGRES_FTS_DDL:
+            conn.execute(text(statement))
+
+
+def build_match_query(query: str):
+    """
+    Turn free text into a safe FTS5 query: quoted terms, AND-ed. Terms are
+    whole words (porter-stemmed); a prefix term would be expanded over every
+    user's postings by the match, by bm25 and again by the snippet query.
+    """
+    terms = re.findall(r"\w+", query.lower())
+    if not terms:
+        return None
+    return " ".join(f'"{term}"' for term in terms)
+
+
+def _encode_cursor(offset):
+    raw = json.dumps({"offset": offset})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor):
+    try:
+        offset = int(json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))["offset"])
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if offset < 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return offset
+
+
+def highlight(snippet: str):
+    """HTML-escape the stored text, then wrap matched terms in <mark>"""
+    escaped = html.escape(snippet or "")
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+# Ranked page first; snippets are built afterwards for that page's rows only
+_SQLITE_SEARCH = """
+    SELECT m.id, m.conversation_id, m.is_user, m.created_at, c.title,
+           bm25(messages_fts, 1.0, 0.0) AS rank
+    FROM messages_fts
+    JOIN messages m ON m.id = messages_fts.rowid
+    JOIN conversations c ON c.id = m.conversation_id
+    WHERE messages_fts MATCH :match AND c.user_id = :user_id
+    ORDER BY rank, m.id
+    LIMIT :limit OFFSET :offset
+"""
+
+# FTS5 seeks on the rowid range. The unary + keeps the IN list away from the
+# virtual table, which would otherwise rerun the MATCH once per id.
+_SQLITE_SNIPPETS = text("""
+    SELECT rowid AS id, snippet(messages_fts, 0, :mark_start, :mark_end, '…', :tokens) AS snippet
+    FROM messages_fts
+    WHERE messages_fts MATCH :match AND rowid BETWEEN :first AND :last AND +rowid IN :ids
+""").bindparams(bindparam("ids", expanding=True))
+
+
+async def _search_sqlite(db, user_id, query, limit, offset):
+    terms = build_match_query(query)
+    if not terms:
+        return []
+    match = f'owner : "u{int(user_id)}" AND content : ({terms})'
+    params = {"match": match, "user_id": user_id, "limit": limit, "offset": offset}
+    rows = (await db.execute(text(_SQLITE_SEARCH), params)).mappings().all()
+    if not rows:
+        return []
+    ids = [row["id"] for row in rows]
+    snippets = dict((await db.execute(_SQLITE_SNIPPETS, {
+        "match": match,
+        "first": min(ids),
+        "last": max(ids),
+        "ids": ids,
+        "mark_start": _MARK_START,
+        "mark_end": _MARK_END,
+        "tokens": SNIPPET_TOKENS,
+    })).all())
+    return [dict(row, snippet=snippets.get(row["id"])) for row in rows]
+
+
+_POSTGRES_SEARCH = """
+    SELECT hits.*,
+           ts_headline('english', m.content, plainto_tsquery('english', :match),
+                       'StartSel=' || :mark_start || ', StopSel=' || :mark_end || ', MaxWords=' || :tokens)
+               AS snippet
+    FROM (
+        SELECT m.id, m.conversation_id, m.is_user, m.created_at, c.title,
+               -ts_rank(to_tsvector('english', m.content), q) AS rank
+        FROM messages m
+        JOIN conversations c ON c.id = m.conversation_id,
+             plainto_tsquery('english', :match) q
+        WHERE to_tsvector('english', m.content) @@ q AND c.user_id = :user_id
+        ORDER BY rank, m.id
+        LIMIT :limit OFFSET :offset
+    ) hits
+    JOIN messages m ON m.id = hits.id
+    ORDER BY hits.rank, hits.id
+"""
+
+
+async def search_messages(db, user_id: int, query: str, limit: int = 20, cursor: str = None):
+    """
+    Ranked full-text search over the user's own messages.
+
+    Results are best match first. Ranks are floats that shift as messages
+    are added, so pages are offsets into the ranking rather than keyset
+    cursors on the rank.
+    """
+    offset = _decode_cursor(cursor) if cursor else 0
+    dialect = db.bind.dialect.name
+    if dialect == "sqlite":
+        rows = await _search_sqlite(db, user_id, query, limit + 1, offset)
+    elif dialect == "postgresql":
+        if not query.strip():
+            return {"results": [], "next_cursor": None}
+        params = {
+            "match": query.strip(),
+            "user_id": user_id,
+            "limit": limit + 1,
+            "offset": offset,
+            "mark_start": _MARK_START,
+            "mark_end": _MARK_END,
+            "tokens": SNIPPET_TOKENS,
+        }
+        rows = (await db.execute(text(_POSTGRES_SEARCH), params)).mappings().all()
+    else:
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Search is not supported on this database")
+
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = _encode_cursor(offset + limit)
+    return {
+        "results": [
+            {
+                "message_id": row["id"],
+                "conversation_id": row["conversation_id"],
+                "conversation_title": row["title"],
+                "role": "user" if row["is_user"] else "assistant",
+                "created_at": str(row["created_at"]) if row["created_at"] else None,
+                "snippet": highlight(row["snippet"]),
+                "score": -row["rank"],
+            }
+            for row in page
+        ],
+        "next_cursor": next_cursor,
+    }
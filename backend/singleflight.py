@@ -0,0 +1,102 @@
+# backend/singleflight.py
+import asyncio
+import hashlib
+import json
+
+
+def payload_key(url, payload):
+    """Identity of an upstream request: same URL and byte-identical JSON payload"""
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(f"{url}\n{body}".encode("utf-8")).hexdigest()
+
+
+class _Broadcast:
+    """Runs one upstream stream and replays it to any number of subscribers"""
+
+    def __init__(self, source):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.subscribers = 0
+        self._changed = asyncio.Event()
+        self.task = asyncio.ensure_future(self._pump(source))
+
+    async def _pump(self, source):
+        try:
+            async for chunk in source:
+                self.chunks.append(chunk)
+                self._notify()
+        except asyncio.CancelledError:
+            self.error = ConnectionAbortedError("Upstream stream cancelled")
+            raise
+        except Exception as e:
+            self.error = e
+        finally:
+            self.done = True
+            self._notify()
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def subscribe(self):
+        # Every subscriber gets its own cursor, starting from the first chunk
+        self.subscribers += 1
+        index = 0
+        try:
+            while True:
+                while index < len(self.chunks):
+                    yield self.chunks[index]
+                    index += 1
+                if self.done:
+                    if self.error is not None:
+                        raise self.error
+                    return
+                await self._changed.wait()
+        finally:
+            self.subscribers -= 1
+            # Last listener went away: stop paying for the upstream stream
+            if self.subscribers == 0 and not self.done:
+                self.task.cancel()
+
+
+class SingleFlight:
+    """
+    Coalesce identical in-flight calls.
+
+    Callers that arrive while a call with the same key is pending attach to
+    it instead of starting another one; the key is released as soon as the
+    call finishes.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._streams = {}
+
+    async def do(self, key, fn):
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._release(self._calls, key, task))
+        # Shield so one caller disconnecting does not cancel the shared call
+        return await asyncio.shield(task)
+
+    def stream(self, key, factory):
+        broadcast = self._streams.get(key)
+        if broadcast is None:
+            broadcast = _Broadcast(factory())
+            self._streams[key] = broadcast
+            broadcast.task.add_done_callback(lambda _: self._release(self._streams, key, broadcast))
+        return broadcast.subscribe()
+
+    @staticmethod
+    def _release(pending, key, value):
+        if pending.get(key) is value:
+            del pending[key]
+
+    def in_flight(self):
+        return len(self._calls) + len(self._streams)
+
+
+model_requests = SingleFlight()
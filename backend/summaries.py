@@ -0,0 +1,161 @@
+# backend/summaries.py
+import os
+import asyncio
+from sqlalchemy import select
+from .database import AsyncSessionLocal
+from .models import Conversation, Message
+from .cache import TTLCache
+from .history import history_packer, extractive_summary
+
+# Rolling conversation summary configuration
+SUMMARY_ENABLED = os.getenv("SUMMARY_ENABLED", "1") == "1"
+SUMMARY_EVERY_N_TURNS = int(os.getenv("SUMMARY_EVERY_N_TURNS", "4"))
+SUMMARY_KEEP_RECENT_MESSAGES = int(os.getenv("SUMMARY_KEEP_RECENT_MESSAGES", "6"))
+SUMMARY_MAX_TOKENS = int(os.getenv("SUMMARY_MAX_TOKENS", "300"))
+SUMMARY_MODE = os.getenv("SUMMARY_MODE", "extractive")  # extractive | model
+# Upper bound on unsummarized messages loaded for one prompt (the packer trims to budget)
+SUMMARY_MAX_RECENT_MESSAGES = int(os.getenv("SUMMARY_MAX_RECENT_MESSAGES", "200"))
+
+
+def _as_history(messages):
+    return [
+        {"role": "user" if message.is_user else "assistant", "content": message.content}
+        for message in messages
+    ]
+
+
+def _trim_lines(text, max_tokens, count):
+    """Drop the oldest summary lines until the text fits max_tokens"""
+    lines = text.splitlines()
+    while lines and count("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+class ConversationSummarizer:
+    """
+    Keeps Conversation.summary up to date in the background.
+
+    Every `every_n_turns` persisted turns, the messages written since the
+    last run (minus the `keep_recent` newest ones, which are still sent
+    verbatim) are folded into the stored summary. The prompt builder then
+    sends that summary plus every message after it (`turns_after`).
+    """
+
+    def __init__(self, every_n_turns=4, keep_recent=6, max_tokens=300, mode="extractive"):
+        self.every_n_messages = every_n_turns * 2
+        self.keep_recent = keep_recent
+        self.max_tokens = max_tokens
+        self.mode = mode
+        # Optional coroutine (text, max_tokens) -> summary, registered by ai_model
+        self.model_summarizer = None
+        self.refreshes = 0
+        self._pending = {}
+        self._running = set()
+        # Strong references to refresh tasks; the event loop only keeps weak ones
+        self._tasks = set()
+        self._summaries = TTLCache(maxsize=10000, ttl=600)
+
+    def on_messages_written(self, written):
+        """ChatWriter flush listener: count new messages, schedule refreshes"""
+        for conversation_id, count in written.items():
+            pending = self._pending.get(conversation_id, 0) + count
+            if pending >= self.every_n_messages and conversation_id not in self._running:
+                self._pending[conversation_id] = 0
+                self._running.add(conversation_id)
+                task = asyncio.get_running_loop().create_task(self._refresh_in_background(conversation_id))
+                self._tasks.add(task)
+                task.add_done_callback(self._task_done)
+            else:
+                self._pending[conversation_id] = pending
+
+    def _task_done(self, task):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"Summary refresh task failed: {task.exception()}")
+
+    async def get_summary(self, conversation_id):
+        """
+        (summary, id of the last message it covers) for the prompt builder;
+        cached, and (None, None) if there is no summary yet
+        """
+        if conversation_id is None:
+            return None, None
+        cached = self._summaries.get(conversation_id)
+        if cached is None:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Conversation.summary, Conversation.summarized_through_id)
+                    .where(Conversation.id == conversation_id)
+                )
+                row = result.first()
+            cached = (row[0] or "", row[1]) if row is not None else ("", None)
+            self._summaries.set(conversation_id, cached)
+        summary, through_id = cached
+        return (summary, through_id) if summary else (None, None)
+
+    async def turns_after(self, conversation_id, message_id, limit=SUMMARY_MAX_RECENT_MESSAGES):
+        """Stored messages after `message_id`, oldest first, as history entries"""
+        async with AsyncSessionLocal() as db:
+            query = select(Message).where(Message.conversation_id == conversation_id)
+            if message_id is not None:
+                query = query.where(Message.id > message_id)
+            result = await db.execute(query.order_by(Message.created_at.desc(), Message.id.desc()).limit(limit))
+            messages = result.scalars().all()
+        return _as_history(reversed(messages))
+
+    async def _refresh_in_background(self, conversation_id):
+        try:
+            await self.refresh(conversation_id)
+        except Exception as e:
+            print(f"Summary refresh failed for conversation {conversation_id}: {e}")
+        finally:
+            self._running.discard(conversation_id)
+
+    async def refresh(self, conversation_id):
+        async with AsyncSessionLocal() as db:
+            conversation = await db.get(Conversation, conversation_id)
+            if conversation is None:
+                return
+            query = select(Message).where(Message.conversation_id == conversation_id)
+            if conversation.summarized_through_id is not None:
+                query = query.where(Message.id > conversation.summarized_through_id)
+            result = await db.execute(query.order_by(Message.created_at, Message.id))
+            messages = result.scalars().all()
+            to_fold = messages[:-self.keep_recent] if self.keep_recent else messages
+            if not to_fold:
+                return
+
+            conversation.summary = await self._fold(conversation.summary, _as_history(to_fold))
+            conversation.summarized_through_id = to_fold[-1].id
+            await db.commit()
+            self._summaries.set(conversation_id, (conversation.summary, conversation.summarized_through_id))
+            self.refreshes += 1
+
+    async def _fold(self, previous, new_turns):
+        count = history_packer.count_text
+        if self.mode == "model" and self.model_summarizer is not None:
+            text = "\n".join(
+                f"{'User' if turn['role'] == 'user' else 'Assistant'}: {turn['content']}"
+                for turn in new_turns
+            )
+            if previous:
+                text = f"Earlier summary:\n{previous}\n\nNew turns:\n{text}"
+            try:
+                return await self.model_summarizer(text, self.max_tokens)
+            except Exception as e:
+                print(f"Model summary failed, using extractive summary: {e}")
+        addition = extractive_summary(new_turns, self.max_tokens, count)
+        combined = f"{previous}\n{addition}" if previous else addition
+        return _trim_lines(combined, self.max_tokens, count)
+
+    def stats(self):
+        return {"enabled": SUMMARY_ENABLED, "mode": self.mode, "refreshes": self.refreshes, "running": len(self._running)}
+
+
+conversation_summaries = ConversationSummarizer(
+    every_n_turns=SUMMARY_EVERY_N_TURNS,
+    keep_recent=SUMMARY_KEEP_RECENT_MESSAGES,
+    max_tokens=SUMMARY_MAX_TOKENS,
+    mode=SUMMARY_MODE,
+)
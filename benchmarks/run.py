@@ -0,0 +1,349 @@
+# benchmarks/run.py
+"""
+Micro-benchmarks for the backend hot paths.
+
+Each case is calibrated to run for about `--min-time` seconds per round;
+the median of several rounds is reported. Results are written as JSON and
+can be compared against a saved baseline, failing when a case got slower
+than the allowed threshold.
+
+    python -m benchmarks.run --save benchmarks/baseline.json
+    python -m benchmarks.run --compare benchmarks/baseline.json --threshold 0.25
+
+The message search cases run against a synthetic corpus of `--search-rows`
+messages (BENCH_SEARCH_ROWS, default 1,000,000) spread over many users; it
+is only built when a search case is selected.
+"""
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import platform
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta, timezone
+
+# Benchmarks use their own throwaway database; set before the backend reads its settings
+_BENCH_DB = os.path.join(tempfile.mkdtemp(prefix="health-bench-"), "bench.db")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_BENCH_DB}")
+
+from jose import jwt  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from reactpy.core.layout import Layout  # noqa: E402
+from reactpy.core.types import LayoutEventMessage  # noqa: E402
+from backend import auth, chat_service  # noqa: E402
+from backend.database import init_db, engine, AsyncSessionLocal, async_engine  # noqa: E402
+from backend.models import Message, User  # noqa: E402
+from backend.intents import IntentMatcher, mock_intents  # noqa: E402
+from backend.faq import faq_index  # noqa: E402
+from backend.search import search_messages  # noqa: E402
+from frontend.components.pages.chat import ChatPage  # noqa: E402
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench-password"
+MOCK_MESSAGES = [
+    "hi there",
+    "I have a headache since this morning",
+    "why am I always tired after lunch",
+    "what should I eat before a run",
+    "tell me something about blood pressure",
+]
+TRANSCRIPT_MESSAGES = 1000
+SEARCH_USERS = 1000
+SEARCH_CONVERSATIONS_PER_USER = 10
+SEARCH_WORDS = (
+    "sleep water headache tired morning evening walk run stretch diet protein sugar coffee "
+    "stress anxiety doctor vitamin iron hydration muscle joint knee back pain fever cough "
+    "allergy rash blood pressure heart breathing weight exercise routine meal lunch dinner"
+).split()
+
+
+def _history(turns):
+    history = []
+    for index in range(turns):
+        history.append({"role": "user", "content": f"Question {index}: is it fine to walk every day after dinner?"})
+        history.append({"role": "assistant", "content": f"Answer {index}: a short walk after meals helps digestion and blood sugar."})
+    return history
+
+
+def _chat_log(count):
+    return [
+        {
+            "id": f"bench-{index}",
+            "type": "user" if index % 2 == 0 else "ai",
+            "content": f"Message {index} about sleep, hydration and exercise.",
+            "timestamp": "2024-01-01T12:00:00",
+        }
+        for index in range(count)
+    ]
+
+
+async def _render_chat_page(messages):
+    async with Layout(ChatPage(token="bench", user={"name": "Bench"}, initial_messages=messages)) as layout:
+        await layout.render()
+
+
+def _find_by_key(model, key):
+    if isinstance(model, dict):
+        if model.get("key") == key:
+            return model
+        for child in model.get("children", ()):
+            found = _find_by_key(child, key)
+            if found is not None:
+                return found
+    return None
+
+
+async def _scroll_chat_page(conversation_id):
+    """Open a stored transcript and click "Show earlier" until its first message is mounted"""
+    async with Layout(ChatPage(token="bench", user={"name": "Bench"}, conversation_id=conversation_id)) as layout:
+        await layout.render()
+        update = await layout.render()  # after open_conversation loaded the newest page
+        while (button := _find_by_key(update["model"], "show-earlier")) is not None:
+            target = button["eventHandlers"]["on_click"]["target"]
+            await layout.deliver(LayoutEventMessage(type="layout-event", target=target, data=[{}]))
+            update = await layout.render()
+
+
+async def _prepare_database():
+    init_db()
+    async with AsyncSessionLocal() as db:
+        if await auth.get_user_by_email(db, BENCH_EMAIL) is None:
+            db.add(User(email=BENCH_EMAIL, hashed_password=auth.get_password_hash(BENCH_PASSWORD)))
+            await db.commit()
+
+
+def _seed_transcript(user_id, count):
+    """One stored conversation of `count` messages for the bench user; returns its id"""
+    title = f"Bench transcript {count}"
+    with engine.begin() as conn:
+        conversation_id = conn.execute(
+            text("SELECT id FROM conversations WHERE user_id = :user_id AND title = :title"),
+            {"user_id": user_id, "title": title},
+        ).scalar()
+        if conversation_id is not None:
+            return conversation_id
+        conversation_id = conn.execute(
+            text("INSERT INTO conversations (user_id, title) VALUES (:user_id, :title) RETURNING id"),
+            {"user_id": user_id, "title": title},
+        ).scalar()
+        conn.execute(
+            text("UPDATE id_blocks SET next_id = :next_id WHERE name = 'conversations' AND next_id < :next_id"),
+            {"next_id": conversation_id + 1},
+        )
+        # Timestamps written the way ChatWriter writes them, so the history cursor pages through them
+        start = datetime.now(timezone.utc) - timedelta(seconds=count)
+        conn.execute(Message.__table__.insert(), [
+            {
+                "conversation_id": conversation_id,
+                "content": message["content"],
+                "is_user": int(message["type"] == "user"),
+                "created_at": start + timedelta(seconds=index),
+            }
+            for index, message in enumerate(_chat_log(count))
+        ])
+    return conversation_id
+
+
+def _seed_search_corpus(rows):
+    """Spread `rows` messages round-robin over SEARCH_USERS users' conversations"""
+    with engine.begin() as conn:
+        seeded = conn.execute(text(
+            "SELECT COUNT(*) FROM messages m JOIN conversations c ON c.id = m.conversation_id "
+            "WHERE c.title NOT LIKE 'Bench transcript %'"
+        )).scalar()
+        if seeded >= rows:
+            return
+        bench_id = conn.execute(text("SELECT id FROM users WHERE email = :email"), {"email": BENCH_EMAIL}).scalar()
+        conn.exec_driver_sql(
+            "INSERT INTO users (email, hashed_password) VALUES (?, ?)",
+            [(f"search-{index}@example.com", "!") for index in range(1, SEARCH_USERS)],
+        )
+        owners = [bench_id] + [
+            row[0] for row in conn.execute(text("SELECT id FROM users WHERE email LIKE 'search-%@example.com'"))
+        ]
+        conn.exec_driver_sql(
+            "INSERT INTO conversations (user_id, title) VALUES (?, ?)",
+            [(owner, f"Thread {index}") for owner in owners for index in range(SEARCH_CONVERSATIONS_PER_USER)],
+        )
+        conversation_ids = [row[0] for row in conn.execute(text("SELECT id FROM conversations ORDER BY id"))]
+        # Ids now come from the table; keep the write-behind allocator past them
+        conn.execute(
+            text("UPDATE id_blocks SET next_id = :next_id WHERE name = 'conversations'"),
+            {"next_id": conversation_ids[-1] + 1},
+        )
+        rng = random.Random(7)
+        for start in range(0, rows, 50_000):
+            conn.exec_driver_sql(
+                "INSERT INTO messages (conversation_id, content, is_user) VALUES (?, ?, ?)",
+                [
+                    (conversation_ids[index % len(conversation_ids)], " ".join(rng.choices(SEARCH_WORDS, k=12)), index % 2)
+                    for index in range(start, min(start + 50_000, rows))
+                ],
+            )
+
+
+async def _search(user_id, query):
+    async with AsyncSessionLocal() as db:
+        await search_messages(db, user_id, query)
+
+
+async def _lookup_user():
+    async with AsyncSessionLocal() as db:
+        await auth.get_user_by_email(db, BENCH_EMAIL)
+
+
+def build_cases():
+    """name -> (callable, is_async)"""
+    token = auth.create_access_token({"sub": BENCH_EMAIL})
+    hashed = auth.get_password_hash(BENCH_PASSWORD)
+    history = _history(20)
+    mock_index = [0]
+
+    def mock_matcher():
+        mock_index[0] = (mock_index[0] + 1) % len(MOCK_MESSAGES)
+        return chat_service.mock_response(MOCK_MESSAGES[mock_index[0]])
+
+    # Scaling check: matching against hundreds of intents should cost about the same
+    many_intents = IntentMatcher(
+        mock_intents.intents + [
+            {"name": f"synthetic-{index}", "priority": 0, "keywords": [f"term{index}", f"topic{index} words"], "response": ""}
+            for index in range(300)
+        ],
+        mock_intents.fallback,
+    )
+
+    def mock_matcher_many():
+        mock_index[0] = (mock_index[0] + 1) % len(MOCK_MESSAGES)
+        return many_intents.respond(MOCK_MESSAGES[mock_index[0]])
+
+    cases = {
+        "jwt_create": (lambda: auth.create_access_token({"sub": BENCH_EMAIL}), False),
+        "jwt_decode": (lambda: jwt.decode(token, auth.SECRET_KEY, algorithms=[auth.ALGORITHM]), False),
+        f"verify_password_rounds_{auth.BCRYPT_ROUNDS}": (lambda: auth.verify_password(BENCH_PASSWORD, hashed), False),
+        "chat_payload_20_turns": (lambda: chat_service.build_chat_payload("How much water should I drink?", history), False),
+        "custom_payload_20_turns": (lambda: chat_service.build_custom_payload("How much water should I drink?", history), False),
+        "mock_matcher": (mock_matcher, False),
+        "mock_matcher_300_intents": (mock_matcher_many, False),
+        "faq_search": (lambda: faq_index.search("how much water should I drink each day"), False),
+        "faq_search_batch_32": (lambda: faq_index.search_batch(MOCK_MESSAGES * 6 + MOCK_MESSAGES[:2]), False),
+        "user_lookup_by_email": (_lookup_user, True),
+    }
+    # Only the transcript window is mounted, so a longer log renders like this one;
+    # the scroll case covers long transcripts: window moves plus paging in older messages
+    messages = _chat_log(10)
+    cases["chat_page_render_10"] = (lambda: _render_chat_page(messages), True)
+    with engine.connect() as conn:
+        bench_id = conn.execute(text("SELECT id FROM users WHERE email = :email"), {"email": BENCH_EMAIL}).scalar()
+    transcript_id = _seed_transcript(bench_id, TRANSCRIPT_MESSAGES)
+    cases[f"chat_page_scroll_{TRANSCRIPT_MESSAGES}"] = (lambda: _scroll_chat_page(transcript_id), True)
+    cases["message_search_common_term"] = (lambda: _search(bench_id, "sleep"), True)
+    cases["message_search_two_terms"] = (lambda: _search(bench_id, "headache morning"), True)
+    cases["message_search_stemmed"] = (lambda: _search(bench_id, "hydrated"), True)
+    return cases
+
+
+def _time_round(loop, fn, is_async, iterations):
+    if is_async:
+        async def batch():
+            for _ in range(iterations):
+                await fn()
+        start = time.perf_counter()
+        loop.run_until_complete(batch())
+    else:
+        start = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+    return (time.perf_counter() - start) / iterations
+
+
+def measure(loop, fn, is_async, min_time, rounds):
+    # Grow the batch until one round takes at least min_time
+    iterations = 1
+    while True:
+        start = time.perf_counter()
+        _time_round(loop, fn, is_async, iterations)
+        if time.perf_counter() - start >= min_time or iterations >= 1_000_000:
+            break
+        iterations *= 2
+    samples = [_time_round(loop, fn, is_async, iterations) for _ in range(rounds)]
+    return {
+        "median_us": round(statistics.median(samples) * 1e6, 3),
+        "min_us": round(min(samples) * 1e6, 3),
+        "stdev_us": round(statistics.pstdev(samples) * 1e6, 3),
+        "iterations": iterations,
+        "rounds": rounds,
+    }
+
+
+def compare(results, baseline, threshold):
+    """Cases slower than baseline by more than `threshold` (a fraction)"""
+    regressions = []
+    for name, result in results["cases"].items():
+        before = baseline["cases"].get(name)
+        if before is None:
+            continue
+        change = result["median_us"] / before["median_us"] - 1
+        result["baseline_median_us"] = before["median_us"]
+        result["change"] = round(change, 4)
+        if change > threshold:
+            regressions.append((name, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the backend micro-benchmarks")
+    parser.add_argument("--filter", help="only run cases whose name contains this text")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--save", help="write results as the new baseline to this file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed slowdown against the baseline (0.25 = 25%%)")
+    parser.add_argument("--search-rows", type=int, default=int(os.getenv("BENCH_SEARCH_ROWS", "1000000")),
+                        help="messages in the synthetic search corpus")
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(_prepare_database())
+    cases = {
+        name: case for name, case in build_cases().items()
+        if not args.filter or args.filter in name
+    }
+    if any(name.startswith("message_search") for name in cases):
+        _seed_search_corpus(args.search_rows)
+
+    results = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "search_rows": args.search_rows,
+        "cases": {},
+    }
+    for name, (fn, is_async) in cases.items():
+        results["cases"][name] = measure(loop, fn, is_async, args.min_time, args.rounds)
+        print(f"{name:<32} {results['cases'][name]['median_us']:>14.1f} us")
+
+    loop.run_until_complete(async_engine.dispose())
+    loop.close()
+
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        for name, change in regressions:
+            print(f"REGRESSION {name}: {change:+.1%} against baseline")
+    for path in (args.output, args.save):
+        if path:
+            with open(path, "w") as f:
+                json.dump(results, f, indent=2)
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
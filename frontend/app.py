@@ -1,10 +1,21 @@
 # frontend/app.py
 from reactpy import component, html, hooks
+from frontend.components.auth import AuthBox
 from frontend.components.sidebar import Sidebar
 from frontend.components.pages.home import HomePage
 from frontend.components.pages.chat import ChatPage
 from frontend.components.pages.profile import ProfilePage
 from frontend.styles.common import FONT_FAMILY, LIGHT_BG
+from frontend.styles.registry import styles
+from backend.metrics import REACTPY_SESSIONS
+
+styles.define("app-shell", {"display": "flex", "minHeight": "100vh", "fontFamily": FONT_FAMILY, "background": LIGHT_BG})
+styles.define("app-main", {"flex": 1, "background": LIGHT_BG, "marginLeft": "280px"})
+
+
+def stylesheet_link():
+    """The registry's generated CSS, served by /api/styles.css and cached by version"""
+    return html.link({"rel": "stylesheet", "href": f"/api/styles.css?v={styles.version()}"})
 
 
 @component
@@ -12,6 +23,12 @@ def frontend_app():
     authenticated, set_authenticated = hooks.use_state(True)  # Set to True for testing
     current_page, set_page = hooks.use_state("Home")
 
+    # Count mounted sessions for /api/metrics
+    @hooks.use_effect(dependencies=[])
+    def track_session():
+        REACTPY_SESSIONS.inc()
+        return REACTPY_SESSIONS.dec
+
     # Mock user data for testing
     mock_user = {
         "email": "test@example.com",
@@ -19,11 +36,13 @@ def frontend_app():
     }
 
     if not authenticated:
-        from components.auth import AuthBox
-        return AuthBox(
-            on_authenticated=set_authenticated, 
-            set_token=lambda x: None,  # Mock function for now
-            set_user=lambda x: None    # Mock function for now
+        return html._(
+            stylesheet_link(),
+            AuthBox(
+                on_authenticated=set_authenticated, 
+                set_token=lambda x: None,  # Mock function for now
+                set_user=lambda x: None    # Mock function for now
+            )
         )
 
     if current_page == "Logout":
@@ -39,12 +58,8 @@ def frontend_app():
     }.get(current_page, HomePage())
 
     return html.div(
-        {"style": {
-            "display": "flex",
-            "minHeight": "100vh",
-            "fontFamily": FONT_FAMILY,
-            "background": LIGHT_BG
-        }},
+        {"class_name": styles.class_name("app-shell")},
+        stylesheet_link(),
         Sidebar(current_page, set_page, mock_user),
-        html.div({"style": {"flex": 1, "background": LIGHT_BG, "marginLeft": "280px"}}, page_component),
+        html.div({"class_name": styles.class_name("app-main")}, page_component),
     )
\ No newline at end of file
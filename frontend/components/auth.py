@@ -1,9 +1,72 @@
 # frontend/components/auth.py
 from reactpy import component, html, hooks
 from frontend.styles.colors import *
-from frontend.styles.common import get_input_styles, get_button_styles, FONT_FAMILY
+from frontend.styles.common import FONT_FAMILY, button_class
+from frontend.styles.registry import styles
 import json
 
+styles.define("auth-box", {
+    "border": f"1px solid {BORDER_COLOR}",
+    "padding": "2.5rem",
+    "borderRadius": "12px",
+    "maxWidth": "420px",
+    "margin": "4rem auto",
+    "boxShadow": "0 8px 32px rgba(0, 0, 0, 0.08)",
+    "background": WHITE,
+    "fontFamily": FONT_FAMILY
+})
+styles.define("auth-header", {"textAlign": "center", "marginBottom": "2rem"})
+styles.define("auth-logo", {
+    "background": PRIMARY_GRADIENT,
+    "width": "60px",
+    "height": "60px",
+    "borderRadius": "12px",
+    "display": "flex",
+    "alignItems": "center",
+    "justifyContent": "center",
+    "margin": "0 auto 1rem",
+    "color": WHITE,
+    "fontSize": "1.5rem"
+})
+styles.define("auth-title", {"marginBottom": "0.5rem", "color": TEXT_PRIMARY, "fontWeight": "600", "fontSize": "1.5rem"})
+styles.define("auth-subtitle", {"color": TEXT_TERTIARY, "margin": "0", "fontSize": "0.9rem"})
+styles.define("auth-field", {"marginBottom": "1.5rem"})
+styles.define("auth-field-last", {"marginBottom": "2rem"})
+styles.define("auth-label", {
+    "display": "block",
+    "marginBottom": "0.5rem",
+    "color": TEXT_SECONDARY,
+    "fontWeight": "500",
+    "fontSize": "0.9rem"
+})
+styles.define("auth-footer", {
+    "textAlign": "center",
+    "marginTop": "1.5rem",
+    "paddingTop": "1.5rem",
+    "borderTop": f"1px solid {BORDER_COLOR}"
+})
+styles.define("auth-footer-text", {"color": TEXT_TERTIARY, "margin": "0 0 1rem 0", "fontSize": "0.9rem"})
+styles.define("auth-toggle", {
+    "background": "none",
+    "border": "none",
+    "color": "#667eea",
+    "cursor": "pointer",
+    "fontSize": "0.9rem",
+    "fontWeight": "600",
+    "textDecoration": "underline",
+    "transition": "color 0.2s ease"
+}, hover={"color": "#764ba2"})
+styles.define("auth-error", {
+    "color": ERROR,
+    "marginTop": "1rem",
+    "padding": "0.75rem",
+    "background": "#fed7d7",
+    "borderRadius": "6px",
+    "textAlign": "center",
+    "fontSize": "0.9rem"
+})
+styles.define("auth-status", {"textAlign": "center", "marginTop": "1rem", "color": TEXT_TERTIARY})
+
 
 @component
 def AuthBox(on_authenticated, set_token, set_user):
@@ -12,10 +75,6 @@ def AuthBox(on_authenticated, set_token, set_user):
     error_msg, set_error_msg = hooks.use_state("")
     loading, set_loading = hooks.use_state(False)
     is_login, set_is_login = hooks.use_state(True)
-    
-    # Hover state for buttons
-    login_hover, set_login_hover = hooks.use_state(False)
-    toggle_hover, set_toggle_hover = hooks.use_state(False)
 
     async def handle_auth(event):
         if not email or not password:
@@ -41,161 +100,56 @@ def AuthBox(on_authenticated, set_token, set_user):
         finally:
             set_loading(False)
 
-    def get_login_button_style():
-        base_style = get_button_styles("primary")
-        if login_hover and not loading:
-            base_style.update({
-                "transform": "translateY(-1px)",
-                "boxShadow": HOVER_SHADOW
-            })
-        return base_style
-
     return html.div(
-        {"style": {
-            "border": f"1px solid {BORDER_COLOR}",
-            "padding": "2.5rem",
-            "borderRadius": "12px",
-            "maxWidth": "420px",
-            "margin": "4rem auto",
-            "boxShadow": "0 8px 32px rgba(0, 0, 0, 0.08)",
-            "background": WHITE,
-            "fontFamily": FONT_FAMILY
-        }},
+        {"class_name": styles.class_name("auth-box")},
         html.div(
-            {"style": {
-                "textAlign": "center",
-                "marginBottom": "2rem"
-            }},
-            html.div({
-                "style": {
-                    "background": PRIMARY_GRADIENT,
-                    "width": "60px",
-                    "height": "60px",
-                    "borderRadius": "12px",
-                    "display": "flex",
-                    "alignItems": "center",
-                    "justifyContent": "center",
-                    "margin": "0 auto 1rem",
-                    "color": WHITE,
-                    "fontSize": "1.5rem"
-                }
-            }, "🏥"),
-            html.h2({
-                "style": {
-                    "marginBottom": "0.5rem",
-                    "color": TEXT_PRIMARY,
-                    "fontWeight": "600",
-                    "fontSize": "1.5rem"
-                }
-            }, "Welcome to Health AI"),
-            html.p({
-                "style": {
-                    "color": TEXT_TERTIARY,
-                    "margin": "0",
-                    "fontSize": "0.9rem"
-                }
-            }, "Sign in to your health assistant account")
+            {"class_name": styles.class_name("auth-header")},
+            html.div({"class_name": styles.class_name("auth-logo")}, "🏥"),
+            html.h2({"class_name": styles.class_name("auth-title")}, "Welcome to Health AI"),
+            html.p({"class_name": styles.class_name("auth-subtitle")}, "Sign in to your health assistant account")
         ),
 
         html.div(
-            {"style": {"marginBottom": "1.5rem"}},
-            html.label({
-                "style": {
-                    "display": "block",
-                    "marginBottom": "0.5rem",
-                    "color": TEXT_SECONDARY,
-                    "fontWeight": "500",
-                    "fontSize": "0.9rem"
-                }
-            }, "Email"),
+            {"class_name": styles.class_name("auth-field")},
+            html.label({"class_name": styles.class_name("auth-label")}, "Email"),
             html.input({
                 "type": "email",
                 "value": email,
                 "on_change": lambda e: set_email(e["target"]["value"]),
                 "placeholder": "Enter your email",
-                "style": get_input_styles(),
+                "class_name": styles.class_name("input"),
             }),
         ),
 
         html.div(
-            {"style": {"marginBottom": "2rem"}},
-            html.label({
-                "style": {
-                    "display": "block",
-                    "marginBottom": "0.5rem",
-                    "color": TEXT_SECONDARY,
-                    "fontWeight": "500",
-                    "fontSize": "0.9rem"
-                }
-            }, "Password"),
+            {"class_name": styles.class_name("auth-field-last")},
+            html.label({"class_name": styles.class_name("auth-label")}, "Password"),
             html.input({
                 "type": "password",
                 "value": password,
                 "on_change": lambda e: set_password(e["target"]["value"]),
                 "placeholder": "Enter your password",
-                "style": get_input_styles(),
+                "class_name": styles.class_name("input"),
             }),
         ),
 
         html.button({
             "on_click": handle_auth,
-            "on_mouse_enter": lambda e: set_login_hover(True),
-            "on_mouse_leave": lambda e: set_login_hover(False),
-            "style": get_login_button_style(),
+            "class_name": button_class("primary"),
             "disabled": loading
         }, "Sign In" if is_login else "Sign Up"),
 
-        html.div({
-            "style": {
-                "textAlign": "center",
-                "marginTop": "1.5rem",
-                "paddingTop": "1.5rem",
-                "borderTop": f"1px solid {BORDER_COLOR}"
-            }
-        },
-            html.p({
-                "style": {
-                    "color": TEXT_TERTIARY,
-                    "margin": "0 0 1rem 0",
-                    "fontSize": "0.9rem"
-                }
-            }, 
+        html.div({"class_name": styles.class_name("auth-footer")},
+            html.p({"class_name": styles.class_name("auth-footer-text")}, 
                 "Don't have an account? " if is_login else "Already have an account? "
             ),
             html.button({
                 "on_click": lambda e: (set_is_login(not is_login), set_error_msg("")),
-                "on_mouse_enter": lambda e: set_toggle_hover(True),
-                "on_mouse_leave": lambda e: set_toggle_hover(False),
-                "style": {
-                    "background": "none",
-                    "border": "none",
-                    "color": "#667eea" if not toggle_hover else "#764ba2",
-                    "cursor": "pointer",
-                    "fontSize": "0.9rem",
-                    "fontWeight": "600",
-                    "textDecoration": "underline",
-                    "transition": "color 0.2s ease"
-                }
+                "class_name": styles.class_name("auth-toggle")
             }, "Sign Up" if is_login else "Sign In")
         ),
 
-        error_msg and html.p({
-            "style": {
-                "color": ERROR,
-                "marginTop": "1rem",
-                "padding": "0.75rem",
-                "background": "#fed7d7",
-                "borderRadius": "6px",
-                "textAlign": "center",
-                "fontSize": "0.9rem"
-            }
-        }, error_msg),
+        error_msg and html.p({"class_name": styles.class_name("auth-error")}, error_msg),
 
-        loading and html.div({
-            "style": {
-                "textAlign": "center",
-                "marginTop": "1rem",
-                "color": TEXT_TERTIARY
-            }
-        }, "Processing...")
+        loading and html.div({"class_name": styles.class_name("auth-status")}, "Processing...")
     )
\ No newline at end of file
@@ -1,294 +1,374 @@
 # frontend/components/pages/chat.py
 from reactpy import component, html, hooks
 from frontend.styles.colors import *
-from frontend.styles.common import FONT_FAMILY, get_input_styles, get_button_styles, get_card_styles
-import json
+from frontend.styles.common import FONT_FAMILY, LIGHT_BG, button_class
+from frontend.styles.registry import styles
+from backend.conversations import load_message_page
+from backend.persistence import chat_writer
+from backend import chat_service
+from backend.auth import user_for_token
+import time
 import datetime
+import itertools
+
+# Messages kept client-side as context for the next request
+MAX_HISTORY_MESSAGES = 40
+
+# Windowed transcript: only TRANSCRIPT_WINDOW messages (plus overscan) are mounted,
+# at most TRANSCRIPT_MAX_MESSAGES are held in memory, older ones load in pages
+TRANSCRIPT_WINDOW = 40
+TRANSCRIPT_OVERSCAN = 10
+TRANSCRIPT_PAGE_SIZE = 50
+TRANSCRIPT_MAX_MESSAGES = 200
+
+# Minimum seconds between transcript updates while an answer streams in
+STREAM_RENDER_INTERVAL = 0.05
+
+# Stable per-process message ids, used as render keys
+_message_ids = itertools.count(1)
+
+
+def new_message(message_type, content, timestamp=None):
+    return {
+        "id": f"msg-{next(_message_ids)}",
+        "type": message_type,
+        "content": content,
+        "timestamp": timestamp or datetime.datetime.now().isoformat()
+    }
+
+
+def message_from_record(record):
+    """Chat log entry for a message loaded from the backend"""
+    return {
+        "id": f"db-{record['id']}",
+        "type": "user" if record["role"] == "user" else "ai",
+        "content": record["content"],
+        "timestamp": record["created_at"] or ""
+    }
+
+
+def visible_range(total, window_end):
+    """Slice of the chat log to mount; window_end None follows the newest message"""
+    end = total if window_end is None else min(window_end, total)
+    start = max(0, end - TRANSCRIPT_WINDOW)
+    return max(0, start - TRANSCRIPT_OVERSCAN), min(total, end + TRANSCRIPT_OVERSCAN)
+
+
+def format_timestamp(timestamp):
+    try:
+        dt = datetime.datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+        return dt.strftime("%H:%M")
+    except:
+        return ""
+
+
+# Styles are registered once and referenced by class name, so re-renders
+# only ship short class strings instead of full style dicts
+styles.define("chat-page", {"padding": "2rem", "marginLeft": "280px", "minHeight": "100vh",
+                            "background": LIGHT_BG, "fontFamily": FONT_FAMILY})
+styles.define("chat-panel", {"maxWidth": "800px", "margin": "0 auto", "background": WHITE, "borderRadius": "16px",
+                             "boxShadow": CARD_SHADOW, "overflow": "hidden", "height": "80vh",
+                             "display": "flex", "flexDirection": "column"})
+styles.define("chat-header", {"background": PRIMARY_GRADIENT, "padding": "1.5rem 2rem", "color": WHITE})
+styles.define("chat-title", {"margin": "0", "fontSize": "1.5rem", "fontWeight": "600"})
+styles.define("chat-subtitle", {"margin": "0.5rem 0 0 0", "opacity": "0.9", "fontSize": "0.9rem"})
+styles.define("chat-transcript", {"flex": "1", "padding": "1.5rem", "overflowY": "auto", "background": "#fafbfc",
+                                  "display": "flex", "flexDirection": "column", "gap": "1rem"})
+styles.define("chat-welcome", {"textAlign": "center", "padding": "2rem", "color": TEXT_TERTIARY})
+styles.define("chat-welcome-title", {"marginBottom": "1rem"})
+styles.define("chat-welcome-text", {"marginBottom": "0.5rem"})
+styles.define("chat-welcome-list", {"textAlign": "left", "display": "inline-block"})
+styles.define("chat-disclaimer", {"marginTop": "1rem", "padding": "0.75rem", "background": "#fff5f5",
+                                  "borderRadius": "8px", "fontSize": "0.9rem", "color": "#c53030"})
+
+styles.define("chat-row", {"display": "flex", "flexDirection": "column", "gap": "0.25rem"})
+styles.define("chat-row-ai", {"alignItems": "flex-start"})
+styles.define("chat-row-user", {"alignItems": "flex-end"})
+styles.define("chat-bubble", {"padding": "1rem 1.25rem", "borderRadius": "12px", "maxWidth": "80%", "position": "relative"})
+styles.define("chat-bubble-ai", {"background": "#667eea", "color": WHITE, "border": "none",
+                                 "boxShadow": "0 2px 8px rgba(102, 126, 234, 0.3)"})
+styles.define("chat-bubble-user", {"background": WHITE, "color": TEXT_PRIMARY, "border": f"1px solid {BORDER_COLOR}",
+                                   "boxShadow": "0 2px 8px rgba(0, 0, 0, 0.06)"})
+styles.define("chat-bubble-error", {"background": WHITE, "color": TEXT_PRIMARY, "border": "none",
+                                    "boxShadow": "0 2px 8px rgba(102, 126, 234, 0.3)"})
+styles.define("chat-author", {"fontWeight": "600", "marginBottom": "0.25rem", "fontSize": "0.8rem", "opacity": "0.8"})
+styles.define("chat-content", {"fontSize": "0.9rem", "lineHeight": "1.5", "whiteSpace": "pre-wrap"})
+styles.define("chat-time", {"fontSize": "0.7rem", "opacity": "0.6", "marginTop": "0.5rem", "textAlign": "right"})
+
+styles.define("chat-transcript-button", {"alignSelf": "center", "padding": "0.4rem 0.9rem",
+                                         "border": f"1px solid {BORDER_COLOR}", "borderRadius": "999px",
+                                         "background": WHITE, "color": TEXT_SECONDARY, "fontSize": "0.8rem",
+                                         "cursor": "pointer"})
+styles.define("chat-thinking", {"display": "flex", "alignItems": "center", "gap": "0.5rem", "padding": "1rem",
+                                "color": TEXT_TERTIARY, "fontSize": "0.9rem"})
+styles.define("chat-spinner", {"width": "12px", "height": "12px", "border": "2px solid #e2e8f0",
+                               "borderTop": "2px solid #667eea", "borderRadius": "50%",
+                               "animation": "spin 1s linear infinite"})
+styles.add_rule("@keyframes spin{from{transform:rotate(0deg)}to{transform:rotate(360deg)}}")
+
+styles.define("chat-input-bar", {"padding": "1.5rem", "borderTop": f"1px solid {BORDER_COLOR}", "background": WHITE})
+styles.define("chat-input-row", {"display": "flex", "gap": "1rem"})
+styles.define("chat-input", {"flex": "1"})
+styles.define("chat-hint", {"margin": "0.5rem 0 0 0", "color": TEXT_TERTIARY, "fontSize": "0.8rem", "textAlign": "center"})
+
+ROW_CLASSES = {
+    "ai": styles.class_name("chat-row", "chat-row-ai"),
+    "other": styles.class_name("chat-row", "chat-row-user"),
+}
+BUBBLE_CLASSES = {
+    message_type: styles.class_name("chat-bubble", f"chat-bubble-{message_type}")
+    for message_type in ("ai", "user", "error")
+}
+INPUT_CLASS = styles.class_name("input", "chat-input")
+
+
+@component
+def MessageBubble(message):
+    """One transcript entry; its VDOM is rebuilt only when the message changes"""
+    def build():
+        message_type = message["type"]
+        return html.div({"class_name": ROW_CLASSES["ai" if message_type == "ai" else "other"]},
+            html.div({"class_name": BUBBLE_CLASSES.get(message_type, BUBBLE_CLASSES["user"])},
+                html.div({"class_name": styles.class_name("chat-author")}, "AI Assistant" if message_type == "ai" else "You"),
+                html.div({"class_name": styles.class_name("chat-content")}, message["content"]),
+                html.div({"class_name": styles.class_name("chat-time")}, format_timestamp(message["timestamp"]))
+            )
+        )
+
+    return hooks.use_memo(build, [message["id"], message["type"], message["content"], message["timestamp"]])
 
 
 @component
-def ChatPage(token=None, user=None):
+def ChatInput(on_send, loading):
+    """
+    Message box and Send button. The draft text lives here, so a keystroke
+    re-renders only this component, not the transcript.
+    """
     user_input, set_user_input = hooks.use_state("")
-    chat_log, set_chat_log = hooks.use_state([])
+
+    async def submit(event):
+        text = user_input
+        if not text.strip() or loading:
+            return
+        set_user_input("")
+        await on_send(text)
+
+    async def handle_key_press(event):
+        if event["key"] == "Enter":
+            await submit(event)
+
+    return html.div({"class_name": styles.class_name("chat-input-bar")},
+        html.div({"class_name": styles.class_name("chat-input-row")},
+            html.input({
+                "type": "text",
+                "value": user_input,
+                "on_change": lambda e: set_user_input(e["target"]["value"]),
+                "placeholder": "Type your health question...",
+                "class_name": INPUT_CLASS,
+                "on_key_press": handle_key_press,
+                "disabled": loading
+            }),
+            html.button({
+                "on_click": submit,
+                "class_name": button_class("primary"),
+                "disabled": loading or not user_input.strip()
+            }, "Send" if not loading else "Sending...")
+        ),
+        html.p({"class_name": styles.class_name("chat-hint")}, "💡 Press Enter to send your message")
+    )
+
+@component
+def ChatPage(token=None, user=None, initial_messages=None, conversation_id=None, conversation_key=None):
+    chat_log, set_chat_log = hooks.use_state(initial_messages or [])
     loading, set_loading = hooks.use_state(False)
     conversation_history, set_conversation_history = hooks.use_state([])
+    active_conversation, set_active_conversation = hooks.use_state(conversation_id)
+    # Lets an anonymous session continue the conversation it started
+    active_key, set_active_key = hooks.use_state(conversation_key)
+    # Transcript window and lazy history paging
+    window_end, set_window_end = hooks.use_state(None)
+    older_cursor, set_older_cursor = hooks.use_state(None)
+    newer_trimmed, set_newer_trimmed = hooks.use_state(False)
+    loading_older, set_loading_older = hooks.use_state(False)
+
+    render_start, render_end = visible_range(len(chat_log), window_end)
 
-    async def send_message(event):
-        if not user_input.strip() or loading:
+    async def show_latest(cid):
+        """Replace the in-memory log with the newest stored page of the conversation"""
+        # Only this conversation's queued rows; gives up after CHAT_WRITE_WAIT_TIMEOUT
+        await chat_writer.flush_conversation(cid)
+        page = await load_message_page(cid, TRANSCRIPT_PAGE_SIZE)
+        set_chat_log([message_from_record(record) for record in page["messages"]])
+        set_older_cursor(page["next_cursor"])
+        set_newer_trimmed(False)
+        set_window_end(None)
+
+    @hooks.use_effect(dependencies=[conversation_id])
+    async def open_conversation():
+        if conversation_id is not None:
+            await show_latest(conversation_id)
+
+    async def show_earlier(event):
+        end = len(chat_log) if window_end is None else window_end
+        if render_start > 0:
+            # Still in memory: just move the window
+            set_window_end(max(TRANSCRIPT_WINDOW, end - TRANSCRIPT_WINDOW))
+            return
+        if not (older_cursor and active_conversation) or loading_older:
             return
+        set_loading_older(True)
+        try:
+            page = await load_message_page(active_conversation, TRANSCRIPT_PAGE_SIZE, older_cursor)
+        finally:
+            set_loading_older(False)
+        older = [message_from_record(record) for record in page["messages"]]
+        combined = older + chat_log
+        new_end = max(min(TRANSCRIPT_WINDOW, len(combined)), end + len(older) - TRANSCRIPT_WINDOW)
+        if len(combined) > TRANSCRIPT_MAX_MESSAGES:
+            # Release the newest messages; "Jump to latest" reloads them
+            combined = combined[:TRANSCRIPT_MAX_MESSAGES]
+            new_end = min(new_end, len(combined))
+            set_newer_trimmed(True)
+        set_chat_log(combined)
+        set_older_cursor(page["next_cursor"])
+        set_window_end(new_end)
+
+    async def jump_to_latest(event):
+        if newer_trimmed and active_conversation:
+            await show_latest(active_conversation)
+        else:
+            set_window_end(None)
+
+    def append_messages(*messages):
+        def update(log):
+            log = [*log, *messages]
+            # Without a stored conversation to page back into, just forget the oldest
+            return log[-TRANSCRIPT_MAX_MESSAGES:] if active_conversation is None else log
+        set_chat_log(update)
 
-        # Add user message to chat log immediately
-        user_message = {
-            "type": "user",
-            "content": user_input,
-            "timestamp": datetime.datetime.now().isoformat()
-        }
+    def replace_message(message_id, content):
+        set_chat_log(lambda log: [
+            {**msg, "content": content} if msg["id"] == message_id else msg for msg in log
+        ])
+
+    async def send_message(user_input):
+        if newer_trimmed and active_conversation:
+            await show_latest(active_conversation)
+        set_window_end(None)
+
+        # Add user message to chat log immediately, with an empty bubble for the answer
+        user_message = new_message("user", user_input)
+        ai_message = new_message("ai", "")
         
-        set_chat_log([*chat_log, user_message])
-        set_user_input("")
+        append_messages(user_message)
         set_loading(True)
 
+        last_render = [0.0]
+        streamed = []
+
+        def on_token(delta):
+            # Throttle re-renders; every update ships the changed bubble over the websocket,
+            # and the fragments are only joined for those updates
+            streamed.append(delta)
+            now = time.monotonic()
+            if now - last_render[0] >= STREAM_RENDER_INTERVAL:
+                if not last_render[0]:
+                    set_loading(False)
+                    append_messages(ai_message)
+                last_render[0] = now
+                replace_message(ai_message["id"], "".join(streamed))
+
         try:
-            # Use mock endpoint for now since we're avoiding OpenAI
-            response = await fetch(
-                "http://localhost:8000/ai/chat/mock",
-                method="POST",
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"Bearer {token}" if token else ""
-                },
-                body=json.dumps({
-                    "message": user_input,
-                    "conversation_history": conversation_history
-                })
-            )
-            
-            if response.status == 200:
-                data = await response.json()
-                ai_message = {
-                    "type": "ai",
-                    "content": data["response"],
-                    "timestamp": data.get("timestamp", datetime.datetime.now().isoformat())
-                }
-                
-                # Update conversation history for context
-                set_conversation_history([
-                    *conversation_history[-4:],  # Keep last 4 messages for context
-                    {"role": "user", "content": user_input},
-                    {"role": "assistant", "content": data["response"]}
-                ])
+            # The account behind the session token owns the conversation (None = anonymous)
+            account = await user_for_token(token)
+            conversation = {"user": account, "conversation_id": active_conversation, "conversation_key": active_key}
+            result = None
+            if chat_service.model_available():
+                try:
+                    # In-process call into the same service layer the /ai routes use
+                    result = await chat_service.stream_reply(
+                        user_input, conversation_history, on_token=on_token, use_faq=True, **conversation
+                    )
+                except Exception as e:
+                    if streamed:
+                        raise
+                    print(f"Chat stream failed, using offline responder: {e}")
+            if result is None:
+                # Model not configured or unreachable: answer offline, stored like any other turn
+                result = await chat_service.offline_reply(user_input, **conversation)
+
+            if not last_render[0]:
+                append_messages(ai_message)
+            replace_message(ai_message["id"], result["response"])
                 
-                set_chat_log(chat_log + [user_message, ai_message])
-            else:
-                error_data = await response.json()
-                error_message = {
-                    "type": "error",
-                    "content": f"Error: {error_data.get('detail', 'Failed to get response')}",
-                    "timestamp": datetime.datetime.now().isoformat()
-                }
-                set_chat_log(chat_log + [user_message, error_message])
+            # Update conversation history for context
+            set_conversation_history([
+                # The backend packs history into its token budget; this only caps memory
+                *conversation_history[-(MAX_HISTORY_MESSAGES - 2):],
+                {"role": "user", "content": user_input},
+                {"role": "assistant", "content": result["response"]}
+            ])
+            if result["conversation_id"] is not None:
+                set_active_conversation(result["conversation_id"])
+                set_active_key(result["conversation_key"])
+            if result["conversation_id"] and len(chat_log) + 2 > TRANSCRIPT_MAX_MESSAGES:
+                # Reload the newest page so older messages can be paged back in
+                await show_latest(result["conversation_id"])
                 
         except Exception as e:
-            error_message = {
-                "type": "error",
-                "content": f"Network error: {str(e)}",
-                "timestamp": datetime.datetime.now().isoformat()
-            }
-            set_chat_log(chat_log + [user_message, error_message])
+            error_message = new_message("error", f"Network error: {str(e)}")
+            append_messages(error_message)
         finally:
             set_loading(False)
 
-    def format_timestamp(timestamp):
-        try:
-            dt = datetime.datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
-            return dt.strftime("%H:%M")
-        except:
-            return ""
-
-    return html.div(
-        {"style": {
-            "padding": "2rem",
-            "marginLeft": "280px",
-            "minHeight": "100vh",
-            "background": LIGHT_BG,
-            "fontFamily": FONT_FAMILY
-        }},
-        html.div({
-            "style": {
-                "maxWidth": "800px",
-                "margin": "0 auto",
-                "background": WHITE,
-                "borderRadius": "16px",
-                "boxShadow": CARD_SHADOW,
-                "overflow": "hidden",
-                "height": "80vh",
-                "display": "flex",
-                "flexDirection": "column"
-            }
-        },
-            html.div({
-                "style": {
-                    "background": PRIMARY_GRADIENT,
-                    "padding": "1.5rem 2rem",
-                    "color": WHITE
-                }
-            },
-                html.h1({
-                    "style": {
-                        "margin": "0",
-                        "fontSize": "1.5rem",
-                        "fontWeight": "600"
-                    }
-                }, "💬 Better Health AI Assistant"),
-                html.p({
-                    "style": {
-                        "margin": "0.5rem 0 0 0",
-                        "opacity": "0.9",
-                        "fontSize": "0.9rem"
-                    }
-                }, f"Hello {user.get('name', 'User') if user else 'User'}! Ask me anything about health and wellness")
+    return html.div({"class_name": styles.class_name("chat-page")},
+        html.div({"class_name": styles.class_name("chat-panel")},
+            html.div({"class_name": styles.class_name("chat-header")},
+                html.h1({"class_name": styles.class_name("chat-title")}, "💬 Better Health AI Assistant"),
+                html.p({"class_name": styles.class_name("chat-subtitle")},
+                       f"Hello {user.get('name', 'User') if user else 'User'}! Ask me anything about health and wellness")
             ),
             
-            html.div({
-                "style": {
-                    "flex": "1",
-                    "padding": "1.5rem",
-                    "overflowY": "auto",
-                    "background": "#fafbfc",
-                    "display": "flex",
-                    "flexDirection": "column",
-                    "gap": "1rem"
-                }},
+            html.div({"class_name": styles.class_name("chat-transcript")},
                 # Welcome message if no chat history
-                (not chat_log) and html.div({
-                    "style": {
-                        "textAlign": "center",
-                        "padding": "2rem",
-                        "color": TEXT_TERTIARY
-                    }
-                },
-                    html.h3({"style": {"marginBottom": "1rem"}}, "👋 Welcome to Better Health AI Chat"),
-                    html.p({"style": {"marginBottom": "0.5rem"}}, "I'm here to help with general health information and wellness tips."),
-                    html.p({"style": {"marginBottom": "0.5rem"}}, "💡 You can ask me about:"),
-                    html.ul({"style": {"textAlign": "left", "display": "inline-block"}},
+                (not chat_log) and html.div({"class_name": styles.class_name("chat-welcome")},
+                    html.h3({"class_name": styles.class_name("chat-welcome-title")}, "👋 Welcome to Better Health AI Chat"),
+                    html.p({"class_name": styles.class_name("chat-welcome-text")}, "I'm here to help with general health information and wellness tips."),
+                    html.p({"class_name": styles.class_name("chat-welcome-text")}, "💡 You can ask me about:"),
+                    html.ul({"class_name": styles.class_name("chat-welcome-list")},
                         html.li("Healthy lifestyle tips"),
                         html.li("Exercise and nutrition"),
                         html.li("Sleep and mental wellness"),
                         html.li("General health questions")
                     ),
-                    html.p({
-                        "style": {
-                            "marginTop": "1rem",
-                            "padding": "0.75rem",
-                            "background": "#fff5f5",
-                            "borderRadius": "8px",
-                            "fontSize": "0.9rem",
-                            "color": "#c53030"
-                        }
-                    }, "⚠️ Remember: I'm an AI assistant, not a doctor. Always consult healthcare professionals for medical advice.")
+                    html.p({"class_name": styles.class_name("chat-disclaimer")},
+                           "⚠️ Remember: I'm an AI assistant, not a doctor. Always consult healthcare professionals for medical advice.")
                 ),
                 
-                # Chat messages
-                [html.div({
-                    "key": f"msg-{index}",
-                    "style": {
-                        "display": "flex",
-                        "flexDirection": "column",
-                        "alignItems": "flex-start" if msg["type"] == "ai" else "flex-end",
-                        "gap": "0.25rem"
-                    }
-                },
-                    html.div({
-                        "style": {
-                            "padding": "1rem 1.25rem",
-                            "borderRadius": "12px",
-                            "background": "#667eea" if msg["type"] == "ai" else WHITE,
-                            "color": WHITE if msg["type"] == "ai" else TEXT_PRIMARY,
-                            "border": f"1px solid {BORDER_COLOR}" if msg["type"] == "user" else "none",
-                            "boxShadow": "0 2px 8px rgba(0, 0, 0, 0.06)" if msg["type"] == "user" else "0 2px 8px rgba(102, 126, 234, 0.3)",
-                            "maxWidth": "80%",
-                            "position": "relative"
-                        }
-                    }, 
-                        html.div({
-                            "style": {
-                                "fontWeight": "600",
-                                "marginBottom": "0.25rem",
-                                "fontSize": "0.8rem",
-                                "opacity": "0.8"
-                            }
-                        }, "AI Assistant" if msg["type"] == "ai" else "You"),
-                        html.div({
-                            "style": {
-                                "fontSize": "0.9rem",
-                                "lineHeight": "1.5",
-                                "whiteSpace": "pre-wrap"
-                            }
-                        }, msg["content"]),
-                        html.div({
-                            "style": {
-                                "fontSize": "0.7rem",
-                                "opacity": "0.6",
-                                "marginTop": "0.5rem",
-                                "textAlign": "right"
-                            }
-                        }, format_timestamp(msg["timestamp"]))
-                    )
-                ) for index, msg in enumerate(chat_log)],
+                # Older messages: move the window, or page them in from the backend
+                (render_start > 0 or (older_cursor and active_conversation)) and html.button({
+                    "key": "show-earlier",
+                    "on_click": show_earlier,
+                    "class_name": styles.class_name("chat-transcript-button"),
+                    "disabled": loading_older
+                }, "Loading..." if loading_older else "Show earlier messages"),
+                
+                # Chat messages in the window, keyed by message id so new ones are appended, not re-rendered
+                [MessageBubble(msg, key=msg["id"]) for msg in chat_log[render_start:render_end]],
+                
+                (window_end is not None) and html.button({
+                    "key": "jump-to-latest",
+                    "on_click": jump_to_latest,
+                    "class_name": styles.class_name("chat-transcript-button")
+                }, "Jump to latest"),
                 
                 # Loading indicator
-                loading and html.div({
-                    "style": {
-                        "display": "flex",
-                        "alignItems": "center",
-                        "gap": "0.5rem",
-                        "padding": "1rem",
-                        "color": TEXT_TERTIARY,
-                        "fontSize": "0.9rem"
-                    }
-                },
-                    html.div({
-                        "style": {
-                            "width": "12px",
-                            "height": "12px",
-                            "border": "2px solid #e2e8f0",
-                            "borderTop": "2px solid #667eea",
-                            "borderRadius": "50%",
-                            "animation": "spin 1s linear infinite"
-                        }
-                    }),
+                loading and html.div({"class_name": styles.class_name("chat-thinking")},
+                    html.div({"class_name": styles.class_name("chat-spinner")}),
                     "AI is thinking..."
                 )
             ),
             
-            html.div({
-                "style": {
-                    "padding": "1.5rem",
-                    "borderTop": f"1px solid {BORDER_COLOR}",
-                    "background": WHITE
-                }
-            },
-                html.div({
-                    "style": {
-                        "display": "flex",
-                        "gap": "1rem"
-                    }
-                },
-                    html.input({
-                        "type": "text",
-                        "value": user_input,
-                        "on_change": lambda e: set_user_input(e["target"]["value"]),
-                        "placeholder": "Type your health question...",
-                        "style": {**get_input_styles(), "flex": "1"},
-                        "on_focus": lambda e: e.target.update({
-                            "style": {**get_input_styles(), "flex": "1", "border": f"1px solid #667eea", "outline": "none", "boxShadow": FOCUS_SHADOW}
-                        }),
-                        "on_blur": lambda e: e.target.update({
-                            "style": {**get_input_styles(), "flex": "1", "outline": "none"}
-                        }),
-                        "on_key_press": lambda e: e["key"] == "Enter" and send_message(e),
-                        "disabled": loading
-                    }),
-                    html.button({
-                        "on_click": send_message,
-                        "style": get_button_styles("primary"),
-                        "on_mouse_enter": lambda e: not loading and e.target.update({
-                            "style": {**get_button_styles("primary"), "transform": "translateY(-1px)", "boxShadow": HOVER_SHADOW}
-                        }),
-                        "on_mouse_leave": lambda e: not loading and e.target.update({
-                            "style": {**get_button_styles("primary"), "transform": "translateY(0)", "boxShadow": "none"}
-                        }),
-                        "disabled": loading or not user_input.strip()
-                    }, "Send" if not loading else "Sending...")
-                ),
-                html.p({
-                    "style": {
-                        "margin": "0.5rem 0 0 0",
-                        "color": TEXT_TERTIARY,
-                        "fontSize": "0.8rem",
-                        "textAlign": "center"
-                    }
-                }, "💡 Press Enter to send your message")
-            )
+            ChatInput(send_message, loading)
         )
-    )
\ No newline at end of file
+    )
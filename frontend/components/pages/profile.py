@@ -2,6 +2,29 @@
 from reactpy import component, html
 from frontend.styles.colors import *
 from frontend.styles.common import FONT_FAMILY, get_card_styles
+from frontend.styles.registry import styles
+
+_ACTION_BUTTON = {
+    "width": "100%",
+    "padding": "0.75rem",
+    "borderRadius": "6px",
+    "cursor": "pointer",
+    "fontWeight": "500",
+    "transition": "all 0.2s ease"
+}
+styles.define("profile-action", {
+    **_ACTION_BUTTON,
+    "marginBottom": "0.75rem",
+    "background": WHITE,
+    "border": f"1px solid {BORDER_COLOR}",
+    "color": TEXT_SECONDARY
+}, hover={"borderColor": "#667eea", "color": "#667eea"})
+styles.define("profile-action-danger", {
+    **_ACTION_BUTTON,
+    "background": "#fed7d7",
+    "border": "1px solid #feb2b2",
+    "color": "#c53030"
+}, hover={"background": "#feb2b2", "borderColor": "#fc8181"})
 
 @component
 def ProfilePage(user=None):
@@ -130,53 +153,9 @@ def ProfilePage(user=None):
                                 "border": f"1px solid {BORDER_COLOR}"
                             }
                         },
-                            html.button({
-                                "style": {
-                                    "width": "100%",
-                                    "padding": "0.75rem",
-                                    "marginBottom": "0.75rem",
-                                    "background": WHITE,
-                                    "border": f"1px solid {BORDER_COLOR}",
-                                    "borderRadius": "6px",
-                                    "color": TEXT_SECONDARY,
-                                    "cursor": "pointer",
-                                    "fontWeight": "500",
-                                    "transition": "all 0.2s ease"
-                                },
-                                "on_mouse_enter": lambda e: e.target.update({"style": {"borderColor": "#667eea", "color": "#667eea"}}),
-                                "on_mouse_leave": lambda e: e.target.update({"style": {"borderColor": BORDER_COLOR, "color": TEXT_SECONDARY}})
-                            }, "Edit Profile"),
-                            html.button({
-                                "style": {
-                                    "width": "100%",
-                                    "padding": "0.75rem",
-                                    "marginBottom": "0.75rem",
-                                    "background": WHITE,
-                                    "border": f"1px solid {BORDER_COLOR}",
-                                    "borderRadius": "6px",
-                                    "color": TEXT_SECONDARY,
-                                    "cursor": "pointer",
-                                    "fontWeight": "500",
-                                    "transition": "all 0.2s ease"
-                                },
-                                "on_mouse_enter": lambda e: e.target.update({"style": {"borderColor": "#667eea", "color": "#667eea"}}),
-                                "on_mouse_leave": lambda e: e.target.update({"style": {"borderColor": BORDER_COLOR, "color": TEXT_SECONDARY}})
-                            }, "Privacy Settings"),
-                            html.button({
-                                "style": {
-                                    "width": "100%",
-                                    "padding": "0.75rem",
-                                    "background": "#fed7d7",
-                                    "border": "1px solid #feb2b2",
-                                    "borderRadius": "6px",
-                                    "color": "#c53030",
-                                    "cursor": "pointer",
-                                    "fontWeight": "500",
-                                    "transition": "all 0.2s ease"
-                                },
-                                "on_mouse_enter": lambda e: e.target.update({"style": {"background": "#feb2b2", "borderColor": "#fc8181"}}),
-                                "on_mouse_leave": lambda e: e.target.update({"style": {"background": "#fed7d7", "borderColor": "#feb2b2"}})
-                            }, "Delete Account")
+                            html.button({"class_name": styles.class_name("profile-action")}, "Edit Profile"),
+                            html.button({"class_name": styles.class_name("profile-action")}, "Privacy Settings"),
+                            html.button({"class_name": styles.class_name("profile-action-danger")}, "Delete Account")
                         )
                     )
                 )
@@ -2,140 +2,121 @@
 from reactpy import component, html
 from frontend.styles.colors import *
 from frontend.styles.common import FONT_FAMILY
+from frontend.styles.registry import styles
+
+styles.define("sidebar", {
+    "padding": "1.5rem 1rem",
+    "borderRight": f"1px solid {BORDER_COLOR}",
+    "height": "100vh",
+    "width": "280px",
+    "background": WHITE,
+    "boxShadow": "2px 0 8px rgba(0, 0, 0, 0.04)",
+    "fontFamily": FONT_FAMILY,
+    "position": "fixed",
+    "left": 0,
+    "top": 0
+})
+styles.define("sidebar-brand", {
+    "display": "flex",
+    "alignItems": "center",
+    "gap": "0.75rem",
+    "marginBottom": "2rem",
+    "padding": "0 0.5rem"
+})
+styles.define("sidebar-logo", {
+    "background": PRIMARY_GRADIENT,
+    "width": "40px",
+    "height": "40px",
+    "borderRadius": "10px",
+    "display": "flex",
+    "alignItems": "center",
+    "justifyContent": "center",
+    "color": WHITE,
+    "fontSize": "1.2rem"
+})
+styles.define("sidebar-title", {"margin": "0", "color": TEXT_PRIMARY, "fontWeight": "700", "fontSize": "1.25rem"})
+styles.define("sidebar-subtitle", {"margin": "0", "color": TEXT_TERTIARY, "fontSize": "0.8rem", "fontWeight": "500"})
+styles.define("nav-list", {"padding": 0, "margin": 0})
+styles.define("nav-entry", {"listStyle": "none", "marginBottom": "0.5rem"})
+styles.define("nav-item", {
+    "width": "100%",
+    "padding": "0.75rem 1rem",
+    "textAlign": "left",
+    "border": "none",
+    "background": "transparent",
+    "color": TEXT_SECONDARY,
+    "cursor": "pointer",
+    "borderRadius": "8px",
+    "fontSize": "0.9rem",
+    "fontWeight": "500",
+    "transition": "all 0.2s ease",
+    "display": "flex",
+    "alignItems": "center",
+    "gap": "0.75rem"
+}, hover={"background": LIGHT_BG, "color": TEXT_PRIMARY})
+_NAV_ITEM_ACTIVE = {
+    "background": PRIMARY_GRADIENT,
+    "color": WHITE,
+    "boxShadow": "0 2px 8px rgba(102, 126, 234, 0.3)"
+}
+# Repeating the active look on hover keeps the nav-item hover rule off the current page
+styles.define("nav-item-active", _NAV_ITEM_ACTIVE, hover=_NAV_ITEM_ACTIVE)
+styles.define("nav-icon", {"fontSize": "1.1rem"})
+styles.define("sidebar-help", {
+    "position": "absolute",
+    "bottom": "2rem",
+    "left": "1rem",
+    "right": "1rem",
+    "padding": "1rem",
+    "background": LIGHT_BG,
+    "borderRadius": "8px",
+    "border": f"1px solid {BORDER_COLOR}"
+})
+styles.define("sidebar-help-title", {"margin": "0 0 0.5rem 0", "color": TEXT_PRIMARY, "fontSize": "0.9rem", "fontWeight": "600"})
+styles.define("sidebar-help-text", {"margin": "0", "color": TEXT_TERTIARY, "fontSize": "0.8rem", "lineHeight": "1.4"})
+
+NAV_ITEM_CLASS = styles.class_name("nav-item")
+NAV_ITEM_ACTIVE_CLASS = styles.class_name("nav-item", "nav-item-active")
+
 
 @component
 def Sidebar(current_page, set_page, user):
     def nav_item(label, page, icon):
         is_active = current_page == page
-        active_style = {
-            "background": PRIMARY_GRADIENT,
-            "color": WHITE,
-            "boxShadow": "0 2px 8px rgba(102, 126, 234, 0.3)"
-        } if is_active else {
-            "color": TEXT_SECONDARY,
-            "background": "transparent"
-        }
         
         return html.li(
-            {"style": {"listStyle": "none", "marginBottom": "0.5rem"}},
+            {"class_name": styles.class_name("nav-entry")},
             html.button({
                 "on_click": lambda e, p=page: set_page(p),
-                "style": {
-                    "width": "100%",
-                    "padding": "0.75rem 1rem",
-                    "textAlign": "left",
-                    "border": "none",
-                    "background": "none",
-                    "cursor": "pointer",
-                    "borderRadius": "8px",
-                    "fontSize": "0.9rem",
-                    "fontWeight": "500",
-                    "transition": "all 0.2s ease",
-                    "display": "flex",
-                    "alignItems": "center",
-                    "gap": "0.75rem",
-                    **active_style,
-                },
-                "on_mouse_enter": lambda e: not is_active and e.target.update({
-                    "style": {"background": LIGHT_BG, "color": TEXT_PRIMARY}
-                }),
-                "on_mouse_leave": lambda e: not is_active and e.target.update({
-                    "style": {"background": "transparent", "color": TEXT_SECONDARY}
-                })
+                "class_name": NAV_ITEM_ACTIVE_CLASS if is_active else NAV_ITEM_CLASS
             }, 
-                html.span({"style": {"fontSize": "1.1rem"}}, icon),
+                html.span({"class_name": styles.class_name("nav-icon")}, icon),
                 label
             ),
         )
 
     return html.nav(
-        {"style": {
-            "padding": "1.5rem 1rem",
-            "borderRight": f"1px solid {BORDER_COLOR}",
-            "height": "100vh",
-            "width": "280px",
-            "background": WHITE,
-            "boxShadow": "2px 0 8px rgba(0, 0, 0, 0.04)",
-            "fontFamily": FONT_FAMILY,
-            "position": "fixed",
-            "left": 0,
-            "top": 0
-        }},
+        {"class_name": styles.class_name("sidebar")},
         html.div(
-            {"style": {
-                "display": "flex",
-                "alignItems": "center",
-                "gap": "0.75rem",
-                "marginBottom": "2rem",
-                "padding": "0 0.5rem"
-            }},
-            html.div({
-                "style": {
-                    "background": PRIMARY_GRADIENT,
-                    "width": "40px",
-                    "height": "40px",
-                    "borderRadius": "10px",
-                    "display": "flex",
-                    "alignItems": "center",
-                    "justifyContent": "center",
-                    "color": WHITE,
-                    "fontSize": "1.2rem"
-                }
-            }, "🏥"),
+            {"class_name": styles.class_name("sidebar-brand")},
+            html.div({"class_name": styles.class_name("sidebar-logo")}, "🏥"),
             html.div(
-                html.h3({
-                    "style": {
-                        "margin": "0",
-                        "color": TEXT_PRIMARY,
-                        "fontWeight": "700",
-                        "fontSize": "1.25rem"
-                    }
-                }, "Better Health AI"),
-                html.p({
-                    "style": {
-                        "margin": "0",
-                        "color": TEXT_TERTIARY,
-                        "fontSize": "0.8rem",
-                        "fontWeight": "500"
-                    }
-                }, user.get("name", "User") if user else "Medical Assistant")
+                html.h3({"class_name": styles.class_name("sidebar-title")}, "Better Health AI"),
+                html.p({"class_name": styles.class_name("sidebar-subtitle")},
+                       user.get("name", "User") if user else "Medical Assistant")
             )
         ),
 
-        html.ul({"style": {"padding": 0, "margin": 0}},
+        html.ul({"class_name": styles.class_name("nav-list")},
             nav_item("Dashboard", "Home", "📊"),
             nav_item("AI Chat", "Chat", "💬"),
             nav_item("My Profile", "Profile", "👤"),
             nav_item("Logout", "Logout", "🚪"),
         ),
         
-        html.div({
-            "style": {
-                "position": "absolute",
-                "bottom": "2rem",
-                "left": "1rem",
-                "right": "1rem",
-                "padding": "1rem",
-                "background": LIGHT_BG,
-                "borderRadius": "8px",
-                "border": f"1px solid {BORDER_COLOR}"
-            }
-        },
-            html.p({
-                "style": {
-                    "margin": "0 0 0.5rem 0",
-                    "color": TEXT_PRIMARY,
-                    "fontSize": "0.9rem",
-                    "fontWeight": "600"
-                }
-            }, "Need Help?"),
-            html.p({
-                "style": {
-                    "margin": "0",
-                    "color": TEXT_TERTIARY,
-                    "fontSize": "0.8rem",
-                    "lineHeight": "1.4"
-                }
-            }, "Our AI assistant is available 24/7 to answer your health questions.")
+        html.div({"class_name": styles.class_name("sidebar-help")},
+            html.p({"class_name": styles.class_name("sidebar-help-title")}, "Need Help?"),
+            html.p({"class_name": styles.class_name("sidebar-help-text")},
+                   "Our AI assistant is available 24/7 to answer your health questions.")
         )
-    )
\ No newline at end of file
+    )
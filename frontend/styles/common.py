@@ -1,52 +1,70 @@
 # frontend/styles/common.py
 from . import colors
+from .registry import styles
 
 # Common style patterns
 FONT_FAMILY = "'Inter', 'Segoe UI', sans-serif"
 LIGHT_BG = "#f7fafc"
 PRIMARY_GRADIENT = colors.PRIMARY_GRADIENT
 
+# Each variant is built once; the getters hand out the same read-only mapping
+INPUT_STYLE = styles.define("input", {
+    "width": "100%",
+    "padding": "0.75rem 1rem",
+    "border": f"1px solid {colors.BORDER_COLOR}",
+    "borderRadius": "8px",
+    "fontSize": "0.9rem",
+    "transition": "all 0.2s ease",
+    "boxSizing": "border-box"
+}, focus={
+    "border": "1px solid #667eea",
+    "outline": "none",
+    "boxShadow": colors.FOCUS_SHADOW
+})
 
-def get_input_styles():
-    return {
-        "width": "100%",
-        "padding": "0.75rem 1rem",
+_BUTTON_BASE = {
+    "padding": "0.75rem 1rem",
+    "border": "none",
+    "borderRadius": "8px",
+    "fontSize": "0.9rem",
+    "fontWeight": "600",
+    "cursor": "pointer",
+    "transition": "all 0.2s ease"
+}
+BUTTON_STYLES = {
+    "primary": styles.define("button-primary", {
+        **_BUTTON_BASE,
+        "background": colors.PRIMARY_GRADIENT,
+        "color": colors.WHITE
+    }, hover={
+        "transform": "translateY(-1px)",
+        "boxShadow": colors.HOVER_SHADOW
+    }),
+    "secondary": styles.define("button-secondary", {
+        **_BUTTON_BASE,
+        "background": colors.WHITE,
         "border": f"1px solid {colors.BORDER_COLOR}",
-        "borderRadius": "8px",
-        "fontSize": "0.9rem",
-        "transition": "all 0.2s ease",
-        "boxSizing": "border-box"
-    }
+        "color": colors.TEXT_SECONDARY
+    }),
+}
+_BUTTON_DEFAULT = styles.define("button", _BUTTON_BASE)
+
+CARD_STYLE = styles.define("card", {
+    "background": colors.CARD_BG,
+    "borderRadius": "12px",
+    "boxShadow": colors.CARD_SHADOW,
+    "border": f"1px solid {colors.BORDER_COLOR}"
+})
+
+
+def get_input_styles():
+    return INPUT_STYLE
 
 def get_button_styles(variant="primary"):
-    base_style = {
-        "padding": "0.75rem 1rem",
-        "border": "none",
-        "borderRadius": "8px",
-        "fontSize": "0.9rem",
-        "fontWeight": "600",
-        "cursor": "pointer",
-        "transition": "all 0.2s ease"
-    }
-    
-    if variant == "primary":
-        base_style.update({
-            "background": colors.PRIMARY_GRADIENT,
-            "color": colors.WHITE
-        })
-    elif variant == "secondary":
-        base_style.update({
-            "background": colors.WHITE,
-            "border": f"1px solid {colors.BORDER_COLOR}",
-            "color": colors.TEXT_SECONDARY
-        })
-    
-    return base_style
+    return BUTTON_STYLES.get(variant, _BUTTON_DEFAULT)
 
 def get_card_styles():
-    return {
-        "background": colors.CARD_BG,
-        "borderRadius": "12px",
-        "boxShadow": colors.CARD_SHADOW,
-        "border": f"1px solid {colors.BORDER_COLOR}"
-    }
\ No newline at end of file
+    return CARD_STYLE
+
+def button_class(variant="primary"):
+    return styles.class_name(f"button-{variant}" if variant in BUTTON_STYLES else "button")
@@ -0,0 +1,101 @@
+# frontend/styles/registry.py
+import re
+import hashlib
+
+_UPPER = re.compile(r"[A-Z]")
+
+
+class FrozenStyle(dict):
+    """
+    Read-only style mapping. Still a dict, so ReactPy can serialize it as an
+    inline style, but shared instances can't be mutated by accident; copy
+    with {**style, ...} to derive a variant.
+    """
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("Registered styles are read-only; copy with {**style, ...} to change them")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __ior__(self, other):
+        self._readonly()
+
+
+def css_property(name):
+    """camelCase style key -> kebab-case CSS property"""
+    return _UPPER.sub(lambda match: "-" + match.group(0).lower(), name)
+
+
+def css_declarations(style):
+    return ";".join(f"{css_property(key)}:{value}" for key, value in style.items())
+
+
+class StyleRegistry:
+    """
+    Named styles, each built once at import time.
+
+    `get(name)` returns the shared FrozenStyle for inline use;
+    `class_name(*names)` returns short CSS class names, whose rules come from
+    `stylesheet()`. Components that use class names only send those names in
+    their VDOM updates instead of the full style dicts.
+
+    `hover` and `focus` become :hover / :focus rules, so those effects are
+    applied by the browser without an event round-trip to the server.
+    Hover rules skip disabled elements.
+    """
+
+    def __init__(self, prefix="hs"):
+        self.prefix = prefix
+        self._styles = {}
+        self._states = {}  # name -> {selector suffix: FrozenStyle}
+        self._raw_rules = []
+        self._stylesheet = None
+
+    def define(self, name, style, hover=None, focus=None):
+        states = {}
+        if hover:
+            states[":hover:not(:disabled)"] = FrozenStyle(hover)
+        if focus:
+            states[":focus"] = FrozenStyle(focus)
+        if name in self._styles and (self._styles[name] != style or self._states[name] != states):
+            raise ValueError(f"Style '{name}' is already defined differently")
+        frozen = self._styles[name] = FrozenStyle(style)
+        self._states[name] = states
+        self._stylesheet = None
+        return frozen
+
+    def add_rule(self, css):
+        """Raw CSS (e.g. @keyframes) included in the stylesheet"""
+        if css not in self._raw_rules:
+            self._raw_rules.append(css)
+            self._stylesheet = None
+
+    def get(self, name):
+        return self._styles[name]
+
+    def class_name(self, *names):
+        for name in names:
+            if name not in self._styles:
+                raise KeyError(f"Unknown style '{name}'")
+        return " ".join(f"{self.prefix}-{name}" for name in names)
+
+    def stylesheet(self):
+        if self._stylesheet is None:
+            rules = []
+            for name, style in self._styles.items():
+                selector = f".{self.prefix}-{name}"
+                rules.append(f"{selector}{{{css_declarations(style)}}}")
+                rules.extend(
+                    f"{selector}{suffix}{{{css_declarations(state)}}}"
+                    for suffix, state in self._states[name].items()
+                )
+            self._stylesheet = "\n".join(rules + self._raw_rules) + "\n"
+        return self._stylesheet
+
+    def version(self):
+        """Short content hash, used to cache-bust the stylesheet URL"""
+        return hashlib.sha1(self.stylesheet().encode("utf-8")).hexdigest()[:10]
+
+
+styles = StyleRegistry()
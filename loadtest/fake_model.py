@@ -0,0 +1,166 @@
+# loadtest/fake_model.py
+"""
+Local stand-in for CUSTOM_MODEL_URL.
+
+Speaks both payload formats used by backend/chat_service.py: requests with a
+`message` field get `{"response": ...}` back, requests with `messages` get
+an OpenAI-style `choices` body. With `stream: true` it streams tokens as
+Server-Sent Events at a configurable rate.
+
+    python -m loadtest.fake_model --port 9100 --latency lognormal --latency-ms 300
+    CUSTOM_MODEL_URL=http://127.0.0.1:9100/v1/chat python -m uvicorn backend.main:app
+"""
+import os
+import json
+import time
+import random
+import asyncio
+import argparse
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Defaults, overridable from the command line
+FAKE_MODEL_LATENCY = os.getenv("FAKE_MODEL_LATENCY", "lognormal")  # fixed | uniform | exponential | lognormal
+FAKE_MODEL_LATENCY_MS = float(os.getenv("FAKE_MODEL_LATENCY_MS", "300"))
+FAKE_MODEL_LATENCY_SPREAD = float(os.getenv("FAKE_MODEL_LATENCY_SPREAD", "0.5"))
+FAKE_MODEL_RESPONSE_TOKENS = int(os.getenv("FAKE_MODEL_RESPONSE_TOKENS", "60"))
+FAKE_MODEL_TOKENS_PER_SECOND = float(os.getenv("FAKE_MODEL_TOKENS_PER_SECOND", "50"))
+FAKE_MODEL_ERROR_RATE = float(os.getenv("FAKE_MODEL_ERROR_RATE", "0"))
+FAKE_MODEL_ERROR_STATUS = int(os.getenv("FAKE_MODEL_ERROR_STATUS", "503"))
+FAKE_MODEL_HANG_RATE = float(os.getenv("FAKE_MODEL_HANG_RATE", "0"))
+FAKE_MODEL_HANG_SECONDS = float(os.getenv("FAKE_MODEL_HANG_SECONDS", "60"))
+FAKE_MODEL_SEED = os.getenv("FAKE_MODEL_SEED")
+
+WORDS = (
+    "staying hydrated regular sleep balanced meals and gentle exercise all support "
+    "your wellbeing please consult a healthcare professional about persistent symptoms"
+).split()
+
+
+class FakeModelSettings:
+    def __init__(self, latency=FAKE_MODEL_LATENCY, latency_ms=FAKE_MODEL_LATENCY_MS,
+                 spread=FAKE_MODEL_LATENCY_SPREAD, response_tokens=FAKE_MODEL_RESPONSE_TOKENS,
+                 tokens_per_second=FAKE_MODEL_TOKENS_PER_SECOND, error_rate=FAKE_MODEL_ERROR_RATE,
+                 error_status=FAKE_MODEL_ERROR_STATUS, hang_rate=FAKE_MODEL_HANG_RATE,
+                 hang_seconds=FAKE_MODEL_HANG_SECONDS, seed=FAKE_MODEL_SEED):
+        self.latency = latency
+        self.latency_ms = latency_ms
+        self.spread = spread
+        self.response_tokens = response_tokens
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.random = random.Random(seed)
+
+    def sample_latency(self):
+        """Seconds before the first byte; `latency_ms` is the mean (median for lognormal)"""
+        mean = self.latency_ms / 1000
+        if self.latency == "fixed":
+            return mean
+        if self.latency == "uniform":
+            return self.random.uniform(mean * (1 - self.spread), mean * (1 + self.spread))
+        if self.latency == "exponential":
+            return self.random.expovariate(1 / mean) if mean > 0 else 0.0
+        if self.latency == "lognormal":
+            return self.random.lognormvariate(0, self.spread) * mean
+        raise ValueError(f"Unknown latency distribution '{self.latency}'")
+
+    def tokens(self):
+        return [self.random.choice(WORDS) for _ in range(self.response_tokens)]
+
+
+def _prompt_tokens(body):
+    texts = [body.get("message") or "", body.get("system_prompt") or ""]
+    texts += [msg.get("content") or "" for msg in body.get("messages") or body.get("conversation_history") or []]
+    return sum(len(text.split()) for text in texts)
+
+
+def create_app(settings=None):
+    settings = settings or FakeModelSettings()
+    app = FastAPI(title="Fake model")
+    app.state.settings = settings
+    app.state.calls = 0
+
+    @app.get("/stats")
+    async def stats():
+        return {"calls": app.state.calls}
+
+    @app.post("/{path:path}")
+    async def complete(path: str, request: Request):
+        body = await request.json()
+        app.state.calls += 1
+        openai_format = "messages" in body
+
+        roll = settings.random.random()
+        if roll < settings.hang_rate:
+            await asyncio.sleep(settings.hang_seconds)
+        elif roll < settings.hang_rate + settings.error_rate:
+            await asyncio.sleep(settings.sample_latency())
+            return JSONResponse({"error": "injected failure"}, status_code=settings.error_status)
+
+        await asyncio.sleep(settings.sample_latency())
+        tokens = settings.tokens()
+        usage = {"prompt_tokens": _prompt_tokens(body), "completion_tokens": len(tokens)}
+
+        if body.get("stream"):
+            return StreamingResponse(_stream(tokens, openai_format, settings), media_type="text/event-stream")
+
+        text = " ".join(tokens)
+        if openai_format:
+            return {
+                "id": f"fake-{app.state.calls}",
+                "created": int(time.time()),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+                "usage": usage,
+            }
+        return {"response": text, "conversation_id": f"fake-{app.state.calls}", "usage": usage}
+
+    return app
+
+
+async def _stream(tokens, openai_format, settings):
+    delay = 1 / settings.tokens_per_second if settings.tokens_per_second > 0 else 0
+    for index, token in enumerate(tokens):
+        text = token if index == 0 else f" {token}"
+        if openai_format:
+            chunk = {"choices": [{"index": 0, "delta": {"content": text}}]}
+        else:
+            chunk = {"response": text}
+        yield f"data: {json.dumps(chunk)}\n\n"
+        if delay:
+            await asyncio.sleep(delay)
+    yield "data: [DONE]\n\n"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the fake model server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    parser.add_argument("--latency", default=FAKE_MODEL_LATENCY, choices=["fixed", "uniform", "exponential", "lognormal"])
+    parser.add_argument("--latency-ms", type=float, default=FAKE_MODEL_LATENCY_MS)
+    parser.add_argument("--spread", type=float, default=FAKE_MODEL_LATENCY_SPREAD,
+                        help="uniform: +/- fraction of the mean; lognormal: sigma")
+    parser.add_argument("--response-tokens", type=int, default=FAKE_MODEL_RESPONSE_TOKENS)
+    parser.add_argument("--tokens-per-second", type=float, default=FAKE_MODEL_TOKENS_PER_SECOND)
+    parser.add_argument("--error-rate", type=float, default=FAKE_MODEL_ERROR_RATE)
+    parser.add_argument("--error-status", type=int, default=FAKE_MODEL_ERROR_STATUS)
+    parser.add_argument("--hang-rate", type=float, default=FAKE_MODEL_HANG_RATE,
+                        help="fraction of requests that stall for --hang-seconds (client timeouts)")
+    parser.add_argument("--hang-seconds", type=float, default=FAKE_MODEL_HANG_SECONDS)
+    parser.add_argument("--seed", default=FAKE_MODEL_SEED)
+    args = parser.parse_args()
+
+    settings = FakeModelSettings(
+        latency=args.latency, latency_ms=args.latency_ms, spread=args.spread,
+        response_tokens=args.response_tokens, tokens_per_second=args.tokens_per_second,
+        error_rate=args.error_rate, error_status=args.error_status,
+        hang_rate=args.hang_rate, hang_seconds=args.hang_seconds, seed=args.seed,
+    )
+    import uvicorn
+    uvicorn.run(create_app(settings), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# loadtest/run.py
+"""
+Open-loop load test against a running backend.
+
+Requests are started on a fixed schedule (`--rps`) regardless of how fast
+earlier ones finish, and latency is measured from the scheduled start, so
+a slow server shows up as higher percentiles instead of a lower send rate.
+
+    python -m loadtest.fake_model --port 9100 &
+    CUSTOM_MODEL_URL=http://127.0.0.1:9100/v1/chat python -m uvicorn backend.main:app &
+    python -m loadtest.run --rps 50 --duration 30 --mix chat=4,custom=4,token=1,register=1
+"""
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import httpx
+from backend.health_probe import percentile
+
+SCENARIOS = ("chat", "custom", "token", "register")
+LOADTEST_PASSWORD = "loadtest-password"
+LOADTEST_PROMPT = "Can you explain how vitamin D affects mood?"
+
+
+def parse_mix(text):
+    """'chat=4,token=1' -> {'chat': 4.0, 'token': 1.0}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"Unknown scenario '{name}', expected one of {SCENARIOS}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class LoadTest:
+    def __init__(self, client, mix, unique_messages=True):
+        self.client = client
+        self.names = list(mix)
+        self.weights = [mix[name] for name in self.names]
+        self.unique_messages = unique_messages
+        self.results = {name: [] for name in self.names}  # name -> [(latency, ok)]
+        self.login_email = None
+
+    async def setup(self):
+        if "token" in self.names:
+            self.login_email = f"loadtest-{uuid.uuid4().hex[:12]}@example.com"
+            response = await self.client.post(
+                "/auth/register", params={"email": self.login_email, "password": LOADTEST_PASSWORD}
+            )
+            response.raise_for_status()
+
+    def _message(self):
+        # Not covered by the local FAQ, so every chat request reaches the model
+        if self.unique_messages:
+            # Distinct prompts keep the response cache and single-flight out of the measurement
+            return f"{LOADTEST_PROMPT} ({uuid.uuid4().hex[:8]})"
+        return LOADTEST_PROMPT
+
+    async def request(self, name):
+        if name == "chat":
+            response = await self.client.post("/ai/chat", params={"message": self._message(), "use_cache": False})
+        elif name == "custom":
+            response = await self.client.post("/ai/chat/custom", params={"message": self._message(), "use_cache": False})
+        elif name == "token":
+            response = await self.client.post(
+                "/auth/token", data={"username": self.login_email, "password": LOADTEST_PASSWORD}
+            )
+        else:
+            response = await self.client.post(
+                "/auth/register",
+                params={"email": f"loadtest-{uuid.uuid4().hex}@example.com", "password": LOADTEST_PASSWORD},
+            )
+        if response.status_code != 200:
+            return False
+        # The chat endpoints answer 200 with an "error" field when the model call failed
+        return name not in ("chat", "custom") or "error" not in response.json()
+
+    async def _timed(self, name, scheduled_at):
+        ok = False
+        try:
+            ok = await self.request(name)
+        except httpx.HTTPError:
+            pass
+        self.results[name].append((time.perf_counter() - scheduled_at, ok))
+
+    async def run(self, rps, duration):
+        tasks = []
+        total = int(rps * duration)
+        start = time.perf_counter()
+        for index in range(total):
+            scheduled_at = start + index / rps
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            name = random.choices(self.names, self.weights)[0]
+            tasks.append(asyncio.create_task(self._timed(name, scheduled_at)))
+        await asyncio.gather(*tasks)
+        return time.perf_counter() - start
+
+
+def summarize(results, elapsed):
+    report = {"elapsed_seconds": round(elapsed, 3), "scenarios": {}}
+    all_samples = []
+    for name, samples in results.items():
+        all_samples.extend(samples)
+        report["scenarios"][name] = _summary(samples, elapsed)
+    report["total"] = _summary(all_samples, elapsed)
+    return report
+
+
+def _summary(samples, elapsed):
+    latencies = sorted(latency for latency, _ in samples)
+    errors = sum(1 for _, ok in samples if not ok)
+    summary = {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": round(errors / len(samples), 4) if samples else 0.0,
+        "throughput_rps": round((len(samples) - errors) / elapsed, 2) if elapsed else 0.0,
+    }
+    for label, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+        value = percentile(latencies, fraction)
+        summary[f"{label}_ms"] = round(value * 1000, 1) if value is not None else None
+    return summary
+
+
+def print_report(report):
+    header = f"{'scenario':<10} {'requests':>8} {'errors':>7} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    print(header)
+    print("-" * len(header))
+    rows = list(report["scenarios"].items()) + [("total", report["total"])]
+    for name, row in rows:
+        print(
+            f"{name:<10} {row['requests']:>8} {row['errors']:>7} {row['throughput_rps']:>8} "
+            f"{row['p50_ms'] or '-':>9} {row['p95_ms'] or '-':>9} {row['p99_ms'] or '-':>9}"
+        )
+    print(f"\nelapsed {report['elapsed_seconds']}s")
+
+
+async def main_async(args):
+    limits = httpx.Limits(max_connections=args.max_connections, max_keepalive_connections=args.max_connections)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        test = LoadTest(client, args.mix, unique_messages=not args.repeat_messages)
+        await test.setup()
+        elapsed = await test.run(args.rps, args.duration)
+    return summarize(test.results, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drive the backend at a target request rate")
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--rps", type=float, default=20)
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("chat=1,custom=1,token=1,register=1"),
+                        help="weighted scenarios, e.g. chat=4,custom=4,token=1,register=1")
+    parser.add_argument("--max-connections", type=int, default=200)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--repeat-messages", action="store_true",
+                        help="send the same prompt every time (exercises the cache and single-flight)")
+    parser.add_argument("--output", help="also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    report = asyncio.run(main_async(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# tests/conftest.py
+import os
+import sys
+import tempfile
+
+# Keep tests off the tracked health_ai.db; settings are read at import time
+_TMP_DIR = tempfile.mkdtemp(prefix="health_ai_tests_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'test.db')}")
+os.environ.setdefault("FAQ_INDEX_DIR", os.path.join(_TMP_DIR, "faq_index"))
+# Nothing listens here: model calls fail fast instead of waiting on DNS
+os.environ.setdefault("CUSTOM_MODEL_URL", "http://127.0.0.1:9/model")
+# One above bcrypt's minimum, so tests can store an outdated 4-round hash
+os.environ.setdefault("BCRYPT_ROUNDS", "5")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import uuid  # noqa: E402
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from backend.main import app  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def client():
+    # Entering the client runs the app lifespan (write-behind queue, prober)
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def auth_headers(client):
+    email = f"user-{uuid.uuid4().hex[:12]}@example.com"
+    client.post("/auth/register", params={"email": email, "password": "secret-password"}).raise_for_status()
+    response = client.post("/auth/token", data={"username": email, "password": "secret-password"})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
@@ -0,0 +1,38 @@
+# tests/test_auth.py
+import time
+import uuid
+from passlib.hash import bcrypt
+from backend import auth
+from backend.cache import TTLCache
+from backend.database import SessionLocal
+from backend.models import User
+
+
+def test_login_upgrades_hash_with_fewer_rounds(client):
+    email = f"rehash-{uuid.uuid4().hex[:12]}@example.com"
+    with SessionLocal() as db:
+        db.add(User(email=email, hashed_password=bcrypt.using(rounds=4).hash("secret-password")))
+        db.commit()
+
+    response = client.post("/auth/token", data={"username": email, "password": "secret-password"})
+    response.raise_for_status()
+
+    with SessionLocal() as db:
+        stored = db.query(User).filter(User.email == email).one().hashed_password
+    assert bcrypt.from_string(stored).rounds == auth.BCRYPT_ROUNDS
+    assert auth.verify_password("secret-password", stored)
+
+
+def test_token_index_shrinks_with_the_user_cache(monkeypatch):
+    monkeypatch.setattr(auth, "_tokens_by_email", {})
+    monkeypatch.setattr(auth, "_user_cache", TTLCache(maxsize=3, ttl=60, on_evict=auth._forget_token))
+    for index in range(10):
+        user = User(email=f"cached-{index}@example.com", hashed_password="!")
+        auth._cache_user(f"token-{index}", user, expires_at=time.time() + 60)
+
+    assert len(auth._user_cache) == 3
+    assert sorted(auth._tokens_by_email) == [f"cached-{index}@example.com" for index in (7, 8, 9)]
+
+    auth.invalidate_user("cached-8@example.com")
+    assert auth._user_cache.get("token-8") is None
+    assert sorted(auth._tokens_by_email) == ["cached-7@example.com", "cached-9@example.com"]
@@ -0,0 +1,94 @@
+# tests/test_cache.py
+import asyncio
+import pytest
+from backend import cache
+from backend.cache import MemoryBackend, ResponseCache, TTLCache, normalize_message
+
+PARAMS = {"format": "message", "max_tokens": 500, "temperature": 0.7}
+HISTORY = [{"role": "user", "content": "hi"}, {"role": "assistant", "content": "hello"}]
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replaces time.monotonic inside backend.cache with a clock the test moves"""
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+def make_cache():
+    return ResponseCache(MemoryBackend(maxsize=16, ttl=60), ttl=60)
+
+
+def test_normalize_message():
+    assert normalize_message("  How much   WATER should I drink?? ") == "how much water should i drink"
+    assert normalize_message("Hello.\n") == normalize_message("hello")
+
+
+def test_key_ignores_case_spacing_and_trailing_punctuation():
+    responses = make_cache()
+    key = responses.make_key("How much water?", HISTORY, "prompt", PARAMS)
+    assert responses.make_key("  how much   water ", HISTORY, "prompt", PARAMS) == key
+    assert responses.make_key("How much water?", [dict(turn) for turn in HISTORY], "prompt", dict(PARAMS)) == key
+
+
+def test_key_changes_with_history_prompt_and_params():
+    responses = make_cache()
+    key = responses.make_key("How much water?", HISTORY, "prompt", PARAMS)
+    assert responses.make_key("How much water?", HISTORY[:1], "prompt", PARAMS) != key
+    assert responses.make_key("How much water?", [], "prompt", PARAMS) != key
+    assert responses.make_key("How much water?", HISTORY, "other prompt", PARAMS) != key
+    assert responses.make_key("How much water?", HISTORY, "prompt", {**PARAMS, "temperature": 0.2}) != key
+    assert responses.make_key("How much coffee?", HISTORY, "prompt", PARAMS) != key
+
+
+def test_entries_expire_after_their_ttl(clock):
+    entries = TTLCache(maxsize=4, ttl=10)
+    entries.set("default", 1)
+    entries.set("short", 2, ttl=1)
+    clock[0] += 5
+    assert entries.get("short") is None and entries.get("default") == 1
+    clock[0] += 6
+    assert entries.get("default", "gone") == "gone" and len(entries) == 0
+
+
+def test_least_recently_used_entry_is_evicted_first(clock):
+    entries = TTLCache(maxsize=2, ttl=10)
+    entries.set("a", 1)
+    entries.set("b", 2)
+    entries.get("a")
+    entries.set("c", 3)
+    assert entries.get("b") is None
+    assert entries.get("a") == 1 and entries.get("c") == 3
+
+
+def test_on_evict_sees_every_way_out(clock):
+    evicted = []
+    entries = TTLCache(maxsize=2, ttl=10, on_evict=lambda key, value: evicted.append((key, value)))
+    entries.set("expired", 1, ttl=1)
+    clock[0] += 2
+    entries.get("expired")
+    entries.set("a", 2)
+    entries.set("b", 3)
+    entries.set("c", 4)
+    entries.delete("b")
+    entries.delete("missing")
+    entries.clear()
+    assert evicted == [("expired", 1), ("a", 2), ("b", 3), ("c", 4)]
+
+
+def test_hit_and_miss_counters(clock):
+    async def scenario():
+        responses = make_cache()
+        key = responses.make_key("How much water?", [], "prompt", PARAMS)
+        assert await responses.get(key) is None
+        await responses.set(key, {"response": "About 2 litres."})
+        assert await responses.get(key) == {"response": "About 2 litres."}
+        assert await responses.get(key) is not None
+        clock[0] += 61
+        assert await responses.get(key) is None
+        return responses.stats()
+
+    stats = asyncio.run(scenario())
+    assert (stats["hits"], stats["misses"], stats["size"]) == (2, 2, 0)
+    assert stats["hit_rate"] == 0.5
@@ -0,0 +1,108 @@
+# tests/test_chat_page.py
+import time
+import asyncio
+from reactpy.core.layout import Layout
+from reactpy.core.types import LayoutEventMessage
+from backend import chat_service
+from backend.auth import user_for_token
+from frontend.components.pages import chat
+
+
+def find(model, predicate):
+    if isinstance(model, dict):
+        if predicate(model):
+            return model
+        for child in model.get("children", ()):
+            found = find(child, predicate)
+            if found is not None:
+                return found
+    return None
+
+
+async def send(page, text):
+    """Type `text` into the page's input and click Send"""
+    async with Layout(page) as layout:
+        update = await layout.render()
+        text_box = find(update["model"], lambda node: node.get("tagName") == "input")
+        change = text_box["eventHandlers"]["on_change"]["target"]
+        await layout.deliver(LayoutEventMessage(type="layout-event", target=change,
+                                                data=[{"target": {"value": text}}]))
+        update = await layout.render()
+        button = find(update["model"], lambda node: node.get("tagName") == "button")
+        click = button["eventHandlers"]["on_click"]["target"]
+        await asyncio.wait_for(
+            layout.deliver(LayoutEventMessage(type="layout-event", target=click, data=[{}])), 5
+        )
+
+
+def test_user_for_token(client, auth_headers):
+    token = auth_headers["Authorization"].split()[1]
+    assert asyncio.run(user_for_token(token)).email.startswith("user-")
+    assert asyncio.run(user_for_token("mock-token")) is None
+    assert asyncio.run(user_for_token(None)) is None
+
+
+def test_chat_page_sends_as_the_token_user(monkeypatch):
+    account = object()
+    calls = []
+
+    async def fake_user_for_token(token):
+        return account if token == "session-token" else None
+
+    async def fake_stream_reply(message, history, on_token=None, **options):
+        calls.append(options)
+        return {"response": "ok", "conversation_id": 7, "conversation_key": None}
+
+    monkeypatch.setattr(chat, "user_for_token", fake_user_for_token)
+    monkeypatch.setattr(chat.chat_service, "model_available", lambda: True)
+    monkeypatch.setattr(chat.chat_service, "stream_reply", fake_stream_reply)
+
+    asyncio.run(send(chat.ChatPage(token="session-token", user={"name": "Test"}), "hello"))
+    assert calls and calls[0]["user"] is account
+
+
+def test_chat_page_answers_offline_and_stores_the_turn(monkeypatch):
+    turns = []
+
+    async def unexpected_stream(*args, **kwargs):
+        raise AssertionError("the model is not available")
+
+    async def new_conversation(conversation_id, user, message, conversation_key=None):
+        return 11, "anonymous-key"
+
+    monkeypatch.setattr(chat.chat_service, "model_available", lambda: False)
+    monkeypatch.setattr(chat.chat_service, "stream_reply", unexpected_stream)
+    monkeypatch.setattr(chat.chat_service, "resolve_conversation", new_conversation)
+    monkeypatch.setattr(chat.chat_service.chat_writer, "record_turn", lambda *args: turns.append(args))
+
+    asyncio.run(send(chat.ChatPage(user={"name": "Test"}), "I have a headache"))
+    assert turns and turns[0][:2] == (11, "I have a headache")
+    assert turns[0][2] == chat.chat_service.mock_response("I have a headache")
+
+
+def test_model_available(monkeypatch):
+    monkeypatch.setattr(chat_service, "model_health", None)
+    monkeypatch.setattr(chat_service, "CUSTOM_MODEL_URL", chat_service.PLACEHOLDER_MODEL_URL)
+    assert not chat_service.model_available()
+
+    monkeypatch.setattr(chat_service, "CUSTOM_MODEL_URL", "http://model.test/v1")
+    assert chat_service.model_available()
+
+    breaker = chat_service.upstream_guard.breaker
+    monkeypatch.setattr(breaker, "_state", breaker.OPEN)
+    monkeypatch.setattr(breaker, "_opened_at", time.monotonic())
+    assert not chat_service.model_available()
+
+
+def test_stream_reply_hands_each_fragment_to_on_token(monkeypatch):
+    async def fake_open_stream(message, history, **options):
+        async def deltas():
+            for delta in ("Drink ", "water ", "often."):
+                yield delta
+        return 5, None, deltas()
+
+    monkeypatch.setattr(chat_service, "open_stream", fake_open_stream)
+    received = []
+    result = asyncio.run(chat_service.stream_reply("thirsty?", on_token=received.append))
+    assert received == ["Drink ", "water ", "often."]
+    assert result["response"] == "Drink water often." and result["conversation_id"] == 5
@@ -0,0 +1,54 @@
+# tests/test_conversation_access.py
+from sqlalchemy import func, select
+from backend.database import SessionLocal
+from backend.models import Conversation
+from backend.persistence import chat_writer
+
+# Answered from the local FAQ, so no model is needed
+QUESTION = "How much water should I drink a day?"
+
+
+def ask(client, headers=None, **params):
+    return client.post("/ai/chat", params={"message": QUESTION, **params}, headers=headers or {})
+
+
+def test_anonymous_conversation_needs_its_key(client):
+    started = ask(client).json()
+    conversation_id, key = started["conversation_id"], started["conversation_key"]
+    assert conversation_id and key
+
+    assert ask(client, conversation_id=conversation_id).status_code == 404
+    assert ask(client, conversation_id=conversation_id, conversation_key="not-the-key").status_code == 404
+
+    continued = ask(client, conversation_id=conversation_id, conversation_key=key)
+    assert continued.status_code == 200
+    assert continued.json()["conversation_id"] == conversation_id
+
+
+def test_user_conversation_is_closed_to_others(client, auth_headers):
+    started = ask(client, auth_headers).json()
+    conversation_id = started["conversation_id"]
+    assert started["conversation_key"] is None
+
+    assert ask(client, auth_headers, conversation_id=conversation_id).status_code == 200
+    assert ask(client, conversation_id=conversation_id).status_code == 404
+
+
+def test_anonymous_key_does_not_open_user_conversation(client, auth_headers):
+    anonymous = ask(client).json()
+    owned = ask(client, auth_headers).json()
+    response = ask(client, conversation_id=owned["conversation_id"], conversation_key=anonymous["conversation_key"])
+    assert response.status_code == 404
+
+
+def test_failed_model_call_leaves_no_conversation(client):
+    def stored():
+        client.portal.call(chat_writer.flush)
+        with SessionLocal() as db:
+            return db.execute(select(func.count()).select_from(Conversation)).scalar()
+
+    before = stored()
+    # Not an FAQ question, and nothing listens at CUSTOM_MODEL_URL
+    response = client.post("/ai/chat", params={"message": "Tell me about zebra migration patterns"})
+    assert response.status_code == 503
+    assert stored() == before
@@ -0,0 +1,59 @@
+# tests/test_faq.py
+import asyncio
+import httpx
+import pytest
+from backend import chat_service
+from backend.faq import faq_index, FAQ_ANSWER_THRESHOLD
+
+
+@pytest.mark.parametrize("question", [
+    "How much water should I drink a day?",
+    "is coffee bad for me",
+    "what helps with a headache",
+])
+def test_common_questions_are_answered_from_faq(question):
+    answer, _ = chat_service.retrieve_faq(question)
+    assert answer
+
+
+@pytest.mark.parametrize("question", [
+    "is coffee bad for my unborn baby after bleeding",
+    "how much water should my newborn drink, he is unresponsive",
+    "my child had a seizure, when should I worry about a fever?",
+    "stock market tips for retirement",
+    "How much water should I drink? (3fa9c2)",
+])
+def test_urgent_or_off_topic_questions_are_not_answered_from_faq(question):
+    answer, _ = chat_service.retrieve_faq(question)
+    assert answer is None
+
+
+def test_unknown_words_lower_the_score():
+    assert faq_index.search("is coffee bad for me")[0][1] == pytest.approx(1.0)
+    assert faq_index.search("is coffee bad for my unborn baby after bleeding")[0][1] < FAQ_ANSWER_THRESHOLD
+
+
+def test_urgent_question_falls_through_to_model(monkeypatch):
+    calls = []
+
+    async def fake_post_model(url, headers, payload, timeout=30):
+        calls.append(payload["message"])
+        return httpx.Response(200, json={"response": "Please call emergency services now."})
+
+    async def no_conversation(conversation_id, user, message, conversation_key=None):
+        return None, None
+
+    monkeypatch.setattr(chat_service, "post_model", fake_post_model)
+    monkeypatch.setattr(chat_service, "resolve_conversation", no_conversation)
+    monkeypatch.setattr(chat_service.chat_writer, "record_turn", lambda *args, **kwargs: None)
+
+    question = "how much water should my newborn drink, he is unresponsive"
+    result = asyncio.run(chat_service.chat(question, use_cache=False))
+    assert calls == [question]
+    assert result["response"] == "Please call emergency services now."
+    assert "source" not in result
+
+
+def test_loadtest_prompt_reaches_the_model():
+    from loadtest.run import LOADTEST_PROMPT
+    assert faq_index.search(LOADTEST_PROMPT) == []
@@ -0,0 +1,41 @@
+# tests/test_model_client.py
+import asyncio
+import httpx
+import pytest
+from backend import ai_model, model_client
+
+
+@pytest.fixture
+def sent(monkeypatch):
+    """Requests that reached the (mocked) model, with the timeouts they carried"""
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, text='data: {"response": "ok"}\n\ndata: [DONE]\n\n')
+
+    monkeypatch.setattr(model_client, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return requests
+
+
+def connect_timeout(request):
+    return request.extensions["timeout"]["connect"]
+
+
+def test_unary_request_keeps_the_connect_timeout(sent):
+    asyncio.run(model_client.post_model("http://model.test/v1", {}, {"message": "hi"}, timeout=30))
+    assert connect_timeout(sent[0]) == model_client.MODEL_CONNECT_TIMEOUT
+    assert sent[0].extensions["timeout"]["read"] == 30
+
+
+def test_streaming_request_keeps_the_connect_timeout(sent):
+    async def consume():
+        return [delta async for delta in model_client.stream_deltas("http://model.test/v1", {}, {"message": "hi"})]
+
+    assert asyncio.run(consume()) == ["ok"]
+    assert connect_timeout(sent[0]) == model_client.MODEL_CONNECT_TIMEOUT
+
+
+def test_health_probe_keeps_the_connect_timeout(sent):
+    assert asyncio.run(ai_model.probe_model()) == 200
+    assert connect_timeout(sent[0]) == model_client.MODEL_CONNECT_TIMEOUT
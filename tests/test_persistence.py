@@ -0,0 +1,133 @@
+# tests/test_persistence.py
+import asyncio
+import os
+import tempfile
+from sqlalchemy import create_engine, func, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from backend.database import Base
+from backend.models import Conversation, Message
+from backend.persistence import ChatWriter
+
+
+def make_engine():
+    path = os.path.join(tempfile.mkdtemp(), "persistence.db")
+    sync_engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(sync_engine)
+    with sync_engine.begin() as conn:
+        conn.execute(text("INSERT INTO id_blocks (name, next_id) VALUES ('conversations', 1)"))
+    sync_engine.dispose()
+    return create_async_engine(f"sqlite+aiosqlite:///{path}")
+
+
+async def count(engine, model):
+    async with engine.connect() as conn:
+        return (await conn.execute(select(func.count()).select_from(model))).scalar()
+
+
+def test_failing_listener_does_not_rewrite_batch():
+    async def scenario():
+        engine = make_engine()
+        writer = ChatWriter(engine, flush_interval=0.01)
+        calls = []
+
+        def failing_listener(written):
+            calls.append(written)
+            raise RuntimeError("listener failed")
+
+        writer.flush_listeners.append(failing_listener)
+        conversation_id, _ = await writer.open_conversation(title="hello")
+        writer.record_turn(conversation_id, "hello", "hi there")
+        await writer.stop()
+        counts = await count(engine, Conversation), await count(engine, Message)
+        await engine.dispose()
+        return conversation_id, calls, counts
+
+    conversation_id, calls, counts = asyncio.run(scenario())
+    assert calls == [{conversation_id: 2}]
+    assert counts == (1, 2)
+
+
+def test_conversation_ids_come_from_disjoint_blocks():
+    async def scenario():
+        engine = make_engine()
+        first, second = ChatWriter(engine, id_block=3), ChatWriter(engine, id_block=3)
+        ids = []
+        for _ in range(4):
+            for writer in (first, second):
+                conversation_id, _ = await writer.open_conversation(user_id=1)
+                writer.record_turn(conversation_id, "hello", "hi there")
+                ids.append(conversation_id)
+        await first.stop()
+        await second.stop()
+        stored = await count(engine, Conversation)
+        await engine.dispose()
+        return ids, stored
+
+    ids, stored = asyncio.run(scenario())
+    assert len(set(ids)) == len(ids) == stored == 8
+
+
+def test_flush_conversation_waits_only_for_its_rows():
+    async def scenario():
+        engine = make_engine()
+        writer = ChatWriter(engine, flush_interval=0.01)
+        conversation_id, _ = await writer.open_conversation(title="hello")
+        writer.record_turn(conversation_id, "hello", "hi there")
+        flushed = await writer.flush_conversation(conversation_id, timeout=5)
+        stored = await count(engine, Message)
+        idle = await writer.flush_conversation(conversation_id + 1000, timeout=0)
+        await writer.stop()
+
+        # A batch still collecting rows is not waited on past the timeout
+        slow = ChatWriter(engine, flush_interval=30)
+        slow.record_turn(conversation_id, "again", "still here")
+        timed_out = not await slow.flush_conversation(conversation_id, timeout=0.05)
+        slow._task.cancel()
+        await engine.dispose()
+        return flushed, stored, idle, timed_out
+
+    assert asyncio.run(scenario()) == (True, 2, True, True)
+
+
+def test_failed_batch_only_loses_the_bad_conversation():
+    async def scenario():
+        engine = make_engine()
+        writer = ChatWriter(engine, flush_interval=0.05)
+        write_batch = writer._write_batch
+
+        async def poisoned(batch):
+            if any(row.get("content") == "poison" for _, row in batch):
+                raise RuntimeError("bad row")
+            return await write_batch(batch)
+
+        writer._write_batch = poisoned
+        good, _ = await writer.open_conversation(user_id=1, title="good")
+        bad, _ = await writer.open_conversation(user_id=1, title="bad")
+        writer.record_turn(good, "hello", "hi there")
+        writer.record_turn(bad, "poison", "never stored")
+        await writer.stop()
+        counts = await count(engine, Conversation), await count(engine, Message)
+        still_open = await writer.conversation_exists_for(bad, user_id=1)
+        await engine.dispose()
+        return counts, writer.stats(), still_open
+
+    counts, stats, still_open = asyncio.run(scenario())
+    assert counts == (1, 2)
+    assert stats["dropped_messages"] == 2 and stats["dropped_conversations"] == 1
+    assert not still_open
+
+
+def test_conversation_row_waits_for_its_first_turn():
+    async def scenario():
+        engine = make_engine()
+        writer = ChatWriter(engine, flush_interval=0.01)
+        unanswered, key = await writer.open_conversation(title="never answered")
+        answered, _ = await writer.open_conversation(title="answered")
+        writer.record_turn(answered, "hello", "hi there")
+        await writer.stop()
+        stored = await count(engine, Conversation)
+        reachable = await writer.conversation_exists_for(unanswered, key=key)
+        await engine.dispose()
+        return stored, reachable
+
+    assert asyncio.run(scenario()) == (1, False)
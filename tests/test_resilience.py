@@ -0,0 +1,86 @@
+# tests/test_resilience.py
+import time
+import asyncio
+import pytest
+from backend.resilience import AIMDLimiter, CircuitBreaker, ConcurrencyLimitExceeded
+
+
+def run_calls(limiter, latencies):
+    async def run():
+        for latency in latencies:
+            await limiter.acquire()
+            await limiter.release(latency)
+    asyncio.run(run())
+
+
+def test_steadily_long_completions_keep_the_limit():
+    limiter = AIMDLimiter(initial=10)
+    run_calls(limiter, [25.0, 30.0, 20.0, 35.0] * 25)
+    assert limiter.limit > 10
+
+
+def test_latency_well_above_the_measured_baseline_backs_off():
+    limiter = AIMDLimiter(initial=10)
+    run_calls(limiter, [1.0] * 50)
+    raised = limiter.limit
+    run_calls(limiter, [6.0] * 3)
+    assert limiter.limit < raised / 2
+
+
+def test_fixed_latency_target_still_applies():
+    limiter = AIMDLimiter(initial=10, latency_target=5.0)
+    run_calls(limiter, [20.0])
+    assert limiter.limit == 5
+
+
+def test_callers_past_a_full_queue_are_refused_at_once():
+    async def run():
+        limiter = AIMDLimiter(initial=2, maximum=2)
+        await limiter.acquire()
+        await limiter.acquire()
+        queued = [asyncio.create_task(limiter.acquire()) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        assert limiter.stats()["waiting"] == 2
+        start = time.perf_counter()
+        with pytest.raises(ConcurrencyLimitExceeded):
+            await limiter.acquire()
+        assert time.perf_counter() - start < 0.1
+        await limiter.release(1.0)
+        await asyncio.wait_for(queued[0], 1)
+        assert limiter.waiting == 1 and limiter.in_flight == 2
+        queued[1].cancel()
+        await asyncio.gather(queued[1], return_exceptions=True)
+        assert limiter.waiting == 0
+
+    asyncio.run(run())
+
+
+def test_queue_wait_is_bounded_by_the_measured_baseline():
+    limiter = AIMDLimiter(initial=1, maximum=1, warmup=3, queue_timeout=30.0)
+    assert limiter.wait_timeout() == 30.0
+    run_calls(limiter, [0.05] * 3)
+    assert limiter.wait_timeout() == pytest.approx(0.05)
+
+    async def run():
+        await limiter.acquire()
+        start = time.perf_counter()
+        with pytest.raises(ConcurrencyLimitExceeded):
+            await limiter.acquire()
+        return time.perf_counter() - start
+
+    assert asyncio.run(run()) < 1.0
+    capped = AIMDLimiter(warmup=1, queue_timeout=5.0)
+    run_calls(capped, [60.0])
+    assert capped.wait_timeout() == 5.0
+
+
+def test_slow_successes_do_not_open_the_circuit_by_default():
+    breaker = CircuitBreaker(failure_threshold=2)
+    for _ in range(5):
+        breaker.record_success(60.0)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker = CircuitBreaker(failure_threshold=2, latency_threshold=10.0)
+    for _ in range(2):
+        breaker.record_success(60.0)
+    assert breaker.state == CircuitBreaker.OPEN
@@ -0,0 +1,75 @@
+# tests/test_search.py
+import asyncio
+import uuid
+from sqlalchemy import create_engine, text
+from backend.database import SessionLocal, AsyncSessionLocal
+from backend.models import Base, Conversation, Message, User
+from backend.search import install_fts, search_messages
+
+
+def make_user_with_messages(contents):
+    with SessionLocal() as db:
+        user = User(email=f"search-{uuid.uuid4().hex[:12]}@example.com", hashed_password="!")
+        db.add(user)
+        db.flush()
+        # Take the id from the same block counter the write-behind queue uses
+        db.execute(text("UPDATE id_blocks SET next_id = next_id + 1 WHERE name = 'conversations'"))
+        conversation_id = db.execute(text("SELECT next_id - 1 FROM id_blocks WHERE name = 'conversations'")).scalar()
+        db.add(Conversation(id=conversation_id, user_id=user.id, title="search"))
+        db.flush()
+        db.add_all(Message(conversation_id=conversation_id, content=content, is_user=1) for content in contents)
+        db.commit()
+        return user.id
+
+
+def search(user_id, query, limit=20, cursor=None):
+    async def run():
+        async with AsyncSessionLocal() as db:
+            return await search_messages(db, user_id, query, limit, cursor)
+    return asyncio.run(run())
+
+
+def test_search_only_returns_the_callers_messages(client):
+    mine = make_user_with_messages(["zolpidem and sleep quality", "walking after dinner"])
+    make_user_with_messages(["zolpidem side effects", "zolpidem dosage at night"])
+
+    results = search(mine, "zolpidem")["results"]
+    assert [result["snippet"] for result in results] == ["<mark>zolpidem</mark> and sleep quality"]
+
+
+def test_search_matches_stemmed_words(client):
+    user_id = make_user_with_messages(["I was hiking in the rain", "rain boots"])
+    results = search(user_id, "hikes rain")["results"]
+    assert [result["snippet"] for result in results] == ["I was <mark>hiking</mark> in the <mark>rain</mark>"]
+
+
+def test_offset_pages_cover_every_hit_once(client):
+    user_id = make_user_with_messages([f"quinoa note {index} " + "quinoa " * (index % 3) for index in range(7)])
+
+    seen, cursor = [], None
+    while True:
+        page = search(user_id, "quinoa", limit=3, cursor=cursor)
+        seen.extend(result["message_id"] for result in page["results"])
+        assert all("<mark>quinoa</mark>" in result["snippet"] for result in page["results"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == 7 and len(set(seen)) == 7
+    scores = [result["score"] for result in search(user_id, "quinoa")["results"]]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_old_index_without_owner_is_rebuilt(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE VIRTUAL TABLE messages_fts USING fts5(content, content='messages', content_rowid='id')"
+        ))
+        conn.execute(text("INSERT INTO conversations (id, user_id) VALUES (1, 7)"))
+        conn.execute(text("INSERT INTO messages (conversation_id, content) VALUES (1, 'melatonin timing')"))
+        install_fts(conn)
+        hits = conn.execute(text(
+            "SELECT rowid FROM messages_fts WHERE messages_fts MATCH 'owner : \"u7\" AND content : melatonin'"
+        )).all()
+    assert len(hits) == 1
@@ -0,0 +1,158 @@
+# tests/test_singleflight.py
+import asyncio
+import httpx
+from backend import chat_service
+from backend.singleflight import SingleFlight
+
+
+def test_identical_calls_share_one_execution():
+    async def scenario():
+        flight = SingleFlight()
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        shared = await asyncio.gather(*(flight.do("key", fn) for _ in range(5)))
+        again = await flight.do("key", fn)
+        return calls, shared, again, flight.in_flight()
+
+    calls, shared, again, in_flight = asyncio.run(scenario())
+    assert shared == ["answer"] * 5
+    # The key is released once the call finishes, so a later call runs again
+    assert again == "answer" and len(calls) == 2 and in_flight == 0
+
+
+def test_cancelled_waiter_does_not_cancel_the_shared_call():
+    async def scenario():
+        flight = SingleFlight()
+        release = asyncio.Event()
+
+        async def fn():
+            await release.wait()
+            return "answer"
+
+        leaving = asyncio.ensure_future(flight.do("key", fn))
+        staying = asyncio.ensure_future(flight.do("key", fn))
+        await asyncio.sleep(0)
+        leaving.cancel()
+        release.set()
+        return await staying
+
+    assert asyncio.run(scenario()) == "answer"
+
+
+def test_every_subscriber_gets_the_whole_stream():
+    async def scenario():
+        flight = SingleFlight()
+        started = []
+        gate = asyncio.Event()
+
+        async def source():
+            started.append(1)
+            yield "a"
+            await gate.wait()
+            yield "b"
+            yield "c"
+
+        async def collect(stream):
+            return [chunk async for chunk in stream]
+
+        first = asyncio.ensure_future(collect(flight.stream("key", source)))
+        await asyncio.sleep(0.01)
+        # Joins after "a" went out and still replays it
+        late = asyncio.ensure_future(collect(flight.stream("key", source)))
+        await asyncio.sleep(0.01)
+        gate.set()
+        return started, await first, await late
+
+    started, first, late = asyncio.run(scenario())
+    assert started == [1]
+    assert first == late == ["a", "b", "c"]
+
+
+def test_last_subscriber_leaving_cancels_the_upstream():
+    async def scenario():
+        flight = SingleFlight()
+        cancelled = asyncio.Event()
+
+        async def source():
+            try:
+                yield "a"
+                await asyncio.sleep(10)
+                yield "b"
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        streams = [flight.stream("key", source) for _ in range(2)]
+        for stream in streams:
+            assert await stream.__anext__() == "a"
+        await streams[0].aclose()
+        await asyncio.sleep(0.01)
+        one_left = cancelled.is_set()
+        await streams[1].aclose()
+        await asyncio.wait_for(cancelled.wait(), 1)
+        return one_left, flight.in_flight()
+
+    one_left, in_flight = asyncio.run(scenario())
+    assert not one_left and in_flight == 0
+
+
+def count_usage(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(chat_service, "record_token_usage", lambda *args: recorded.append(args))
+    monkeypatch.setattr(chat_service.chat_writer, "record_turn", lambda *args: None)
+
+    async def reserved(conversation_id, user, message, conversation_key=None):
+        return 1, None
+
+    async def no_context(conversation_id, history):
+        return None, history
+
+    monkeypatch.setattr(chat_service, "resolve_conversation", reserved)
+    monkeypatch.setattr(chat_service, "get_conversation_context", no_context)
+    return recorded
+
+
+def test_shared_completion_counts_tokens_once(monkeypatch):
+    recorded = count_usage(monkeypatch)
+
+    async def fake_post(url, headers, payload, timeout=30):
+        await asyncio.sleep(0.01)
+        return httpx.Response(200, json={"response": "Rest and fluids."})
+
+    monkeypatch.setattr(chat_service, "post_model", fake_post)
+
+    async def scenario():
+        return await asyncio.gather(*(
+            chat_service.chat("Tell me about zebra migration", use_cache=False) for _ in range(3)
+        ))
+
+    answers = asyncio.run(scenario())
+    assert [answer["response"] for answer in answers] == ["Rest and fluids."] * 3
+    assert len(recorded) == 1
+
+
+def test_shared_stream_counts_tokens_once(monkeypatch):
+    recorded = count_usage(monkeypatch)
+
+    async def fake_stream(url, headers, payload, timeout=30):
+        for delta in ("Rest ", "and ", "fluids."):
+            await asyncio.sleep(0.01)
+            yield delta
+
+    monkeypatch.setattr(chat_service, "stream_deltas", fake_stream)
+
+    async def scenario():
+        streams = [(await chat_service.open_stream("Tell me about zebra migration"))[2] for _ in range(3)]
+
+        async def collect(deltas):
+            return "".join([delta async for delta in deltas])
+
+        return await asyncio.gather(*(collect(deltas) for deltas in streams))
+
+    assert asyncio.run(scenario()) == ["Rest and fluids."] * 3
+    assert len(recorded) == 1
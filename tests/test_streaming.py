@@ -0,0 +1,24 @@
+# tests/test_streaming.py
+import pytest
+from backend import chat_service
+
+
+@pytest.fixture
+def failing_stream(monkeypatch):
+    async def open_stream(message, history, payload_format, conversation_id, user, conversation_key=None):
+        async def deltas():
+            yield "Partial answer"
+            raise RuntimeError("upstream went away")
+        return 3, None, deltas()
+
+    monkeypatch.setattr(chat_service, "open_stream", open_stream)
+
+
+def test_chunked_stream_aborts_on_upstream_failure(client, failing_stream):
+    with pytest.raises(RuntimeError, match="upstream went away"):
+        client.post("/ai/chat/stream", params={"message": "hi", "transport": "chunked"})
+
+
+def test_sse_stream_reports_upstream_failure(client, failing_stream):
+    response = client.post("/ai/chat/stream", params={"message": "hi"})
+    assert "event: error" in response.text and "event: done" not in response.text
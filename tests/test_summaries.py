@@ -0,0 +1,76 @@
+# tests/test_summaries.py
+import asyncio
+from sqlalchemy import text
+from backend import chat_service
+from backend.database import SessionLocal
+from backend.models import Conversation, Message
+from backend.summaries import ConversationSummarizer
+
+
+def make_conversation(message_count, summarized_messages):
+    with SessionLocal() as db:
+        # Take the id from the same block counter the write-behind queue uses
+        db.execute(text("UPDATE id_blocks SET next_id = next_id + 1 WHERE name = 'conversations'"))
+        conversation_id = db.execute(text("SELECT next_id - 1 FROM id_blocks WHERE name = 'conversations'")).scalar()
+        conversation = Conversation(id=conversation_id, title="summarized")
+        db.add(conversation)
+        db.flush()
+        messages = [
+            Message(conversation_id=conversation.id, content=f"message {index}", is_user=1 - index % 2)
+            for index in range(message_count)
+        ]
+        db.add_all(messages)
+        db.flush()
+        conversation.summary = "Earlier: the user asked about sleep."
+        conversation.summarized_through_id = messages[summarized_messages - 1].id
+        db.commit()
+        return conversation.id
+
+
+def test_prompt_gets_every_message_after_the_summary(monkeypatch):
+    async def written(conversation_id, timeout=None):
+        return True
+
+    monkeypatch.setattr(chat_service.chat_writer, "flush_conversation", written)
+    conversation_id = make_conversation(message_count=12, summarized_messages=4)
+    client_tail = [{"role": "assistant", "content": "message 11"}]
+
+    summary, history = asyncio.run(chat_service.get_conversation_context(conversation_id, client_tail))
+    assert summary == "Earlier: the user asked about sleep."
+    assert [turn["content"] for turn in history] == [f"message {index}" for index in range(4, 12)]
+
+    payload = chat_service.build_chat_payload("next question", history, summary)
+    assert [turn["content"] for turn in payload["conversation_history"][1:]] == [turn["content"] for turn in history]
+
+
+def test_unwritten_turns_fall_back_to_client_history(monkeypatch):
+    async def still_queued(conversation_id, timeout=None):
+        return False
+
+    monkeypatch.setattr(chat_service.chat_writer, "flush_conversation", still_queued)
+    conversation_id = make_conversation(message_count=6, summarized_messages=2)
+    client_history = [{"role": "user", "content": f"turn {index}"} for index in range(8)]
+
+    summary, history = asyncio.run(chat_service.get_conversation_context(conversation_id, client_history))
+    assert summary and history == client_history
+
+
+def test_refresh_tasks_are_kept_until_done():
+    summarizer = ConversationSummarizer(every_n_turns=1)
+    failures = []
+
+    async def failing_refresh(conversation_id):
+        failures.append(conversation_id)
+        raise RuntimeError("summary store unavailable")
+
+    summarizer.refresh = failing_refresh
+
+    async def scenario():
+        summarizer.on_messages_written({42: 2})
+        assert len(summarizer._tasks) == 1
+        await asyncio.gather(*summarizer._tasks)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert failures == [42]
+    assert not summarizer._tasks and not summarizer._running